@@ -0,0 +1,112 @@
+"""Gateway CPU per response for large lists: Pydantic model per record vs. the fast JSON path.
+
+Run from the repository root:
+    python -m benchmarks.gateway_json_bench [--courses 10000] [--grades 10000] [--calls 50]
+
+The gateway's ListCourses and ViewGrades stubs are replaced with fakes that
+return ready-made responses, so only the gateway's own work is measured: the
+request goes through the FastAPI app in-process, once to the real endpoint
+(records encoded straight to JSON) and once to a copy of the old endpoint that
+built a CourseOut / GradeRecordOut per record behind a response_model. Both
+answers are checked to decode to the same JSON. CPU time is measured with
+time.process_time(), HTTP handling included.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from typing import List
+
+from fastapi.testclient import TestClient
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "gateway"))
+os.environ.setdefault("ADMISSION_CONTROL", "0") # One user calling far faster than the rate limits allow
+
+import view_gateway as gateway  # noqa: E402
+from client import course_pb2, enrollment_pb2  # noqa: E402
+from view_gateway import CourseOut, GradeRecordOut, VerificationResult  # noqa: E402
+
+
+class FakeStub:
+    """Answers ListCourses and ViewGrades with prepared responses."""
+
+    def __init__(self, courses: int, grades: int):
+        self.courses = course_pb2.ListCoursesResponse(courses=[
+            course_pb2.Course(id=i, code=f"CS{i:05d}", title=f"Course number {i}", slots=40, is_open=True)
+            for i in range(1, courses + 1)
+        ])
+        self.grades = enrollment_pb2.ViewGradesResponse(records=[
+            enrollment_pb2.GradeRecord(
+                enrollment_id=i, course_id=i, course_code=f"CS{i:05d}", course_title=f"Course number {i}",
+                student_username="bench-student", grade=3.5, status="COMPLETED"
+            ) for i in range(1, grades + 1)
+        ])
+
+    def ListCourses(self, request, **kwargs):
+        return self.courses
+
+    def ViewGrades(self, request, **kwargs):
+        return self.grades
+
+
+def add_model_endpoints(stub):
+    """The old endpoints: one Pydantic model per record, validated again by response_model."""
+
+    @gateway.app.get("/bench/courses", response_model=List[CourseOut])
+    def courses_with_models():
+        return [
+            CourseOut(id=c.id, code=c.code, title=c.title, slots=c.slots, is_open=c.is_open)
+            for c in stub.ListCourses(course_pb2.ListCoursesRequest()).courses
+        ]
+
+    @gateway.app.get("/bench/grades", response_model=List[GradeRecordOut])
+    async def grades_with_models():
+        return [
+            GradeRecordOut(
+                enrollment_id=r.enrollment_id, course_id=r.course_id, course_code=r.course_code,
+                course_title=r.course_title, student_username=r.student_username, grade=r.grade, status=r.status
+            ) for r in stub.ViewGrades(enrollment_pb2.ViewGradesRequest()).records
+        ]
+
+
+def cpu_per_call(client, path, calls):
+    client.get(path) # Warm up
+    started = time.process_time()
+    for _ in range(calls):
+        response = client.get(path)
+    return (time.process_time() - started) / calls, response
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--courses", type=int, default=10_000)
+    parser.add_argument("--grades", type=int, default=10_000)
+    parser.add_argument("--calls", type=int, default=50)
+    args = parser.parse_args()
+
+    stub = FakeStub(args.courses, args.grades)
+    gateway.get_course_stub = lambda: stub
+    gateway.get_enrollment_stub = lambda username: stub
+    gateway.app.dependency_overrides[gateway.verify_token_dependency] = lambda: VerificationResult(
+        valid=True, username="bench-student", role="student"
+    )
+    add_model_endpoints(stub)
+    client = TestClient(gateway.app)
+
+    print(f"encoder: {'orjson' if gateway.orjson else 'json'}, {args.calls} calls per path")
+    print(f"{'response':<24} {'models ms':>10} {'fast ms':>9} {'speedup':>8} {'bytes':>9}")
+    for name, count, fast_path, model_path in (
+        ("courses", args.courses, "/api/courses", "/bench/courses"),
+        ("grades", args.grades, "/api/grades", "/bench/grades"),
+    ):
+        model_cpu, model_response = cpu_per_call(client, model_path, args.calls)
+        fast_cpu, fast_response = cpu_per_call(client, fast_path, args.calls)
+        if json.loads(fast_response.content) != json.loads(model_response.content):
+            raise SystemExit(f"The fast {name} response differs from the model response.")
+        print(f"{f'{name} ({count} records)':<24} {model_cpu * 1000:>10.1f} {fast_cpu * 1000:>9.1f} "
+              f"{model_cpu / fast_cpu:>7.1f}x {len(fast_response.content):>9}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""Write throughput vs. concurrency: one commit per request vs. group commit.
+
+Run from the repository root:
+    python -m benchmarks.group_commit_bench [--seconds 2] [--synchronous FULL]
+
+Each client thread repeatedly inserts one enrollment row and waits until it is
+durable, exactly like Enroll does. With a commit per request throughput
+flattens at the single-writer limit; with group commit it keeps growing with
+the number of concurrent writers because each COMMIT (and fsync) is shared.
+"""
+import argparse
+import os
+import tempfile
+import threading
+import time
+
+from sqlalchemy import Column, Float, Integer, String, insert
+from sqlalchemy.orm import declarative_base
+
+from common.group_commit import GroupCommitWriter
+from common.storage import Storage
+
+Base = declarative_base()
+
+
+class Enrollment(Base):
+    __tablename__ = "enrollments"
+
+    id = Column(Integer, primary_key=True, index=True)
+    student_username = Column(String, index=True)
+    course_id = Column(Integer, index=True)
+    grade = Column(Float, nullable=True)
+    status = Column(String, default="ENROLLED")
+
+
+def insert_enrollment(conn, student_username, course_id):
+    result = conn.execute(insert(Enrollment).values(student_username=student_username, course_id=course_id))
+    return result.inserted_primary_key[0]
+
+
+def commit_per_request(storage):
+    def write(student_username, course_id):
+        with storage.writer.begin() as conn:
+            return insert_enrollment(conn, student_username, course_id)
+    return write
+
+
+def group_commit(storage):
+    writer = GroupCommitWriter(storage.writer)
+
+    def write(student_username, course_id):
+        return writer.execute(insert_enrollment, student_username, course_id)
+    return write
+
+
+def run(write, threads, seconds):
+    counts = [0] * threads
+    deadline = time.perf_counter() + seconds
+
+    def client(index):
+        n = 0
+        while time.perf_counter() < deadline:
+            write(f"student{index}", n % 100)
+            n += 1
+        counts[index] = n
+
+    pool = [threading.Thread(target=client, args=(i,)) for i in range(threads)]
+    for t in pool:
+        t.start()
+    for t in pool:
+        t.join()
+    return sum(counts) / seconds
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seconds", type=float, default=2.0)
+    parser.add_argument("--synchronous", default="FULL", help="SQLite synchronous pragma (FULL fsyncs every commit)")
+    parser.add_argument("--concurrency", default="1,4,16,64")
+    args = parser.parse_args()
+
+    print(f"{'writers':>8} {'commit/request w/s':>20} {'group commit w/s':>18}")
+    for threads in (int(c) for c in args.concurrency.split(",")):
+        row = []
+        for strategy in (commit_per_request, group_commit):
+            with tempfile.TemporaryDirectory() as tmp:
+                storage = Storage(os.path.join(tmp, "bench.db"), synchronous=args.synchronous)
+                storage.create_all(Base.metadata)
+                row.append(run(strategy(storage), threads, args.seconds))
+                storage.dispose()
+        print(f"{threads:>8} {row[0]:>20.0f} {row[1]:>18.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+"""Per-call CPU of the hot read handlers: ORM query path vs. precompiled Core path.
+
+Run from the repository root:
+    python -m benchmarks.query_path_bench [--courses 1000] [--grades 40] [--calls 2000]
+
+Both variants run against the same tuned SQLite files and build the same
+protobuf responses; only the query path differs. CPU time is measured with
+time.process_time() so the numbers are per call on one thread.
+"""
+import argparse
+import os
+import tempfile
+import time
+
+parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+parser.add_argument("--courses", type=int, default=1000)
+parser.add_argument("--grades", type=int, default=40)
+parser.add_argument("--calls", type=int, default=2000)
+args = parser.parse_args()
+
+# Point the services at throwaway databases before importing them
+tmp = tempfile.mkdtemp(prefix="query_path_bench_")
+os.environ["COURSE_DB_PATH"] = os.path.join(tmp, "courses.db")
+os.environ["ENROLLMENT_DB_PATH"] = os.path.join(tmp, "enrollment.db")
+os.environ["AUTH_DB_PATH"] = os.path.join(tmp, "auth.db")
+
+from client import course_pb2, enrollment_pb2  # noqa: E402
+from services.auth_service import main as auth_service  # noqa: E402
+from services.course_service import course_service  # noqa: E402
+from services.enrollment_service import enrollment_service  # noqa: E402
+
+Course = course_service.Course
+Enrollment = enrollment_service.Enrollment
+User = auth_service.User
+
+
+# --- The ORM paths as they were before the precompiled queries ---
+
+def orm_list_courses():
+    db = course_service.ReadSessionLocal()
+    try:
+        courses_db = db.query(Course).filter(Course.is_open == True).all()
+        return course_pb2.ListCoursesResponse(courses=[
+            course_pb2.Course(id=c.id, code=c.code, title=c.title, slots=c.slots, is_open=c.is_open)
+            for c in courses_db
+        ])
+    finally:
+        db.close()
+
+
+def orm_duplicate_check():
+    db = enrollment_service.ReadSessionLocal()
+    try:
+        return db.query(Enrollment).filter(
+            Enrollment.student_username == "student1",
+            Enrollment.course_id == 1,
+            Enrollment.status == "ENROLLED"
+        ).first()
+    finally:
+        db.close()
+
+
+def orm_user_lookup():
+    db = auth_service.ReadSessionLocal()
+    user = db.query(User).filter(User.username == "student1").first()
+    db.close()
+    return user
+
+
+def orm_student_records():
+    db = enrollment_service.ReadSessionLocal()
+    try:
+        return [
+            enrollment_pb2.GradeRecord(
+                enrollment_id=e.id, course_id=e.course_id, student_username=e.student_username,
+                grade=e.grade if e.grade is not None else 0.0, status=e.status
+            )
+            for e in db.query(Enrollment).filter(Enrollment.student_username == "student1").all()
+        ]
+    finally:
+        db.close()
+
+
+# --- The precompiled paths used by the services now ---
+
+servicer = course_service.CourseServicer()
+
+
+def compiled_list_courses():
+    return servicer.ListCourses(course_pb2.ListCoursesRequest(), None)
+
+
+def compiled_duplicate_check():
+    return enrollment_service.ACTIVE_ENROLLMENT_ID.first(student_username="student1", course_id=1)
+
+
+def compiled_user_lookup():
+    return auth_service.user_exists("student1")
+
+
+def compiled_student_records():
+    return [
+        enrollment_pb2.GradeRecord(
+            enrollment_id=enrollment_id, course_id=course_id, student_username="student1",
+            grade=grade if grade is not None else 0.0, status=status
+        )
+        for enrollment_id, course_id, grade, status in
+        enrollment_service.STUDENT_ENROLLMENTS.all(student_username="student1")
+    ]
+
+
+def seed():
+    db = course_service.SessionLocal()
+    db.add_all(Course(code=f"C{i:05d}", title=f"Course {i}", slots=40, is_open=True) for i in range(args.courses))
+    db.commit()
+    db.close()
+
+    db = enrollment_service.SessionLocal()
+    db.add_all(
+        Enrollment(student_username="student1", course_id=i + 1, grade=3.0, status="COMPLETED")
+        for i in range(args.grades)
+    )
+    db.add_all(Enrollment(student_username=f"other{i}", course_id=i % 50 + 1) for i in range(20000))
+    db.commit()
+    db.close()
+
+
+def cpu_per_call(fn, calls):
+    fn()  # warm statement caches and pools
+    start = time.process_time()
+    for _ in range(calls):
+        fn()
+    return (time.process_time() - start) / calls * 1e6
+
+
+def main():
+    seed()
+    cases = [
+        (f"ListCourses ({args.courses} courses)", orm_list_courses, compiled_list_courses, max(args.calls // 10, 50)),
+        ("Enroll duplicate check", orm_duplicate_check, compiled_duplicate_check, args.calls),
+        ("VerifyToken user lookup", orm_user_lookup, compiled_user_lookup, args.calls),
+        (f"ViewGrades rows ({args.grades} records)", orm_student_records, compiled_student_records, args.calls),
+    ]
+    print(f"{'handler':<34} {'ORM us/call':>12} {'Core us/call':>13} {'speedup':>8}")
+    for name, orm_fn, compiled_fn, calls in cases:
+        orm_us = cpu_per_call(orm_fn, calls)
+        compiled_us = cpu_per_call(compiled_fn, calls)
+        print(f"{name:<34} {orm_us:>12.1f} {compiled_us:>13.1f} {orm_us / compiled_us:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
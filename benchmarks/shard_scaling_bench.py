@@ -0,0 +1,152 @@
+"""Enrollment throughput with 1, 2 and 4 enrollment shards.
+
+Run from the repository root:
+    python -m benchmarks.shard_scaling_bench [--shards 1,2,4] [--seconds 10] [--synchronous FULL]
+
+For every shard count it starts a Course Service and that many enrollment
+shards on temporary databases and spare ports, then a pool of client
+processes enrolls fresh students into random courses, routing each request to
+the student's shard with the same shard map the gateway uses. Every shard has
+its own SQLite file and writer, so while the shards have CPU to spare the
+write throughput grows with the shard count. On a host with fewer cores than
+shards, use --synchronous FULL: each commit then waits for fsync, and it is
+that wait that separate shards can overlap.
+"""
+import argparse
+import multiprocessing
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+import grpc
+
+from client import course_pb2, course_pb2_grpc, enrollment_pb2, enrollment_pb2_grpc
+from common.sharding import ShardMap
+
+
+def start_service(module, env, log_path):
+    log = open(log_path, "w")
+    process = subprocess.Popen([sys.executable, "-u", "-m", module], env=env, stdout=log, stderr=subprocess.STDOUT)
+    log.close()
+    return process
+
+
+def wait_for_channel(address, timeout=30.0):
+    grpc.channel_ready_future(grpc.insecure_channel(address)).result(timeout=timeout)
+
+
+def client_process(addresses, course_ids, threads, seconds, results):
+    """One client process: `threads` threads enrolling fresh students for `seconds`."""
+    shard_map = ShardMap.even(addresses)
+    stubs = [enrollment_pb2_grpc.EnrollmentServiceStub(grpc.insecure_channel(a)) for a in addresses]
+    counts = [0] * threads
+    errors = [0] * threads
+    deadline = time.perf_counter() + seconds
+
+    def client(index):
+        rng = random.Random()
+        while time.perf_counter() < deadline:
+            student = f"bench-{rng.getrandbits(64):x}"
+            try:
+                stubs[shard_map.shard_for(student)].Enroll(
+                    enrollment_pb2.EnrollRequest(student_username=student, course_id=rng.choice(course_ids)), timeout=10
+                )
+                counts[index] += 1
+            except grpc.RpcError:
+                errors[index] += 1
+
+    workers = [threading.Thread(target=client, args=(i,)) for i in range(threads)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    results.put((sum(counts), sum(errors)))
+
+
+def run(shards, args, base_port):
+    workdir = tempfile.mkdtemp(prefix=f"shard-bench-{shards}-")
+    course_address = f"localhost:{base_port}"
+    env = dict(
+        os.environ,
+        PYTHONPATH=os.getcwd(),
+        SQLITE_SYNCHRONOUS=args.synchronous,
+        COURSE_DB_PATH=os.path.join(workdir, "courses.db"),
+        COURSE_GRPC_PORT=str(base_port),
+        COURSE_SERVICE_ADDRESS=course_address,
+        ENROLLMENT_SHARD_COUNT=str(shards),
+    )
+    processes = [start_service("services.course_service.course_service", env, os.path.join(workdir, "course.log"))]
+    try:
+        wait_for_channel(course_address)
+        course_stub = course_pb2_grpc.CourseServiceStub(grpc.insecure_channel(course_address))
+        course_ids = [
+            course_stub.AddCourse(course_pb2.AddCourseRequest(
+                code=f"BENCH{i}", title=f"Benchmark {i}", slots=10_000_000
+            )).course.id for i in range(args.courses)
+        ]
+
+        addresses = []
+        for index in range(shards):
+            port = base_port + 1 + index
+            shard_env = dict(
+                env,
+                ENROLLMENT_SHARD_INDEX=str(index),
+                ENROLLMENT_GRPC_PORT=str(port),
+                ENROLLMENT_DB_PATH=os.path.join(workdir, f"enrollment-{index}.db"),
+            )
+            processes.append(start_service(
+                "services.enrollment_service.enrollment_service", shard_env, os.path.join(workdir, f"shard-{index}.log")
+            ))
+            addresses.append(f"localhost:{port}")
+        for address in addresses:
+            wait_for_channel(address)
+        time.sleep(1.0) # Let every shard load the catalog
+
+        results = multiprocessing.Queue()
+        clients = [
+            multiprocessing.Process(
+                target=client_process, args=(addresses, course_ids, args.threads, args.seconds, results)
+            ) for _ in range(args.client_processes)
+        ]
+        for client in clients:
+            client.start()
+        totals = [results.get() for _ in clients]
+        for client in clients:
+            client.join()
+    finally:
+        for process in processes:
+            process.terminate()
+            process.wait()
+
+    enrolled = sum(count for count, _ in totals)
+    failed = sum(errors for _, errors in totals)
+    return enrolled / args.seconds, failed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--shards", default="1,2,4", help="comma-separated shard counts")
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--courses", type=int, default=50)
+    parser.add_argument("--client-processes", type=int, default=2)
+    parser.add_argument("--threads", type=int, default=32, help="client threads per client process")
+    parser.add_argument("--synchronous", default="NORMAL", help="SQLite synchronous mode of every service")
+    parser.add_argument("--base-port", type=int, default=19000)
+    args = parser.parse_args()
+
+    print(f"{os.cpu_count()} CPUs, synchronous={args.synchronous}, "
+          f"{args.client_processes}x{args.threads} clients, {args.seconds:.0f}s per run")
+    print(f"{'shards':>6} {'enroll/s':>10} {'speedup':>8} {'errors':>7}")
+    baseline = None
+    for run_index, shards in enumerate(int(n) for n in args.shards.split(",")):
+        throughput, failed = run(shards, args, args.base_port + run_index * 20)
+        baseline = baseline or throughput
+        print(f"{shards:>6} {throughput:>10.0f} {throughput / baseline:>7.2f}x {failed:>7}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""Read/write mix benchmark: default SQLite engine vs. the tuned common.storage layer.
+
+Run from the repository root:
+    python -m benchmarks.storage_bench [--threads 8] [--seconds 3]
+
+Each scenario runs a fixed number of threads for a fixed time; every operation is
+either a ViewGrades-style read (all rows of one student) or an Enroll-style write
+(insert one row and commit). Throughput and p99 latency are reported per mix.
+"""
+import argparse
+import os
+import random
+import tempfile
+import threading
+import time
+
+from sqlalchemy import Column, Float, Integer, String, create_engine, select
+from sqlalchemy.orm import declarative_base, sessionmaker
+
+from common.storage import Storage
+
+Base = declarative_base()
+
+
+class Enrollment(Base):
+    __tablename__ = "enrollments"
+
+    id = Column(Integer, primary_key=True, index=True)
+    student_username = Column(String, index=True)
+    course_id = Column(Integer, index=True)
+    grade = Column(Float, nullable=True)
+    status = Column(String, default="ENROLLED")
+
+
+STUDENTS = [f"student{i}" for i in range(500)]
+MIXES = [("read-heavy 95/5", 0.95), ("mixed 70/30", 0.70), ("write-heavy 30/70", 0.30)]
+
+
+class DefaultLayout:
+    """The engine every service used before: default journal mode, one engine for everything."""
+
+    def __init__(self, path):
+        self.writer = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False})
+        self.Session = sessionmaker(bind=self.writer)
+        self.ReadSession = self.Session
+
+    def dispose(self):
+        self.writer.dispose()
+
+
+def seed(session_factory, rows=20000):
+    db = session_factory()
+    db.add_all(
+        Enrollment(student_username=random.choice(STUDENTS), course_id=random.randint(1, 200), status="ENROLLED")
+        for _ in range(rows)
+    )
+    db.commit()
+    db.close()
+
+
+def run_mix(layout, read_ratio, threads, seconds):
+    latencies = []
+    errors = [0]
+    lock = threading.Lock()
+    deadline = time.perf_counter() + seconds
+
+    def worker():
+        local = []
+        rng = random.Random()
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            try:
+                if rng.random() < read_ratio:
+                    db = layout.ReadSession()
+                    db.execute(
+                        select(Enrollment).where(Enrollment.student_username == rng.choice(STUDENTS))
+                    ).all()
+                    db.close()
+                else:
+                    db = layout.Session()
+                    db.add(Enrollment(student_username=rng.choice(STUDENTS), course_id=rng.randint(1, 200)))
+                    db.commit()
+                    db.close()
+            except Exception:
+                with lock:
+                    errors[0] += 1
+                continue
+            local.append(time.perf_counter() - start)
+        with lock:
+            latencies.extend(local)
+
+    pool = [threading.Thread(target=worker) for _ in range(threads)]
+    for t in pool:
+        t.start()
+    for t in pool:
+        t.join()
+
+    latencies.sort()
+    p99 = latencies[int(len(latencies) * 0.99) - 1] if latencies else float("nan")
+    return len(latencies) / seconds, p99 * 1000, errors[0]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--seconds", type=float, default=3.0)
+    args = parser.parse_args()
+
+    print(f"{'layout':<10} {'mix':<20} {'ops/s':>10} {'p99 ms':>10} {'errors':>7}")
+    for mix_name, read_ratio in MIXES:
+        for layout_name, factory in (("default", DefaultLayout), ("tuned", Storage)):
+            with tempfile.TemporaryDirectory() as tmp:
+                layout = factory(os.path.join(tmp, "bench.db"))
+                Base.metadata.create_all(bind=layout.writer)
+                seed(layout.Session)
+                ops, p99, errors = run_mix(layout, read_ratio, args.threads, args.seconds)
+                layout.dispose()
+            print(f"{layout_name:<10} {mix_name:<20} {ops:>10.0f} {p99:>10.2f} {errors:>7}")
+
+
+if __name__ == "__main__":
+    main()
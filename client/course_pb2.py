@@ -24,7 +24,7 @@ _sym_db = _symbol_database.Default()
 
 
 
-DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\x0c\x63ourse.proto\x12\x06\x63ourse\"Q\n\x06\x43ourse\x12\n\n\x02id\x18\x01 \x01(\x05\x12\x0c\n\x04\x63ode\x18\x02 \x01(\t\x12\r\n\x05title\x18\x03 \x01(\t\x12\r\n\x05slots\x18\x04 \x01(\x05\x12\x0f\n\x07is_open\x18\x05 \x01(\x08\"\x14\n\x12ListCoursesRequest\"6\n\x13ListCoursesResponse\x12\x1f\n\x07\x63ourses\x18\x01 \x03(\x0b\x32\x0e.course.Course\">\n\x10\x41\x64\x64\x43ourseRequest\x12\x0c\n\x04\x63ode\x18\x01 \x01(\t\x12\r\n\x05title\x18\x02 \x01(\t\x12\r\n\x05slots\x18\x03 \x01(\x05\"3\n\x11\x41\x64\x64\x43ourseResponse\x12\x1e\n\x06\x63ourse\x18\x01 \x01(\x0b\x32\x0e.course.Course\"\'\n\x12\x43loseCourseRequest\x12\x11\n\tcourse_id\x18\x01 \x01(\x05\":\n\x12UpdateSlotsRequest\x12\x11\n\tcourse_id\x18\x01 \x01(\x05\x12\x11\n\tnew_slots\x18\x02 \x01(\x05\"5\n\x11OperationResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08\x12\x0f\n\x07message\x18\x02 \x01(\t2\xa5\x02\n\rCourseService\x12\x46\n\x0bListCourses\x12\x1a.course.ListCoursesRequest\x1a\x1b.course.ListCoursesResponse\x12@\n\tAddCourse\x12\x18.course.AddCourseRequest\x1a\x19.course.AddCourseResponse\x12\x44\n\x0b\x43loseCourse\x12\x1a.course.CloseCourseRequest\x1a\x19.course.OperationResponse\x12\x44\n\x0bUpdateSlots\x12\x1a.course.UpdateSlotsRequest\x1a\x19.course.OperationResponseb\x06proto3')
+DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\x0c\x63ourse.proto\x12\x06\x63ourse\"Q\n\x06\x43ourse\x12\n\n\x02id\x18\x01 \x01(\x05\x12\x0c\n\x04\x63ode\x18\x02 \x01(\t\x12\r\n\x05title\x18\x03 \x01(\t\x12\r\n\x05slots\x18\x04 \x01(\x05\x12\x0f\n\x07is_open\x18\x05 \x01(\x08\"\x14\n\x12ListCoursesRequest\"G\n\x13ListCoursesResponse\x12\x1f\n\x07\x63ourses\x18\x01 \x03(\x0b\x32\x0e.course.Course\x12\x0f\n\x07version\x18\x02 \x01(\x03\"\x17\n\x15\x43\x61talogVersionRequest\")\n\x16\x43\x61talogVersionResponse\x12\x0f\n\x07version\x18\x01 \x01(\x03\">\n\x10\x41\x64\x64\x43ourseRequest\x12\x0c\n\x04\x63ode\x18\x01 \x01(\t\x12\r\n\x05title\x18\x02 \x01(\t\x12\r\n\x05slots\x18\x03 \x01(\x05\"3\n\x11\x41\x64\x64\x43ourseResponse\x12\x1e\n\x06\x63ourse\x18\x01 \x01(\x0b\x32\x0e.course.Course\"\'\n\x12\x43loseCourseRequest\x12\x11\n\tcourse_id\x18\x01 \x01(\x05\":\n\x12UpdateSlotsRequest\x12\x11\n\tcourse_id\x18\x01 \x01(\x05\x12\x11\n\tnew_slots\x18\x02 \x01(\x05\",\n\x13WatchCoursesRequest\x12\x15\n\rsince_version\x18\x01 \x01(\x03\"?\n\x0c\x43ourseChange\x12\x0f\n\x07version\x18\x01 \x01(\x03\x12\x1e\n\x06\x63ourse\x18\x02 \x01(\x0b\x32\x0e.course.Course\"-\n\tSlotDelta\x12\x11\n\tcourse_id\x18\x01 \x01(\x05\x12\r\n\x05\x64\x65lta\x18\x02 \x01(\x05\"M\n\x16\x41pplySlotDeltasRequest\x12\x10\n\x08\x62\x61tch_id\x18\x01 \x01(\t\x12!\n\x06\x64\x65ltas\x18\x02 \x03(\x0b\x32\x11.course.SlotDelta\"S\n\x17\x41pplySlotDeltasResponse\x12\x11\n\tduplicate\x18\x01 \x01(\x08\x12%\n\x07\x63ourses\x18\x02 \x03(\x0b\x32\x14.course.CourseChange\"O\n\x13ReserveSlotsRequest\x12\x16\n\x0ereservation_id\x18\x01 \x01(\t\x12\x11\n\tcourse_id\x18\x02 \x01(\x05\x12\r\n\x05seats\x18\x03 \x01(\x05\"`\n\x14ReserveSlotsResponse\x12\x0f\n\x07granted\x18\x01 \x01(\x05\x12\x11\n\tduplicate\x18\x02 \x01(\x08\x12$\n\x06\x63ourse\x18\x03 \x01(\x0b\x32\x14.course.CourseChange\"5\n\x11OperationResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08\x12\x0f\n\x07message\x18\x02 \x01(\t2\xdd\x04\n\rCourseService\x12\x46\n\x0bListCourses\x12\x1a.course.ListCoursesRequest\x1a\x1b.course.ListCoursesResponse\x12@\n\tAddCourse\x12\x18.course.AddCourseRequest\x1a\x19.course.AddCourseResponse\x12\x44\n\x0b\x43loseCourse\x12\x1a.course.CloseCourseRequest\x1a\x19.course.OperationResponse\x12\x44\n\x0bUpdateSlots\x12\x1a.course.UpdateSlotsRequest\x1a\x19.course.OperationResponse\x12\x43\n\x0cWatchCourses\x12\x1b.course.WatchCoursesRequest\x1a\x14.course.CourseChange0\x01\x12R\n\x0f\x41pplySlotDeltas\x12\x1e.course.ApplySlotDeltasRequest\x1a\x1f.course.ApplySlotDeltasResponse\x12I\n\x0cReserveSlots\x12\x1b.course.ReserveSlotsRequest\x1a\x1c.course.ReserveSlotsResponse\x12R\n\x11GetCatalogVersion\x12\x1d.course.CatalogVersionRequest\x1a\x1e.course.CatalogVersionResponseb\x06proto3')
 
 _globals = globals()
 _builder.BuildMessageAndEnumDescriptors(DESCRIPTOR, _globals)
@@ -36,17 +36,35 @@ if not _descriptor._USE_C_DESCRIPTORS:
   _globals['_LISTCOURSESREQUEST']._serialized_start=107
   _globals['_LISTCOURSESREQUEST']._serialized_end=127
   _globals['_LISTCOURSESRESPONSE']._serialized_start=129
-  _globals['_LISTCOURSESRESPONSE']._serialized_end=183
-  _globals['_ADDCOURSEREQUEST']._serialized_start=185
-  _globals['_ADDCOURSEREQUEST']._serialized_end=247
-  _globals['_ADDCOURSERESPONSE']._serialized_start=249
-  _globals['_ADDCOURSERESPONSE']._serialized_end=300
-  _globals['_CLOSECOURSEREQUEST']._serialized_start=302
-  _globals['_CLOSECOURSEREQUEST']._serialized_end=341
-  _globals['_UPDATESLOTSREQUEST']._serialized_start=343
-  _globals['_UPDATESLOTSREQUEST']._serialized_end=401
-  _globals['_OPERATIONRESPONSE']._serialized_start=403
-  _globals['_OPERATIONRESPONSE']._serialized_end=456
-  _globals['_COURSESERVICE']._serialized_start=459
-  _globals['_COURSESERVICE']._serialized_end=752
+  _globals['_LISTCOURSESRESPONSE']._serialized_end=200
+  _globals['_CATALOGVERSIONREQUEST']._serialized_start=202
+  _globals['_CATALOGVERSIONREQUEST']._serialized_end=225
+  _globals['_CATALOGVERSIONRESPONSE']._serialized_start=227
+  _globals['_CATALOGVERSIONRESPONSE']._serialized_end=268
+  _globals['_ADDCOURSEREQUEST']._serialized_start=270
+  _globals['_ADDCOURSEREQUEST']._serialized_end=332
+  _globals['_ADDCOURSERESPONSE']._serialized_start=334
+  _globals['_ADDCOURSERESPONSE']._serialized_end=385
+  _globals['_CLOSECOURSEREQUEST']._serialized_start=387
+  _globals['_CLOSECOURSEREQUEST']._serialized_end=426
+  _globals['_UPDATESLOTSREQUEST']._serialized_start=428
+  _globals['_UPDATESLOTSREQUEST']._serialized_end=486
+  _globals['_WATCHCOURSESREQUEST']._serialized_start=488
+  _globals['_WATCHCOURSESREQUEST']._serialized_end=532
+  _globals['_COURSECHANGE']._serialized_start=534
+  _globals['_COURSECHANGE']._serialized_end=597
+  _globals['_SLOTDELTA']._serialized_start=599
+  _globals['_SLOTDELTA']._serialized_end=644
+  _globals['_APPLYSLOTDELTASREQUEST']._serialized_start=646
+  _globals['_APPLYSLOTDELTASREQUEST']._serialized_end=723
+  _globals['_APPLYSLOTDELTASRESPONSE']._serialized_start=725
+  _globals['_APPLYSLOTDELTASRESPONSE']._serialized_end=808
+  _globals['_RESERVESLOTSREQUEST']._serialized_start=810
+  _globals['_RESERVESLOTSREQUEST']._serialized_end=889
+  _globals['_RESERVESLOTSRESPONSE']._serialized_start=891
+  _globals['_RESERVESLOTSRESPONSE']._serialized_end=987
+  _globals['_OPERATIONRESPONSE']._serialized_start=989
+  _globals['_OPERATIONRESPONSE']._serialized_end=1042
+  _globals['_COURSESERVICE']._serialized_start=1045
+  _globals['_COURSESERVICE']._serialized_end=1650
 # @@protoc_insertion_point(module_scope)
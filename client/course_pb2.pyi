@@ -25,10 +25,22 @@ class ListCoursesRequest(_message.Message):
     def __init__(self) -> None: ...
 
 class ListCoursesResponse(_message.Message):
-    __slots__ = ("courses",)
+    __slots__ = ("courses", "version")
     COURSES_FIELD_NUMBER: _ClassVar[int]
+    VERSION_FIELD_NUMBER: _ClassVar[int]
     courses: _containers.RepeatedCompositeFieldContainer[Course]
-    def __init__(self, courses: _Optional[_Iterable[_Union[Course, _Mapping]]] = ...) -> None: ...
+    version: int
+    def __init__(self, courses: _Optional[_Iterable[_Union[Course, _Mapping]]] = ..., version: _Optional[int] = ...) -> None: ...
+
+class CatalogVersionRequest(_message.Message):
+    __slots__ = ()
+    def __init__(self) -> None: ...
+
+class CatalogVersionResponse(_message.Message):
+    __slots__ = ("version",)
+    VERSION_FIELD_NUMBER: _ClassVar[int]
+    version: int
+    def __init__(self, version: _Optional[int] = ...) -> None: ...
 
 class AddCourseRequest(_message.Message):
     __slots__ = ("code", "title", "slots")
@@ -60,6 +72,64 @@ class UpdateSlotsRequest(_message.Message):
     new_slots: int
     def __init__(self, course_id: _Optional[int] = ..., new_slots: _Optional[int] = ...) -> None: ...
 
+class WatchCoursesRequest(_message.Message):
+    __slots__ = ("since_version",)
+    SINCE_VERSION_FIELD_NUMBER: _ClassVar[int]
+    since_version: int
+    def __init__(self, since_version: _Optional[int] = ...) -> None: ...
+
+class CourseChange(_message.Message):
+    __slots__ = ("version", "course")
+    VERSION_FIELD_NUMBER: _ClassVar[int]
+    COURSE_FIELD_NUMBER: _ClassVar[int]
+    version: int
+    course: Course
+    def __init__(self, version: _Optional[int] = ..., course: _Optional[_Union[Course, _Mapping]] = ...) -> None: ...
+
+class SlotDelta(_message.Message):
+    __slots__ = ("course_id", "delta")
+    COURSE_ID_FIELD_NUMBER: _ClassVar[int]
+    DELTA_FIELD_NUMBER: _ClassVar[int]
+    course_id: int
+    delta: int
+    def __init__(self, course_id: _Optional[int] = ..., delta: _Optional[int] = ...) -> None: ...
+
+class ApplySlotDeltasRequest(_message.Message):
+    __slots__ = ("batch_id", "deltas")
+    BATCH_ID_FIELD_NUMBER: _ClassVar[int]
+    DELTAS_FIELD_NUMBER: _ClassVar[int]
+    batch_id: str
+    deltas: _containers.RepeatedCompositeFieldContainer[SlotDelta]
+    def __init__(self, batch_id: _Optional[str] = ..., deltas: _Optional[_Iterable[_Union[SlotDelta, _Mapping]]] = ...) -> None: ...
+
+class ApplySlotDeltasResponse(_message.Message):
+    __slots__ = ("duplicate", "courses")
+    DUPLICATE_FIELD_NUMBER: _ClassVar[int]
+    COURSES_FIELD_NUMBER: _ClassVar[int]
+    duplicate: bool
+    courses: _containers.RepeatedCompositeFieldContainer[CourseChange]
+    def __init__(self, duplicate: bool = ..., courses: _Optional[_Iterable[_Union[CourseChange, _Mapping]]] = ...) -> None: ...
+
+class ReserveSlotsRequest(_message.Message):
+    __slots__ = ("reservation_id", "course_id", "seats")
+    RESERVATION_ID_FIELD_NUMBER: _ClassVar[int]
+    COURSE_ID_FIELD_NUMBER: _ClassVar[int]
+    SEATS_FIELD_NUMBER: _ClassVar[int]
+    reservation_id: str
+    course_id: int
+    seats: int
+    def __init__(self, reservation_id: _Optional[str] = ..., course_id: _Optional[int] = ..., seats: _Optional[int] = ...) -> None: ...
+
+class ReserveSlotsResponse(_message.Message):
+    __slots__ = ("granted", "duplicate", "course")
+    GRANTED_FIELD_NUMBER: _ClassVar[int]
+    DUPLICATE_FIELD_NUMBER: _ClassVar[int]
+    COURSE_FIELD_NUMBER: _ClassVar[int]
+    granted: int
+    duplicate: bool
+    course: CourseChange
+    def __init__(self, granted: _Optional[int] = ..., duplicate: bool = ..., course: _Optional[_Union[CourseChange, _Mapping]] = ...) -> None: ...
+
 class OperationResponse(_message.Message):
     __slots__ = ("success", "message")
     SUCCESS_FIELD_NUMBER: _ClassVar[int]
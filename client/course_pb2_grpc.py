@@ -55,6 +55,26 @@ class CourseServiceStub(object):
                 request_serializer=course__pb2.UpdateSlotsRequest.SerializeToString,
                 response_deserializer=course__pb2.OperationResponse.FromString,
                 _registered_method=True)
+        self.WatchCourses = channel.unary_stream(
+                '/course.CourseService/WatchCourses',
+                request_serializer=course__pb2.WatchCoursesRequest.SerializeToString,
+                response_deserializer=course__pb2.CourseChange.FromString,
+                _registered_method=True)
+        self.ApplySlotDeltas = channel.unary_unary(
+                '/course.CourseService/ApplySlotDeltas',
+                request_serializer=course__pb2.ApplySlotDeltasRequest.SerializeToString,
+                response_deserializer=course__pb2.ApplySlotDeltasResponse.FromString,
+                _registered_method=True)
+        self.ReserveSlots = channel.unary_unary(
+                '/course.CourseService/ReserveSlots',
+                request_serializer=course__pb2.ReserveSlotsRequest.SerializeToString,
+                response_deserializer=course__pb2.ReserveSlotsResponse.FromString,
+                _registered_method=True)
+        self.GetCatalogVersion = channel.unary_unary(
+                '/course.CourseService/GetCatalogVersion',
+                request_serializer=course__pb2.CatalogVersionRequest.SerializeToString,
+                response_deserializer=course__pb2.CatalogVersionResponse.FromString,
+                _registered_method=True)
 
 
 class CourseServiceServicer(object):
@@ -85,6 +105,30 @@ class CourseServiceServicer(object):
         context.set_details('Method not implemented!')
         raise NotImplementedError('Method not implemented!')
 
+    def WatchCourses(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def ApplySlotDeltas(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def ReserveSlots(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def GetCatalogVersion(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
 
 def add_CourseServiceServicer_to_server(servicer, server):
     rpc_method_handlers = {
@@ -108,6 +152,26 @@ def add_CourseServiceServicer_to_server(servicer, server):
                     request_deserializer=course__pb2.UpdateSlotsRequest.FromString,
                     response_serializer=course__pb2.OperationResponse.SerializeToString,
             ),
+            'WatchCourses': grpc.unary_stream_rpc_method_handler(
+                    servicer.WatchCourses,
+                    request_deserializer=course__pb2.WatchCoursesRequest.FromString,
+                    response_serializer=course__pb2.CourseChange.SerializeToString,
+            ),
+            'ApplySlotDeltas': grpc.unary_unary_rpc_method_handler(
+                    servicer.ApplySlotDeltas,
+                    request_deserializer=course__pb2.ApplySlotDeltasRequest.FromString,
+                    response_serializer=course__pb2.ApplySlotDeltasResponse.SerializeToString,
+            ),
+            'ReserveSlots': grpc.unary_unary_rpc_method_handler(
+                    servicer.ReserveSlots,
+                    request_deserializer=course__pb2.ReserveSlotsRequest.FromString,
+                    response_serializer=course__pb2.ReserveSlotsResponse.SerializeToString,
+            ),
+            'GetCatalogVersion': grpc.unary_unary_rpc_method_handler(
+                    servicer.GetCatalogVersion,
+                    request_deserializer=course__pb2.CatalogVersionRequest.FromString,
+                    response_serializer=course__pb2.CatalogVersionResponse.SerializeToString,
+            ),
     }
     generic_handler = grpc.method_handlers_generic_handler(
             'course.CourseService', rpc_method_handlers)
@@ -227,3 +291,111 @@ class CourseService(object):
             timeout,
             metadata,
             _registered_method=True)
+
+    @staticmethod
+    def WatchCourses(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_stream(
+            request,
+            target,
+            '/course.CourseService/WatchCourses',
+            course__pb2.WatchCoursesRequest.SerializeToString,
+            course__pb2.CourseChange.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def ApplySlotDeltas(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/course.CourseService/ApplySlotDeltas',
+            course__pb2.ApplySlotDeltasRequest.SerializeToString,
+            course__pb2.ApplySlotDeltasResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def ReserveSlots(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/course.CourseService/ReserveSlots',
+            course__pb2.ReserveSlotsRequest.SerializeToString,
+            course__pb2.ReserveSlotsResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def GetCatalogVersion(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/course.CourseService/GetCatalogVersion',
+            course__pb2.CatalogVersionRequest.SerializeToString,
+            course__pb2.CatalogVersionResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
@@ -24,7 +24,7 @@ _sym_db = _symbol_database.Default()
 
 
 
-DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\x10\x65nrollment.proto\x12\nenrollment\"\xaa\x01\n\x0bGradeRecord\x12\x15\n\renrollment_id\x18\x01 \x01(\x05\x12\x11\n\tcourse_id\x18\x02 \x01(\x05\x12\x13\n\x0b\x63ourse_code\x18\x03 \x01(\t\x12\x14\n\x0c\x63ourse_title\x18\x04 \x01(\t\x12\x18\n\x10student_username\x18\x05 \x01(\t\x12\x12\n\x05grade\x18\x06 \x01(\x02H\x00\x88\x01\x01\x12\x0e\n\x06status\x18\x07 \x01(\tB\x08\n\x06_grade\"<\n\rEnrollRequest\x12\x18\n\x10student_username\x18\x01 \x01(\t\x12\x11\n\tcourse_id\x18\x02 \x01(\x05\"I\n\x0e\x45nrollResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08\x12\x0f\n\x07message\x18\x02 \x01(\t\x12\x15\n\renrollment_id\x18\x03 \x01(\x05\"-\n\x11ViewGradesRequest\x12\x18\n\x10student_username\x18\x01 \x01(\t\">\n\x12ViewGradesResponse\x12(\n\x07records\x18\x01 \x03(\x0b\x32\x17.enrollment.GradeRecord\"T\n\x12UploadGradeRequest\x12\x18\n\x10\x66\x61\x63ulty_username\x18\x01 \x01(\t\x12\x15\n\renrollment_id\x18\x02 \x01(\x05\x12\r\n\x05grade\x18\x03 \x01(\x02\"N\n\x13UploadGradeResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08\x12\x0f\n\x07message\x18\x02 \x01(\t\x12\x15\n\rupdated_grade\x18\x03 \x01(\x02\x32\xf1\x01\n\x11\x45nrollmentService\x12?\n\x06\x45nroll\x12\x19.enrollment.EnrollRequest\x1a\x1a.enrollment.EnrollResponse\x12K\n\nViewGrades\x12\x1d.enrollment.ViewGradesRequest\x1a\x1e.enrollment.ViewGradesResponse\x12N\n\x0bUploadGrade\x12\x1e.enrollment.UploadGradeRequest\x1a\x1f.enrollment.UploadGradeResponseb\x06proto3')
+DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\x10\x65nrollment.proto\x12\nenrollment\"\xaa\x01\n\x0bGradeRecord\x12\x15\n\renrollment_id\x18\x01 \x01(\x05\x12\x11\n\tcourse_id\x18\x02 \x01(\x05\x12\x13\n\x0b\x63ourse_code\x18\x03 \x01(\t\x12\x14\n\x0c\x63ourse_title\x18\x04 \x01(\t\x12\x18\n\x10student_username\x18\x05 \x01(\t\x12\x12\n\x05grade\x18\x06 \x01(\x02H\x00\x88\x01\x01\x12\x0e\n\x06status\x18\x07 \x01(\tB\x08\n\x06_grade\"e\n\rEnrollRequest\x12\x18\n\x10student_username\x18\x01 \x01(\t\x12\x11\n\tcourse_id\x18\x02 \x01(\x05\x12\x0e\n\x06queued\x18\x03 \x01(\x08\x12\x17\n\x0fidempotency_key\x18\x04 \x01(\t\"\\\n\x0e\x45nrollResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08\x12\x0f\n\x07message\x18\x02 \x01(\t\x12\x15\n\renrollment_id\x18\x03 \x01(\x05\x12\x11\n\tticket_id\x18\x04 \x01(\t\",\n\x17\x45nrollmentStatusRequest\x12\x11\n\tticket_id\x18\x01 \x01(\t\"\x92\x01\n\x18\x45nrollmentStatusResponse\x12\x11\n\tticket_id\x18\x01 \x01(\t\x12\x0e\n\x06status\x18\x02 \x01(\t\x12\x0f\n\x07message\x18\x03 \x01(\t\x12\x15\n\renrollment_id\x18\x04 \x01(\x05\x12\x11\n\tcourse_id\x18\x05 \x01(\x05\x12\x18\n\x10student_username\x18\x06 \x01(\t\"Y\n\x11\x45nrollManyRequest\x12\x18\n\x10student_username\x18\x01 \x01(\t\x12\x12\n\ncourse_ids\x18\x02 \x03(\x05\x12\x16\n\x0e\x61ll_or_nothing\x18\x03 \x01(\x08\"`\n\x12\x43ourseEnrollResult\x12\x11\n\tcourse_id\x18\x01 \x01(\x05\x12\x0f\n\x07success\x18\x02 \x01(\x08\x12\x0f\n\x07message\x18\x03 \x01(\t\x12\x15\n\renrollment_id\x18\x04 \x01(\x05\"g\n\x12\x45nrollManyResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08\x12\x0f\n\x07message\x18\x02 \x01(\t\x12/\n\x07results\x18\x03 \x03(\x0b\x32\x1e.enrollment.CourseEnrollResult\"B\n\x13JoinWaitlistRequest\x12\x18\n\x10student_username\x18\x01 \x01(\t\x12\x11\n\tcourse_id\x18\x02 \x01(\x05\"_\n\x14JoinWaitlistResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08\x12\x0f\n\x07message\x18\x02 \x01(\t\x12\x13\n\x0bwaitlist_id\x18\x03 \x01(\x05\x12\x10\n\x08position\x18\x04 \x01(\x05\"-\n\x11ViewGradesRequest\x12\x18\n\x10student_username\x18\x01 \x01(\t\"O\n\x12ViewGradesResponse\x12(\n\x07records\x18\x01 \x03(\x0b\x32\x17.enrollment.GradeRecord\x12\x0f\n\x07version\x18\x02 \x01(\x03\"m\n\x12UploadGradeRequest\x12\x18\n\x10\x66\x61\x63ulty_username\x18\x01 \x01(\t\x12\x15\n\renrollment_id\x18\x02 \x01(\x05\x12\r\n\x05grade\x18\x03 \x01(\x02\x12\x17\n\x0fidempotency_key\x18\x04 \x01(\t\"w\n\x13UploadGradeResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08\x12\x0f\n\x07message\x18\x02 \x01(\t\x12\x15\n\rupdated_grade\x18\x03 \x01(\x02\x12\'\n\x06record\x18\x04 \x01(\x0b\x32\x17.enrollment.GradeRecord\"v\n\x11UploadGradeResult\x12\x0b\n\x03row\x18\x01 \x01(\x05\x12\x15\n\renrollment_id\x18\x02 \x01(\x05\x12\x0f\n\x07success\x18\x03 \x01(\x08\x12\x0f\n\x07message\x18\x04 \x01(\t\x12\r\n\x05grade\x18\x05 \x01(\x02\x12\x0c\n\x04\x63ode\x18\x06 \x01(\t\"-\n\x14GetEnrollmentRequest\x12\x15\n\renrollment_id\x18\x01 \x01(\x05\"@\n\x15GetEnrollmentResponse\x12\'\n\x06record\x18\x01 \x01(\x0b\x32\x17.enrollment.GradeRecord\"[\n\x17ListCourseRosterRequest\x12\x11\n\tcourse_id\x18\x01 \x01(\x05\x12\x0e\n\x06status\x18\x02 \x01(\t\x12\x0e\n\x06\x63ursor\x18\x03 \x01(\x05\x12\r\n\x05limit\x18\x04 \x01(\x05\"4\n\x18TranscriptSummaryRequest\x12\x18\n\x10student_username\x18\x01 \x01(\t\"v\n\x19TranscriptSummaryResponse\x12\x18\n\x10student_username\x18\x01 \x01(\t\x12\x0b\n\x03gpa\x18\x02 \x01(\x02\x12\x17\n\x0f\x63ompleted_count\x18\x03 \x01(\x05\x12\x19\n\x11in_progress_count\x18\x04 \x01(\x05\"H\n\x15\x44ropEnrollmentRequest\x12\x15\n\renrollment_id\x18\x01 \x01(\x05\x12\x18\n\x10student_username\x18\x02 \x01(\t\"c\n\x16\x44ropEnrollmentResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08\x12\x0f\n\x07message\x18\x02 \x01(\t\x12\'\n\x06record\x18\x03 \x01(\x0b\x32\x17.enrollment.GradeRecord\")\n\x14\x43ourseClosureRequest\x12\x11\n\tcourse_id\x18\x01 \x01(\x05\"\x88\x01\n\x15\x43ourseClosureResponse\x12\x11\n\tcourse_id\x18\x01 \x01(\x05\x12\x0e\n\x06status\x18\x02 \x01(\t\x12\x19\n\x11total_enrollments\x18\x03 \x01(\x05\x12\x15\n\rdropped_count\x18\x04 \x01(\x05\x12\x1a\n\x12\x63\x61ncelled_waitlist\x18\x05 \x01(\x05\"0\n\x14GradesVersionRequest\x12\x18\n\x10student_username\x18\x01 \x01(\t\"(\n\x15GradesVersionResponse\x12\x0f\n\x07version\x18\x01 \x01(\x03\x32\xe0\x08\n\x11\x45nrollmentService\x12?\n\x06\x45nroll\x12\x19.enrollment.EnrollRequest\x1a\x1a.enrollment.EnrollResponse\x12K\n\nEnrollMany\x12\x1d.enrollment.EnrollManyRequest\x1a\x1e.enrollment.EnrollManyResponse\x12Q\n\x0cJoinWaitlist\x12\x1f.enrollment.JoinWaitlistRequest\x1a .enrollment.JoinWaitlistResponse\x12`\n\x13GetEnrollmentStatus\x12#.enrollment.EnrollmentStatusRequest\x1a$.enrollment.EnrollmentStatusResponse\x12K\n\nViewGrades\x12\x1d.enrollment.ViewGradesRequest\x1a\x1e.enrollment.ViewGradesResponse\x12N\n\x0bUploadGrade\x12\x1e.enrollment.UploadGradeRequest\x1a\x1f.enrollment.UploadGradeResponse\x12T\n\rGetEnrollment\x12 .enrollment.GetEnrollmentRequest\x1a!.enrollment.GetEnrollmentResponse\x12Q\n\x0cUploadGrades\x12\x1e.enrollment.UploadGradeRequest\x1a\x1d.enrollment.UploadGradeResult(\x01\x30\x01\x12\x63\n\x14GetTranscriptSummary\x12$.enrollment.TranscriptSummaryRequest\x1a%.enrollment.TranscriptSummaryResponse\x12R\n\x10ListCourseRoster\x12#.enrollment.ListCourseRosterRequest\x1a\x17.enrollment.GradeRecord0\x01\x12W\n\x0e\x44ropEnrollment\x12!.enrollment.DropEnrollmentRequest\x1a\".enrollment.DropEnrollmentResponse\x12W\n\x10GetCourseClosure\x12 .enrollment.CourseClosureRequest\x1a!.enrollment.CourseClosureResponse\x12W\n\x10GetGradesVersion\x12 .enrollment.GradesVersionRequest\x1a!.enrollment.GradesVersionResponseb\x06proto3')
 
 _globals = globals()
 _builder.BuildMessageAndEnumDescriptors(DESCRIPTOR, _globals)
@@ -34,17 +34,55 @@ if not _descriptor._USE_C_DESCRIPTORS:
   _globals['_GRADERECORD']._serialized_start=33
   _globals['_GRADERECORD']._serialized_end=203
   _globals['_ENROLLREQUEST']._serialized_start=205
-  _globals['_ENROLLREQUEST']._serialized_end=265
-  _globals['_ENROLLRESPONSE']._serialized_start=267
-  _globals['_ENROLLRESPONSE']._serialized_end=340
-  _globals['_VIEWGRADESREQUEST']._serialized_start=342
-  _globals['_VIEWGRADESREQUEST']._serialized_end=387
-  _globals['_VIEWGRADESRESPONSE']._serialized_start=389
-  _globals['_VIEWGRADESRESPONSE']._serialized_end=451
-  _globals['_UPLOADGRADEREQUEST']._serialized_start=453
-  _globals['_UPLOADGRADEREQUEST']._serialized_end=537
-  _globals['_UPLOADGRADERESPONSE']._serialized_start=539
-  _globals['_UPLOADGRADERESPONSE']._serialized_end=617
-  _globals['_ENROLLMENTSERVICE']._serialized_start=620
-  _globals['_ENROLLMENTSERVICE']._serialized_end=861
+  _globals['_ENROLLREQUEST']._serialized_end=306
+  _globals['_ENROLLRESPONSE']._serialized_start=308
+  _globals['_ENROLLRESPONSE']._serialized_end=400
+  _globals['_ENROLLMENTSTATUSREQUEST']._serialized_start=402
+  _globals['_ENROLLMENTSTATUSREQUEST']._serialized_end=446
+  _globals['_ENROLLMENTSTATUSRESPONSE']._serialized_start=449
+  _globals['_ENROLLMENTSTATUSRESPONSE']._serialized_end=595
+  _globals['_ENROLLMANYREQUEST']._serialized_start=597
+  _globals['_ENROLLMANYREQUEST']._serialized_end=686
+  _globals['_COURSEENROLLRESULT']._serialized_start=688
+  _globals['_COURSEENROLLRESULT']._serialized_end=784
+  _globals['_ENROLLMANYRESPONSE']._serialized_start=786
+  _globals['_ENROLLMANYRESPONSE']._serialized_end=889
+  _globals['_JOINWAITLISTREQUEST']._serialized_start=891
+  _globals['_JOINWAITLISTREQUEST']._serialized_end=957
+  _globals['_JOINWAITLISTRESPONSE']._serialized_start=959
+  _globals['_JOINWAITLISTRESPONSE']._serialized_end=1054
+  _globals['_VIEWGRADESREQUEST']._serialized_start=1056
+  _globals['_VIEWGRADESREQUEST']._serialized_end=1101
+  _globals['_VIEWGRADESRESPONSE']._serialized_start=1103
+  _globals['_VIEWGRADESRESPONSE']._serialized_end=1182
+  _globals['_UPLOADGRADEREQUEST']._serialized_start=1184
+  _globals['_UPLOADGRADEREQUEST']._serialized_end=1293
+  _globals['_UPLOADGRADERESPONSE']._serialized_start=1295
+  _globals['_UPLOADGRADERESPONSE']._serialized_end=1414
+  _globals['_UPLOADGRADERESULT']._serialized_start=1416
+  _globals['_UPLOADGRADERESULT']._serialized_end=1534
+  _globals['_GETENROLLMENTREQUEST']._serialized_start=1536
+  _globals['_GETENROLLMENTREQUEST']._serialized_end=1581
+  _globals['_GETENROLLMENTRESPONSE']._serialized_start=1583
+  _globals['_GETENROLLMENTRESPONSE']._serialized_end=1647
+  _globals['_LISTCOURSEROSTERREQUEST']._serialized_start=1649
+  _globals['_LISTCOURSEROSTERREQUEST']._serialized_end=1740
+  _globals['_TRANSCRIPTSUMMARYREQUEST']._serialized_start=1742
+  _globals['_TRANSCRIPTSUMMARYREQUEST']._serialized_end=1794
+  _globals['_TRANSCRIPTSUMMARYRESPONSE']._serialized_start=1796
+  _globals['_TRANSCRIPTSUMMARYRESPONSE']._serialized_end=1914
+  _globals['_DROPENROLLMENTREQUEST']._serialized_start=1916
+  _globals['_DROPENROLLMENTREQUEST']._serialized_end=1988
+  _globals['_DROPENROLLMENTRESPONSE']._serialized_start=1990
+  _globals['_DROPENROLLMENTRESPONSE']._serialized_end=2089
+  _globals['_COURSECLOSUREREQUEST']._serialized_start=2091
+  _globals['_COURSECLOSUREREQUEST']._serialized_end=2132
+  _globals['_COURSECLOSURERESPONSE']._serialized_start=2135
+  _globals['_COURSECLOSURERESPONSE']._serialized_end=2271
+  _globals['_GRADESVERSIONREQUEST']._serialized_start=2273
+  _globals['_GRADESVERSIONREQUEST']._serialized_end=2321
+  _globals['_GRADESVERSIONRESPONSE']._serialized_start=2323
+  _globals['_GRADESVERSIONRESPONSE']._serialized_end=2363
+  _globals['_ENROLLMENTSERVICE']._serialized_start=2366
+  _globals['_ENROLLMENTSERVICE']._serialized_end=3486
 # @@protoc_insertion_point(module_scope)
@@ -25,22 +25,102 @@ class GradeRecord(_message.Message):
     def __init__(self, enrollment_id: _Optional[int] = ..., course_id: _Optional[int] = ..., course_code: _Optional[str] = ..., course_title: _Optional[str] = ..., student_username: _Optional[str] = ..., grade: _Optional[float] = ..., status: _Optional[str] = ...) -> None: ...
 
 class EnrollRequest(_message.Message):
-    __slots__ = ("student_username", "course_id")
+    __slots__ = ("student_username", "course_id", "queued", "idempotency_key")
     STUDENT_USERNAME_FIELD_NUMBER: _ClassVar[int]
     COURSE_ID_FIELD_NUMBER: _ClassVar[int]
+    QUEUED_FIELD_NUMBER: _ClassVar[int]
+    IDEMPOTENCY_KEY_FIELD_NUMBER: _ClassVar[int]
     student_username: str
     course_id: int
-    def __init__(self, student_username: _Optional[str] = ..., course_id: _Optional[int] = ...) -> None: ...
+    queued: bool
+    idempotency_key: str
+    def __init__(self, student_username: _Optional[str] = ..., course_id: _Optional[int] = ..., queued: bool = ..., idempotency_key: _Optional[str] = ...) -> None: ...
 
 class EnrollResponse(_message.Message):
-    __slots__ = ("success", "message", "enrollment_id")
+    __slots__ = ("success", "message", "enrollment_id", "ticket_id")
     SUCCESS_FIELD_NUMBER: _ClassVar[int]
     MESSAGE_FIELD_NUMBER: _ClassVar[int]
     ENROLLMENT_ID_FIELD_NUMBER: _ClassVar[int]
+    TICKET_ID_FIELD_NUMBER: _ClassVar[int]
     success: bool
     message: str
     enrollment_id: int
-    def __init__(self, success: bool = ..., message: _Optional[str] = ..., enrollment_id: _Optional[int] = ...) -> None: ...
+    ticket_id: str
+    def __init__(self, success: bool = ..., message: _Optional[str] = ..., enrollment_id: _Optional[int] = ..., ticket_id: _Optional[str] = ...) -> None: ...
+
+class EnrollmentStatusRequest(_message.Message):
+    __slots__ = ("ticket_id",)
+    TICKET_ID_FIELD_NUMBER: _ClassVar[int]
+    ticket_id: str
+    def __init__(self, ticket_id: _Optional[str] = ...) -> None: ...
+
+class EnrollmentStatusResponse(_message.Message):
+    __slots__ = ("ticket_id", "status", "message", "enrollment_id", "course_id", "student_username")
+    TICKET_ID_FIELD_NUMBER: _ClassVar[int]
+    STATUS_FIELD_NUMBER: _ClassVar[int]
+    MESSAGE_FIELD_NUMBER: _ClassVar[int]
+    ENROLLMENT_ID_FIELD_NUMBER: _ClassVar[int]
+    COURSE_ID_FIELD_NUMBER: _ClassVar[int]
+    STUDENT_USERNAME_FIELD_NUMBER: _ClassVar[int]
+    ticket_id: str
+    status: str
+    message: str
+    enrollment_id: int
+    course_id: int
+    student_username: str
+    def __init__(self, ticket_id: _Optional[str] = ..., status: _Optional[str] = ..., message: _Optional[str] = ..., enrollment_id: _Optional[int] = ..., course_id: _Optional[int] = ..., student_username: _Optional[str] = ...) -> None: ...
+
+class EnrollManyRequest(_message.Message):
+    __slots__ = ("student_username", "course_ids", "all_or_nothing")
+    STUDENT_USERNAME_FIELD_NUMBER: _ClassVar[int]
+    COURSE_IDS_FIELD_NUMBER: _ClassVar[int]
+    ALL_OR_NOTHING_FIELD_NUMBER: _ClassVar[int]
+    student_username: str
+    course_ids: _containers.RepeatedScalarFieldContainer[int]
+    all_or_nothing: bool
+    def __init__(self, student_username: _Optional[str] = ..., course_ids: _Optional[_Iterable[int]] = ..., all_or_nothing: bool = ...) -> None: ...
+
+class CourseEnrollResult(_message.Message):
+    __slots__ = ("course_id", "success", "message", "enrollment_id")
+    COURSE_ID_FIELD_NUMBER: _ClassVar[int]
+    SUCCESS_FIELD_NUMBER: _ClassVar[int]
+    MESSAGE_FIELD_NUMBER: _ClassVar[int]
+    ENROLLMENT_ID_FIELD_NUMBER: _ClassVar[int]
+    course_id: int
+    success: bool
+    message: str
+    enrollment_id: int
+    def __init__(self, course_id: _Optional[int] = ..., success: bool = ..., message: _Optional[str] = ..., enrollment_id: _Optional[int] = ...) -> None: ...
+
+class EnrollManyResponse(_message.Message):
+    __slots__ = ("success", "message", "results")
+    SUCCESS_FIELD_NUMBER: _ClassVar[int]
+    MESSAGE_FIELD_NUMBER: _ClassVar[int]
+    RESULTS_FIELD_NUMBER: _ClassVar[int]
+    success: bool
+    message: str
+    results: _containers.RepeatedCompositeFieldContainer[CourseEnrollResult]
+    def __init__(self, success: bool = ..., message: _Optional[str] = ..., results: _Optional[_Iterable[_Union[CourseEnrollResult, _Mapping]]] = ...) -> None: ...
+
+class JoinWaitlistRequest(_message.Message):
+    __slots__ = ("student_username", "course_id")
+    STUDENT_USERNAME_FIELD_NUMBER: _ClassVar[int]
+    COURSE_ID_FIELD_NUMBER: _ClassVar[int]
+    student_username: str
+    course_id: int
+    def __init__(self, student_username: _Optional[str] = ..., course_id: _Optional[int] = ...) -> None: ...
+
+class JoinWaitlistResponse(_message.Message):
+    __slots__ = ("success", "message", "waitlist_id", "position")
+    SUCCESS_FIELD_NUMBER: _ClassVar[int]
+    MESSAGE_FIELD_NUMBER: _ClassVar[int]
+    WAITLIST_ID_FIELD_NUMBER: _ClassVar[int]
+    POSITION_FIELD_NUMBER: _ClassVar[int]
+    success: bool
+    message: str
+    waitlist_id: int
+    position: int
+    def __init__(self, success: bool = ..., message: _Optional[str] = ..., waitlist_id: _Optional[int] = ..., position: _Optional[int] = ...) -> None: ...
 
 class ViewGradesRequest(_message.Message):
     __slots__ = ("student_username",)
@@ -49,27 +129,141 @@ class ViewGradesRequest(_message.Message):
     def __init__(self, student_username: _Optional[str] = ...) -> None: ...
 
 class ViewGradesResponse(_message.Message):
-    __slots__ = ("records",)
+    __slots__ = ("records", "version")
     RECORDS_FIELD_NUMBER: _ClassVar[int]
+    VERSION_FIELD_NUMBER: _ClassVar[int]
     records: _containers.RepeatedCompositeFieldContainer[GradeRecord]
-    def __init__(self, records: _Optional[_Iterable[_Union[GradeRecord, _Mapping]]] = ...) -> None: ...
+    version: int
+    def __init__(self, records: _Optional[_Iterable[_Union[GradeRecord, _Mapping]]] = ..., version: _Optional[int] = ...) -> None: ...
 
 class UploadGradeRequest(_message.Message):
-    __slots__ = ("faculty_username", "enrollment_id", "grade")
+    __slots__ = ("faculty_username", "enrollment_id", "grade", "idempotency_key")
     FACULTY_USERNAME_FIELD_NUMBER: _ClassVar[int]
     ENROLLMENT_ID_FIELD_NUMBER: _ClassVar[int]
     GRADE_FIELD_NUMBER: _ClassVar[int]
+    IDEMPOTENCY_KEY_FIELD_NUMBER: _ClassVar[int]
     faculty_username: str
     enrollment_id: int
     grade: float
-    def __init__(self, faculty_username: _Optional[str] = ..., enrollment_id: _Optional[int] = ..., grade: _Optional[float] = ...) -> None: ...
+    idempotency_key: str
+    def __init__(self, faculty_username: _Optional[str] = ..., enrollment_id: _Optional[int] = ..., grade: _Optional[float] = ..., idempotency_key: _Optional[str] = ...) -> None: ...
 
 class UploadGradeResponse(_message.Message):
-    __slots__ = ("success", "message", "updated_grade")
+    __slots__ = ("success", "message", "updated_grade", "record")
     SUCCESS_FIELD_NUMBER: _ClassVar[int]
     MESSAGE_FIELD_NUMBER: _ClassVar[int]
     UPDATED_GRADE_FIELD_NUMBER: _ClassVar[int]
+    RECORD_FIELD_NUMBER: _ClassVar[int]
     success: bool
     message: str
     updated_grade: float
-    def __init__(self, success: bool = ..., message: _Optional[str] = ..., updated_grade: _Optional[float] = ...) -> None: ...
+    record: GradeRecord
+    def __init__(self, success: bool = ..., message: _Optional[str] = ..., updated_grade: _Optional[float] = ..., record: _Optional[_Union[GradeRecord, _Mapping]] = ...) -> None: ...
+
+class UploadGradeResult(_message.Message):
+    __slots__ = ("row", "enrollment_id", "success", "message", "grade", "code")
+    ROW_FIELD_NUMBER: _ClassVar[int]
+    ENROLLMENT_ID_FIELD_NUMBER: _ClassVar[int]
+    SUCCESS_FIELD_NUMBER: _ClassVar[int]
+    MESSAGE_FIELD_NUMBER: _ClassVar[int]
+    GRADE_FIELD_NUMBER: _ClassVar[int]
+    CODE_FIELD_NUMBER: _ClassVar[int]
+    row: int
+    enrollment_id: int
+    success: bool
+    message: str
+    grade: float
+    code: str
+    def __init__(self, row: _Optional[int] = ..., enrollment_id: _Optional[int] = ..., success: bool = ..., message: _Optional[str] = ..., grade: _Optional[float] = ..., code: _Optional[str] = ...) -> None: ...
+
+class GetEnrollmentRequest(_message.Message):
+    __slots__ = ("enrollment_id",)
+    ENROLLMENT_ID_FIELD_NUMBER: _ClassVar[int]
+    enrollment_id: int
+    def __init__(self, enrollment_id: _Optional[int] = ...) -> None: ...
+
+class GetEnrollmentResponse(_message.Message):
+    __slots__ = ("record",)
+    RECORD_FIELD_NUMBER: _ClassVar[int]
+    record: GradeRecord
+    def __init__(self, record: _Optional[_Union[GradeRecord, _Mapping]] = ...) -> None: ...
+
+class ListCourseRosterRequest(_message.Message):
+    __slots__ = ("course_id", "status", "cursor", "limit")
+    COURSE_ID_FIELD_NUMBER: _ClassVar[int]
+    STATUS_FIELD_NUMBER: _ClassVar[int]
+    CURSOR_FIELD_NUMBER: _ClassVar[int]
+    LIMIT_FIELD_NUMBER: _ClassVar[int]
+    course_id: int
+    status: str
+    cursor: int
+    limit: int
+    def __init__(self, course_id: _Optional[int] = ..., status: _Optional[str] = ..., cursor: _Optional[int] = ..., limit: _Optional[int] = ...) -> None: ...
+
+class TranscriptSummaryRequest(_message.Message):
+    __slots__ = ("student_username",)
+    STUDENT_USERNAME_FIELD_NUMBER: _ClassVar[int]
+    student_username: str
+    def __init__(self, student_username: _Optional[str] = ...) -> None: ...
+
+class TranscriptSummaryResponse(_message.Message):
+    __slots__ = ("student_username", "gpa", "completed_count", "in_progress_count")
+    STUDENT_USERNAME_FIELD_NUMBER: _ClassVar[int]
+    GPA_FIELD_NUMBER: _ClassVar[int]
+    COMPLETED_COUNT_FIELD_NUMBER: _ClassVar[int]
+    IN_PROGRESS_COUNT_FIELD_NUMBER: _ClassVar[int]
+    student_username: str
+    gpa: float
+    completed_count: int
+    in_progress_count: int
+    def __init__(self, student_username: _Optional[str] = ..., gpa: _Optional[float] = ..., completed_count: _Optional[int] = ..., in_progress_count: _Optional[int] = ...) -> None: ...
+
+class DropEnrollmentRequest(_message.Message):
+    __slots__ = ("enrollment_id", "student_username")
+    ENROLLMENT_ID_FIELD_NUMBER: _ClassVar[int]
+    STUDENT_USERNAME_FIELD_NUMBER: _ClassVar[int]
+    enrollment_id: int
+    student_username: str
+    def __init__(self, enrollment_id: _Optional[int] = ..., student_username: _Optional[str] = ...) -> None: ...
+
+class DropEnrollmentResponse(_message.Message):
+    __slots__ = ("success", "message", "record")
+    SUCCESS_FIELD_NUMBER: _ClassVar[int]
+    MESSAGE_FIELD_NUMBER: _ClassVar[int]
+    RECORD_FIELD_NUMBER: _ClassVar[int]
+    success: bool
+    message: str
+    record: GradeRecord
+    def __init__(self, success: bool = ..., message: _Optional[str] = ..., record: _Optional[_Union[GradeRecord, _Mapping]] = ...) -> None: ...
+
+class CourseClosureRequest(_message.Message):
+    __slots__ = ("course_id",)
+    COURSE_ID_FIELD_NUMBER: _ClassVar[int]
+    course_id: int
+    def __init__(self, course_id: _Optional[int] = ...) -> None: ...
+
+class CourseClosureResponse(_message.Message):
+    __slots__ = ("course_id", "status", "total_enrollments", "dropped_count", "cancelled_waitlist")
+    COURSE_ID_FIELD_NUMBER: _ClassVar[int]
+    STATUS_FIELD_NUMBER: _ClassVar[int]
+    TOTAL_ENROLLMENTS_FIELD_NUMBER: _ClassVar[int]
+    DROPPED_COUNT_FIELD_NUMBER: _ClassVar[int]
+    CANCELLED_WAITLIST_FIELD_NUMBER: _ClassVar[int]
+    course_id: int
+    status: str
+    total_enrollments: int
+    dropped_count: int
+    cancelled_waitlist: int
+    def __init__(self, course_id: _Optional[int] = ..., status: _Optional[str] = ..., total_enrollments: _Optional[int] = ..., dropped_count: _Optional[int] = ..., cancelled_waitlist: _Optional[int] = ...) -> None: ...
+
+class GradesVersionRequest(_message.Message):
+    __slots__ = ("student_username",)
+    STUDENT_USERNAME_FIELD_NUMBER: _ClassVar[int]
+    student_username: str
+    def __init__(self, student_username: _Optional[str] = ...) -> None: ...
+
+class GradesVersionResponse(_message.Message):
+    __slots__ = ("version",)
+    VERSION_FIELD_NUMBER: _ClassVar[int]
+    version: int
+    def __init__(self, version: _Optional[int] = ...) -> None: ...
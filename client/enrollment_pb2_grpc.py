@@ -40,6 +40,21 @@ class EnrollmentServiceStub(object):
                 request_serializer=enrollment__pb2.EnrollRequest.SerializeToString,
                 response_deserializer=enrollment__pb2.EnrollResponse.FromString,
                 _registered_method=True)
+        self.EnrollMany = channel.unary_unary(
+                '/enrollment.EnrollmentService/EnrollMany',
+                request_serializer=enrollment__pb2.EnrollManyRequest.SerializeToString,
+                response_deserializer=enrollment__pb2.EnrollManyResponse.FromString,
+                _registered_method=True)
+        self.JoinWaitlist = channel.unary_unary(
+                '/enrollment.EnrollmentService/JoinWaitlist',
+                request_serializer=enrollment__pb2.JoinWaitlistRequest.SerializeToString,
+                response_deserializer=enrollment__pb2.JoinWaitlistResponse.FromString,
+                _registered_method=True)
+        self.GetEnrollmentStatus = channel.unary_unary(
+                '/enrollment.EnrollmentService/GetEnrollmentStatus',
+                request_serializer=enrollment__pb2.EnrollmentStatusRequest.SerializeToString,
+                response_deserializer=enrollment__pb2.EnrollmentStatusResponse.FromString,
+                _registered_method=True)
         self.ViewGrades = channel.unary_unary(
                 '/enrollment.EnrollmentService/ViewGrades',
                 request_serializer=enrollment__pb2.ViewGradesRequest.SerializeToString,
@@ -50,6 +65,41 @@ class EnrollmentServiceStub(object):
                 request_serializer=enrollment__pb2.UploadGradeRequest.SerializeToString,
                 response_deserializer=enrollment__pb2.UploadGradeResponse.FromString,
                 _registered_method=True)
+        self.GetEnrollment = channel.unary_unary(
+                '/enrollment.EnrollmentService/GetEnrollment',
+                request_serializer=enrollment__pb2.GetEnrollmentRequest.SerializeToString,
+                response_deserializer=enrollment__pb2.GetEnrollmentResponse.FromString,
+                _registered_method=True)
+        self.UploadGrades = channel.stream_stream(
+                '/enrollment.EnrollmentService/UploadGrades',
+                request_serializer=enrollment__pb2.UploadGradeRequest.SerializeToString,
+                response_deserializer=enrollment__pb2.UploadGradeResult.FromString,
+                _registered_method=True)
+        self.GetTranscriptSummary = channel.unary_unary(
+                '/enrollment.EnrollmentService/GetTranscriptSummary',
+                request_serializer=enrollment__pb2.TranscriptSummaryRequest.SerializeToString,
+                response_deserializer=enrollment__pb2.TranscriptSummaryResponse.FromString,
+                _registered_method=True)
+        self.ListCourseRoster = channel.unary_stream(
+                '/enrollment.EnrollmentService/ListCourseRoster',
+                request_serializer=enrollment__pb2.ListCourseRosterRequest.SerializeToString,
+                response_deserializer=enrollment__pb2.GradeRecord.FromString,
+                _registered_method=True)
+        self.DropEnrollment = channel.unary_unary(
+                '/enrollment.EnrollmentService/DropEnrollment',
+                request_serializer=enrollment__pb2.DropEnrollmentRequest.SerializeToString,
+                response_deserializer=enrollment__pb2.DropEnrollmentResponse.FromString,
+                _registered_method=True)
+        self.GetCourseClosure = channel.unary_unary(
+                '/enrollment.EnrollmentService/GetCourseClosure',
+                request_serializer=enrollment__pb2.CourseClosureRequest.SerializeToString,
+                response_deserializer=enrollment__pb2.CourseClosureResponse.FromString,
+                _registered_method=True)
+        self.GetGradesVersion = channel.unary_unary(
+                '/enrollment.EnrollmentService/GetGradesVersion',
+                request_serializer=enrollment__pb2.GradesVersionRequest.SerializeToString,
+                response_deserializer=enrollment__pb2.GradesVersionResponse.FromString,
+                _registered_method=True)
 
 
 class EnrollmentServiceServicer(object):
@@ -63,6 +113,27 @@ class EnrollmentServiceServicer(object):
         context.set_details('Method not implemented!')
         raise NotImplementedError('Method not implemented!')
 
+    def EnrollMany(self, request, context):
+        """Students to enroll in several courses in one request
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def JoinWaitlist(self, request, context):
+        """Students to wait for a seat in a full course
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def GetEnrollmentStatus(self, request, context):
+        """Students to check the outcome of a queued enrollment
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
     def ViewGrades(self, request, context):
         """Students to view their previous grades
         """
@@ -77,6 +148,55 @@ class EnrollmentServiceServicer(object):
         context.set_details('Method not implemented!')
         raise NotImplementedError('Method not implemented!')
 
+    def GetEnrollment(self, request, context):
+        """Look up a single enrollment record by id
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def UploadGrades(self, request_iterator, context):
+        """Faculty to upload a whole grade sheet at once
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def GetTranscriptSummary(self, request, context):
+        """Students to see their GPA and course counts
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def ListCourseRoster(self, request, context):
+        """Faculty to list the students of a course
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def DropEnrollment(self, request, context):
+        """Students to drop a course they are enrolled in
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def GetCourseClosure(self, request, context):
+        """Faculty to follow the cascade that drops the enrollments of a closed course
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def GetGradesVersion(self, request, context):
+        """Current version of a student's records (see ViewGradesResponse.version)
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
 
 def add_EnrollmentServiceServicer_to_server(servicer, server):
     rpc_method_handlers = {
@@ -85,6 +205,21 @@ def add_EnrollmentServiceServicer_to_server(servicer, server):
                     request_deserializer=enrollment__pb2.EnrollRequest.FromString,
                     response_serializer=enrollment__pb2.EnrollResponse.SerializeToString,
             ),
+            'EnrollMany': grpc.unary_unary_rpc_method_handler(
+                    servicer.EnrollMany,
+                    request_deserializer=enrollment__pb2.EnrollManyRequest.FromString,
+                    response_serializer=enrollment__pb2.EnrollManyResponse.SerializeToString,
+            ),
+            'JoinWaitlist': grpc.unary_unary_rpc_method_handler(
+                    servicer.JoinWaitlist,
+                    request_deserializer=enrollment__pb2.JoinWaitlistRequest.FromString,
+                    response_serializer=enrollment__pb2.JoinWaitlistResponse.SerializeToString,
+            ),
+            'GetEnrollmentStatus': grpc.unary_unary_rpc_method_handler(
+                    servicer.GetEnrollmentStatus,
+                    request_deserializer=enrollment__pb2.EnrollmentStatusRequest.FromString,
+                    response_serializer=enrollment__pb2.EnrollmentStatusResponse.SerializeToString,
+            ),
             'ViewGrades': grpc.unary_unary_rpc_method_handler(
                     servicer.ViewGrades,
                     request_deserializer=enrollment__pb2.ViewGradesRequest.FromString,
@@ -95,6 +230,41 @@ def add_EnrollmentServiceServicer_to_server(servicer, server):
                     request_deserializer=enrollment__pb2.UploadGradeRequest.FromString,
                     response_serializer=enrollment__pb2.UploadGradeResponse.SerializeToString,
             ),
+            'GetEnrollment': grpc.unary_unary_rpc_method_handler(
+                    servicer.GetEnrollment,
+                    request_deserializer=enrollment__pb2.GetEnrollmentRequest.FromString,
+                    response_serializer=enrollment__pb2.GetEnrollmentResponse.SerializeToString,
+            ),
+            'UploadGrades': grpc.stream_stream_rpc_method_handler(
+                    servicer.UploadGrades,
+                    request_deserializer=enrollment__pb2.UploadGradeRequest.FromString,
+                    response_serializer=enrollment__pb2.UploadGradeResult.SerializeToString,
+            ),
+            'GetTranscriptSummary': grpc.unary_unary_rpc_method_handler(
+                    servicer.GetTranscriptSummary,
+                    request_deserializer=enrollment__pb2.TranscriptSummaryRequest.FromString,
+                    response_serializer=enrollment__pb2.TranscriptSummaryResponse.SerializeToString,
+            ),
+            'ListCourseRoster': grpc.unary_stream_rpc_method_handler(
+                    servicer.ListCourseRoster,
+                    request_deserializer=enrollment__pb2.ListCourseRosterRequest.FromString,
+                    response_serializer=enrollment__pb2.GradeRecord.SerializeToString,
+            ),
+            'DropEnrollment': grpc.unary_unary_rpc_method_handler(
+                    servicer.DropEnrollment,
+                    request_deserializer=enrollment__pb2.DropEnrollmentRequest.FromString,
+                    response_serializer=enrollment__pb2.DropEnrollmentResponse.SerializeToString,
+            ),
+            'GetCourseClosure': grpc.unary_unary_rpc_method_handler(
+                    servicer.GetCourseClosure,
+                    request_deserializer=enrollment__pb2.CourseClosureRequest.FromString,
+                    response_serializer=enrollment__pb2.CourseClosureResponse.SerializeToString,
+            ),
+            'GetGradesVersion': grpc.unary_unary_rpc_method_handler(
+                    servicer.GetGradesVersion,
+                    request_deserializer=enrollment__pb2.GradesVersionRequest.FromString,
+                    response_serializer=enrollment__pb2.GradesVersionResponse.SerializeToString,
+            ),
     }
     generic_handler = grpc.method_handlers_generic_handler(
             'enrollment.EnrollmentService', rpc_method_handlers)
@@ -134,6 +304,87 @@ class EnrollmentService(object):
             metadata,
             _registered_method=True)
 
+    @staticmethod
+    def EnrollMany(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/enrollment.EnrollmentService/EnrollMany',
+            enrollment__pb2.EnrollManyRequest.SerializeToString,
+            enrollment__pb2.EnrollManyResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def JoinWaitlist(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/enrollment.EnrollmentService/JoinWaitlist',
+            enrollment__pb2.JoinWaitlistRequest.SerializeToString,
+            enrollment__pb2.JoinWaitlistResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def GetEnrollmentStatus(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/enrollment.EnrollmentService/GetEnrollmentStatus',
+            enrollment__pb2.EnrollmentStatusRequest.SerializeToString,
+            enrollment__pb2.EnrollmentStatusResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
     @staticmethod
     def ViewGrades(request,
             target,
@@ -187,3 +438,192 @@ class EnrollmentService(object):
             timeout,
             metadata,
             _registered_method=True)
+
+    @staticmethod
+    def GetEnrollment(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/enrollment.EnrollmentService/GetEnrollment',
+            enrollment__pb2.GetEnrollmentRequest.SerializeToString,
+            enrollment__pb2.GetEnrollmentResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def UploadGrades(request_iterator,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.stream_stream(
+            request_iterator,
+            target,
+            '/enrollment.EnrollmentService/UploadGrades',
+            enrollment__pb2.UploadGradeRequest.SerializeToString,
+            enrollment__pb2.UploadGradeResult.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def GetTranscriptSummary(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/enrollment.EnrollmentService/GetTranscriptSummary',
+            enrollment__pb2.TranscriptSummaryRequest.SerializeToString,
+            enrollment__pb2.TranscriptSummaryResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def ListCourseRoster(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_stream(
+            request,
+            target,
+            '/enrollment.EnrollmentService/ListCourseRoster',
+            enrollment__pb2.ListCourseRosterRequest.SerializeToString,
+            enrollment__pb2.GradeRecord.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def DropEnrollment(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/enrollment.EnrollmentService/DropEnrollment',
+            enrollment__pb2.DropEnrollmentRequest.SerializeToString,
+            enrollment__pb2.DropEnrollmentResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def GetCourseClosure(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/enrollment.EnrollmentService/GetCourseClosure',
+            enrollment__pb2.CourseClosureRequest.SerializeToString,
+            enrollment__pb2.CourseClosureResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def GetGradesVersion(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/enrollment.EnrollmentService/GetGradesVersion',
+            enrollment__pb2.GradesVersionRequest.SerializeToString,
+            enrollment__pb2.GradesVersionResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
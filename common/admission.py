@@ -0,0 +1,162 @@
+import math
+import threading
+import time
+
+# Admission control for the gateway.
+#
+# Every limited endpoint has a rate per user (by role) and a global budget.
+# Both are token buckets kept as GCRA state: one float per key, the
+# "theoretical arrival time" at which the key's bucket is full again, so tens
+# of thousands of active users cost one dict entry each. Keys whose bucket has
+# refilled hold no information and are swept out periodically.
+#
+# A request over its user's rate is rejected with the time after which a retry
+# will succeed. A request over the global budget is rejected the same way,
+# unless the endpoint queues: then it reserves the next free slot of the
+# budget and waits for it, so queued requests are admitted in arrival order,
+# as long as the wait stays under the endpoint's queue limit.
+
+SWEEP_INTERVAL_SECONDS = 10.0 # How often refilled buckets are dropped
+
+
+class Rate:
+    """`per_second` requests on average, up to `burst` at once."""
+    __slots__ = ("per_second", "burst")
+
+    def __init__(self, per_second: float, burst: int = 1):
+        if per_second <= 0 or burst < 1:
+            raise ValueError("A rate needs per_second > 0 and burst >= 1.")
+        self.per_second = per_second
+        self.burst = burst
+
+
+class EndpointLimit:
+    """Limits of one endpoint: per-user rates by role (roles not listed are not limited
+    per user), a global rate, and how long a request may queue for the global rate
+    (None: requests over it are rejected)."""
+    __slots__ = ("per_user", "total", "queue_seconds")
+
+    def __init__(self, per_user: dict = None, total: Rate = None, queue_seconds: float = None):
+        self.per_user = per_user or {}
+        self.total = total
+        self.queue_seconds = queue_seconds
+
+
+class Rejected(Exception):
+    """Over a limit; a retry after `retry_after` seconds will be admitted (if nothing else is)."""
+
+    def __init__(self, message: str, retry_after: float):
+        super().__init__(message)
+        self.message = message
+        self.retry_after = retry_after
+
+    @property
+    def retry_after_header(self) -> str:
+        return str(max(1, math.ceil(self.retry_after))) # Retry-After takes whole seconds
+
+
+class RateLimiter:
+    """Token buckets for any number of keys at one rate (GCRA)."""
+
+    def __init__(self, rate: Rate):
+        self.interval = 1.0 / rate.per_second # Time one token takes to refill
+        self.tolerance = (rate.burst - 1) * self.interval # How far ahead of now a key may run
+        self._tat = {} # key -> time its bucket is full again; missing = full now
+        self._lock = threading.Lock()
+        self._swept_at = time.monotonic()
+
+    def __len__(self):
+        return len(self._tat)
+
+    def acquire(self, key, now: float = None) -> float:
+        """Takes a token if one is left; returns 0.0, or the seconds until one will be."""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            tat = max(self._tat.get(key, now), now)
+            if tat - now > self.tolerance:
+                return tat - now - self.tolerance
+            self._tat[key] = tat + self.interval
+            self._maybe_sweep(now)
+        return 0.0
+
+    def reserve(self, key, max_wait: float, now: float = None) -> float:
+        """Reserves the next free token, in arrival order; returns the seconds to wait for it.
+
+        Nothing is reserved when the wait would exceed `max_wait`: Rejected is raised
+        with the time after which the wait will be short enough.
+        """
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            tat = max(self._tat.get(key, now), now)
+            wait = max(0.0, tat - now - self.tolerance)
+            if wait > max_wait:
+                raise Rejected("Too many requests are waiting. Try again shortly.", wait - max_wait)
+            self._tat[key] = tat + self.interval
+            self._maybe_sweep(now)
+        return wait
+
+    def release(self, key):
+        """Gives back a token taken by acquire() for a request that was not admitted after all."""
+        with self._lock:
+            if key in self._tat:
+                self._tat[key] -= self.interval
+
+    def _maybe_sweep(self, now: float):
+        if now - self._swept_at >= SWEEP_INTERVAL_SECONDS:
+            self._tat = {key: tat for key, tat in self._tat.items() if tat > now}
+            self._swept_at = now
+
+
+class AdmissionController:
+    """Applies EndpointLimits by endpoint name; counts what it admitted, queued and rejected."""
+
+    def __init__(self, limits: dict):
+        self.limits = limits
+        self._per_user = {
+            (endpoint, role): RateLimiter(rate) for endpoint, limit in limits.items() for role, rate in limit.per_user.items()
+        }
+        self._total = {endpoint: RateLimiter(limit.total) for endpoint, limit in limits.items() if limit.total}
+        self._counts = {endpoint: {"admitted": 0, "queued": 0, "rejected_user": 0, "rejected_total": 0} for endpoint in limits}
+        self._lock = threading.Lock()
+
+    def admit(self, endpoint: str, username: str, role: str) -> float:
+        """Admits one request; returns the seconds it must wait first (queued), or raises Rejected."""
+        limit = self.limits.get(endpoint)
+        if limit is None:
+            return 0.0
+        user_limiter = self._per_user.get((endpoint, role))
+        if user_limiter is not None:
+            retry_after = user_limiter.acquire(username)
+            if retry_after:
+                self._count(endpoint, "rejected_user")
+                raise Rejected("You are sending requests too quickly. Slow down.", retry_after)
+
+        wait = 0.0
+        total_limiter = self._total.get(endpoint)
+        if total_limiter is not None:
+            try:
+                if limit.queue_seconds is not None:
+                    wait = total_limiter.reserve(None, limit.queue_seconds)
+                else:
+                    retry_after = total_limiter.acquire(None)
+                    if retry_after:
+                        raise Rejected("The service is busy. Try again shortly.", retry_after)
+            except Rejected:
+                if user_limiter is not None:
+                    user_limiter.release(username) # Not admitted: the user keeps the token
+                self._count(endpoint, "rejected_total")
+                raise
+        self._count(endpoint, "queued" if wait else "admitted")
+        return wait
+
+    def _count(self, endpoint: str, outcome: str):
+        with self._lock:
+            self._counts[endpoint][outcome] += 1
+
+    def snapshot(self) -> dict:
+        """{endpoint: counters plus the number of users currently holding bucket state}"""
+        with self._lock:
+            result = {endpoint: dict(counts) for endpoint, counts in self._counts.items()}
+        for (endpoint, _), limiter in self._per_user.items():
+            result[endpoint]["tracked_users"] = result[endpoint].get("tracked_users", 0) + len(limiter)
+        return result
@@ -0,0 +1,241 @@
+import itertools
+import threading
+import time
+import grpc
+
+from client import health_pb2
+from client import health_pb2_grpc
+from common.health import LOAD_IN_FLIGHT_KEY, LOAD_QUEUE_DEPTH_KEY, SERVING
+
+# Client-side load balancing over service replicas.
+#
+# A service address may list several replicas ("localhost:8001,localhost:8011").
+# A BalancedChannel keeps one channel per replica and picks a replica for every
+# call, so the generated stubs work unchanged. Policies:
+#   round_robin        - the replicas in turn
+#   least_outstanding  - the replica with the fewest calls outstanding from this
+#                        process plus the load it last reported (calls in flight
+#                        and queued, see common/health.py)
+# Replicas that fail their health check, answered UNAVAILABLE moments ago or
+# report a queue deeper than SATURATED_QUEUE_DEPTH are skipped while any other
+# replica is usable. Streaming responses (e.g. WatchCourses) are placed on a
+# usable replica but not counted as outstanding.
+
+ROUND_ROBIN = "round_robin"
+LEAST_OUTSTANDING = "least_outstanding"
+POLICIES = (ROUND_ROBIN, LEAST_OUTSTANDING)
+
+HEALTH_CHECK_INTERVAL_SECONDS = 2.0 # How often every replica's health (and load) is polled
+HEALTH_CHECK_TIMEOUT_SECONDS = 1.0
+UNAVAILABLE_BACKOFF_SECONDS = 2.0 # A replica that answered UNAVAILABLE is skipped for this long
+LOAD_REPORT_TTL_SECONDS = 5.0 # Load reports older than this are ignored
+SATURATED_QUEUE_DEPTH = 32 # Reported queue depth at which a replica is avoided
+
+
+def parse_endpoints(addresses) -> list:
+    """'host:port,host:port' (or a list) -> list of addresses."""
+    if isinstance(addresses, str):
+        addresses = addresses.split(",")
+    endpoints = [address.strip() for address in addresses if address.strip()]
+    if not endpoints:
+        raise ValueError("At least one service address is required.")
+    return endpoints
+
+
+class Replica:
+    """One replica of a service and what this process knows about its load."""
+
+    def __init__(self, index: int, address: str):
+        self.index = index
+        self.address = address
+        self.channel = grpc.insecure_channel(address)
+        self.outstanding = 0 # Calls from this process not yet answered
+        self.calls = 0 # Calls from this process answered (successfully or not)
+        self.reported_in_flight = 0
+        self.reported_queue_depth = 0
+        self.reported_at = float("-inf")
+        self.healthy = True # Until a health check says otherwise
+        self.down_until = 0.0
+
+    def load(self, now: float) -> int:
+        if now - self.reported_at > LOAD_REPORT_TTL_SECONDS:
+            return self.outstanding
+        return self.outstanding + self.reported_in_flight + self.reported_queue_depth
+
+    def saturated(self, now: float) -> bool:
+        return now - self.reported_at <= LOAD_REPORT_TTL_SECONDS and self.reported_queue_depth >= SATURATED_QUEUE_DEPTH
+
+    def reachable(self, now: float) -> bool:
+        return self.healthy and now >= self.down_until
+
+    def record(self, call):
+        """Takes the load report from a finished call's trailing metadata."""
+        try:
+            metadata = dict(call.trailing_metadata() or ())
+        except Exception:
+            return
+        if LOAD_IN_FLIGHT_KEY in metadata:
+            self.reported_in_flight = int(metadata[LOAD_IN_FLIGHT_KEY])
+            self.reported_queue_depth = int(metadata.get(LOAD_QUEUE_DEPTH_KEY, 0))
+            self.reported_at = time.monotonic()
+
+
+class BalancedChannel(grpc.Channel):
+    """A grpc.Channel that spreads calls over several replicas of one service."""
+
+    def __init__(self, addresses, policy: str = LEAST_OUTSTANDING):
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown load balancing policy '{policy}'; use one of {', '.join(POLICIES)}.")
+        self.policy = policy
+        self.replicas = [Replica(index, address) for index, address in enumerate(parse_endpoints(addresses))]
+        self._cursor = itertools.count()
+        self._lock = threading.Lock()
+        self._closed = threading.Event()
+        self._health_thread = threading.Thread(target=self._check_health, name="replica-health", daemon=True)
+        self._health_thread.start()
+
+    # --- Replica Selection ---
+
+    def pick(self) -> Replica:
+        """Chooses the replica for the next call."""
+        now = time.monotonic()
+        candidates = (
+            [r for r in self.replicas if r.reachable(now) and not r.saturated(now)]
+            or [r for r in self.replicas if r.reachable(now)]
+            or self.replicas # Nothing looks usable: keep trying all of them
+        )
+        start = next(self._cursor) % len(candidates)
+        if self.policy == ROUND_ROBIN:
+            return candidates[start]
+        rotated = candidates[start:] + candidates[:start] # Ties go to the replicas in turn
+        return min(rotated, key=lambda r: r.load(now))
+
+    def acquire(self) -> Replica:
+        replica = self.pick()
+        with self._lock:
+            replica.outstanding += 1
+        return replica
+
+    def release(self, replica: Replica, call):
+        with self._lock:
+            replica.outstanding -= 1
+            replica.calls += 1
+        replica.record(call)
+        try:
+            if call.code() == grpc.StatusCode.UNAVAILABLE:
+                replica.down_until = time.monotonic() + UNAVAILABLE_BACKOFF_SECONDS
+        except Exception:
+            pass
+
+    def _check_health(self):
+        stubs = [health_pb2_grpc.HealthStub(replica.channel) for replica in self.replicas]
+        request = health_pb2.HealthCheckRequest()
+        while not self._closed.wait(HEALTH_CHECK_INTERVAL_SECONDS):
+            for replica, stub in zip(self.replicas, stubs):
+                try:
+                    response, call = stub.Check.with_call(request, timeout=HEALTH_CHECK_TIMEOUT_SECONDS)
+                    replica.healthy = response.status == SERVING
+                    replica.record(call) # Keeps the load of idle replicas current
+                except grpc.RpcError as e:
+                    # A service without the Health service is assumed healthy
+                    replica.healthy = e.code() == grpc.StatusCode.UNIMPLEMENTED
+
+    # --- grpc.Channel ---
+
+    def unary_unary(self, method, request_serializer=None, response_deserializer=None, _registered_method=False):
+        return _BalancedUnaryResponse(self, [
+            r.channel.unary_unary(method, request_serializer, response_deserializer, _registered_method=_registered_method)
+            for r in self.replicas
+        ])
+
+    def stream_unary(self, method, request_serializer=None, response_deserializer=None, _registered_method=False):
+        return _BalancedUnaryResponse(self, [
+            r.channel.stream_unary(method, request_serializer, response_deserializer, _registered_method=_registered_method)
+            for r in self.replicas
+        ])
+
+    def unary_stream(self, method, request_serializer=None, response_deserializer=None, _registered_method=False):
+        return _BalancedStreamResponse(self, [
+            r.channel.unary_stream(method, request_serializer, response_deserializer, _registered_method=_registered_method)
+            for r in self.replicas
+        ])
+
+    def stream_stream(self, method, request_serializer=None, response_deserializer=None, _registered_method=False):
+        return _BalancedStreamResponse(self, [
+            r.channel.stream_stream(method, request_serializer, response_deserializer, _registered_method=_registered_method)
+            for r in self.replicas
+        ])
+
+    def subscribe(self, callback, try_to_connect=False):
+        """Connectivity of every replica is reported to `callback` (READY = at least one replica is ready)."""
+        for replica in self.replicas:
+            replica.channel.subscribe(callback, try_to_connect)
+
+    def unsubscribe(self, callback):
+        for replica in self.replicas:
+            replica.channel.unsubscribe(callback)
+
+    def close(self):
+        self._closed.set()
+        for replica in self.replicas:
+            replica.channel.close()
+
+
+class _BalancedUnaryResponse:
+    """Unary-response multi-callable: one replica per call, counted while outstanding."""
+
+    def __init__(self, balancer: BalancedChannel, callables: list):
+        self._balancer = balancer
+        self._callables = callables
+
+    def __call__(self, request, *args, **kwargs):
+        response, _ = self.with_call(request, *args, **kwargs)
+        return response
+
+    def with_call(self, request, *args, **kwargs):
+        replica = self._balancer.acquire()
+        try:
+            response, call = self._callables[replica.index].with_call(request, *args, **kwargs)
+        except grpc.RpcError as e:
+            self._balancer.release(replica, e)
+            raise
+        self._balancer.release(replica, call)
+        return response, call
+
+    def future(self, request, *args, **kwargs):
+        replica = self._balancer.acquire()
+        future = self._callables[replica.index].future(request, *args, **kwargs)
+        future.add_done_callback(lambda call: self._balancer.release(replica, call))
+        return future
+
+
+class _BalancedStreamResponse:
+    """Streaming-response multi-callable: the stream stays on the replica it was opened on."""
+
+    def __init__(self, balancer: BalancedChannel, callables: list):
+        self._balancer = balancer
+        self._callables = callables
+
+    def __call__(self, request, *args, **kwargs):
+        return self._callables[self._balancer.pick().index](request, *args, **kwargs)
+
+
+_channels = {}
+_channels_lock = threading.Lock()
+
+def service_channel(addresses, policy: str = LEAST_OUTSTANDING) -> grpc.Channel:
+    """Returns the shared channel for a service address list.
+
+    One address gets a plain channel, several a BalancedChannel; either is created
+    once per process and reused by every stub.
+    """
+    key = (",".join(parse_endpoints(addresses)), policy)
+    channel = _channels.get(key)
+    if channel is None:
+        with _channels_lock:
+            channel = _channels.get(key)
+            if channel is None:
+                endpoints = parse_endpoints(addresses)
+                channel = grpc.insecure_channel(endpoints[0]) if len(endpoints) == 1 else BalancedChannel(endpoints, policy)
+                _channels[key] = channel
+    return channel
@@ -0,0 +1,430 @@
+import contextlib
+import contextvars
+import json
+import os
+import threading
+import time
+import grpc
+from concurrent import futures
+
+# Call policies for inter-service gRPC calls.
+#
+# Stubs are built on a PolicyChannel, which applies the policy of the called
+# method ("package.Service/Method", or "*" for the rest) to every call:
+#   - a deadline, shortened to whatever is left of the deadline of the server
+#     call being handled, so work is not left running downstream for a caller
+#     that has already given up (see DeadlinePropagation);
+#   - for idempotent methods only, hedging and retries: when an attempt has not
+#     answered after `hedge_after` seconds another copy is sent (to another
+#     replica when the channel is balanced), and attempts failing with a
+#     retryable code are retried with backoff, up to `max_attempts` and all
+#     within the deadline; the first answer wins;
+#   - a circuit breaker per backend: after BREAKER_FAILURES consecutive failed
+#     unary-response calls, those fail fast with UNAVAILABLE for
+#     BREAKER_OPEN_SECONDS, then a single probe call decides whether the
+#     backend is back. DEADLINE_EXCEEDED only counts as a failure when the
+#     policy's own timeout ran out: a tighter deadline set by the caller or
+#     propagated from the served call says nothing about the backend.
+# Every call, failure, hedge, retry and fast failure is counted in `metrics`.
+
+RETRYABLE_CODES = (grpc.StatusCode.UNAVAILABLE, grpc.StatusCode.DEADLINE_EXCEEDED)
+# Codes that say the backend is unhealthy; anything else (NOT_FOUND, course full, ...) is a working backend answering
+BREAKER_FAILURE_CODES = RETRYABLE_CODES + (grpc.StatusCode.INTERNAL, grpc.StatusCode.UNKNOWN)
+BREAKER_FAILURES = 5 # Consecutive failures that open a backend's circuit
+BREAKER_OPEN_SECONDS = 5.0 # How long an open circuit fails calls fast before letting a probe through
+HEDGE_POOL_WORKERS = 32 # Threads running hedged attempts
+NO_DEADLINE_SECONDS = 365 * 24 * 3600 # Server calls with more time left than this have no real deadline
+
+_deadline = contextvars.ContextVar("call_deadline", default=None) # time.monotonic() deadline of the call being served
+
+
+class MethodPolicy:
+    """How calls of one method are made.
+
+    `timeout` is the overall deadline of a call (retries included) and
+    `attempt_timeout` the deadline of one attempt. `hedge_after` and
+    `max_attempts` > 1 are only safe for idempotent methods.
+    """
+    __slots__ = ("timeout", "attempt_timeout", "hedge_after", "max_attempts", "retry_backoff")
+
+    def __init__(self, timeout=None, attempt_timeout=None, hedge_after=None, max_attempts=1, retry_backoff=0.1):
+        self.timeout = timeout
+        self.attempt_timeout = attempt_timeout
+        self.hedge_after = hedge_after
+        self.max_attempts = max_attempts
+        self.retry_backoff = retry_backoff
+
+    @property
+    def hedged(self) -> bool:
+        return self.max_attempts > 1
+
+
+def load_policies(defaults: dict, env_variable: str = "CALL_POLICIES") -> dict:
+    """Returns `defaults` with the overrides from a JSON environment variable applied.
+
+    Example: CALL_POLICIES='{"course.CourseService/ListCourses": {"timeout": 1.0, "hedge_after": 0.1}}'
+    """
+    policies = dict(defaults)
+    overrides = json.loads(os.environ.get(env_variable) or "{}")
+    for method, settings in overrides.items():
+        base = policies.get(method) or policies.get("*") or MethodPolicy()
+        merged = {name: getattr(base, name) for name in MethodPolicy.__slots__}
+        merged.update(settings)
+        policies[method] = MethodPolicy(**merged)
+    return policies
+
+
+# --- Deadline Propagation ---
+
+def remaining_deadline():
+    """Seconds left of the server call being handled by this thread, or None."""
+    deadline = _deadline.get()
+    return None if deadline is None else deadline - time.monotonic()
+
+@contextlib.contextmanager
+def deadline_scope(deadline: float):
+    """Bounds the calls made on this thread inside the block by `deadline` (a time.monotonic() value)."""
+    current = _deadline.get()
+    token = _deadline.set(deadline if current is None else min(current, deadline))
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+def submit_in_context(executor, fn, *args) -> futures.Future:
+    """Submits `fn(*args)` to run with a copy of this thread's context, so its calls keep the deadline_scope."""
+    return executor.submit(contextvars.copy_context().run, fn, *args)
+
+class DeadlinePropagation(grpc.ServerInterceptor):
+    """Makes the deadline of every unary-response server call the upper bound of the calls it makes."""
+
+    def intercept_service(self, continuation, handler_call_details):
+        handler = continuation(handler_call_details)
+        if handler is None or handler.response_streaming:
+            return handler
+
+        def propagated(request, context):
+            remaining = context.time_remaining() # Huge when the caller set no deadline
+            token = _deadline.set(None if remaining is None or remaining > NO_DEADLINE_SECONDS else time.monotonic() + remaining)
+            try:
+                return behavior(request, context)
+            finally:
+                _deadline.reset(token)
+
+        if handler.request_streaming:
+            behavior = handler.stream_unary
+            return grpc.stream_unary_rpc_method_handler(
+                propagated, handler.request_deserializer, handler.response_serializer
+            )
+        behavior = handler.unary_unary
+        return grpc.unary_unary_rpc_method_handler(propagated, handler.request_deserializer, handler.response_serializer)
+
+
+# --- Circuit Breakers ---
+
+class CircuitOpenError(grpc.RpcError):
+    """Raised instead of calling a backend whose circuit is open; looks like an UNAVAILABLE call."""
+
+    def __init__(self, backend: str):
+        super().__init__(f"{backend} circuit open")
+        self.backend = backend
+
+    def code(self):
+        return grpc.StatusCode.UNAVAILABLE
+
+    def details(self):
+        return f"The {self.backend} service is unavailable. Try again shortly."
+
+    def initial_metadata(self):
+        return ()
+
+    def trailing_metadata(self):
+        return ()
+
+
+class CircuitBreaker:
+    """CLOSED -> (failures) -> OPEN -> (cool-down) -> HALF_OPEN -> (probe) -> CLOSED or OPEN."""
+
+    CLOSED, OPEN, HALF_OPEN = "CLOSED", "OPEN", "HALF_OPEN"
+
+    def __init__(self, backend: str, failures: int = BREAKER_FAILURES, open_seconds: float = BREAKER_OPEN_SECONDS):
+        self.backend = backend
+        self.failure_threshold = failures
+        self.open_seconds = open_seconds
+        self.state = self.CLOSED
+        self.failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state == self.OPEN and time.monotonic() - self._opened_at >= self.open_seconds:
+                self.state, self._probing = self.HALF_OPEN, False
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.HALF_OPEN and not self._probing:
+                self._probing = True # Exactly one probe; everyone else keeps failing fast
+                return True
+            return False
+
+    def ignore(self):
+        """Records an outcome that says nothing about the backend; a probe's slot goes to the next call."""
+        with self._lock:
+            self._probing = False
+
+    def record(self, code):
+        with self._lock:
+            if code not in BREAKER_FAILURE_CODES:
+                if self.state != self.CLOSED:
+                    print(f"Circuit for the {self.backend} service closed again.")
+                self.state, self.failures = self.CLOSED, 0
+                return
+            self.failures += 1
+            if self.state == self.HALF_OPEN or (self.state == self.CLOSED and self.failures >= self.failure_threshold):
+                print(f"Circuit for the {self.backend} service opened after {self.failures} failures ({code.name}).")
+                self.state, self._opened_at = self.OPEN, time.monotonic()
+
+
+# --- Metrics ---
+
+class CallMetrics:
+    """Counters per backend and method, plus the state of every backend's breaker."""
+
+    FIELDS = ("calls", "failures", "short_circuited", "hedges", "retries", "coalesced")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._methods = {} # (backend, method) -> counters
+        self._breakers = {} # backend -> CircuitBreaker
+
+    def register(self, breaker: CircuitBreaker):
+        self._breakers[breaker.backend] = breaker
+
+    def count(self, backend: str, method: str, field: str, seconds: float = None):
+        with self._lock:
+            counters = self._methods.get((backend, method))
+            if counters is None:
+                counters = self._methods[(backend, method)] = dict.fromkeys(self.FIELDS + ("seconds_total", "seconds_max"), 0)
+            counters[field] += 1
+            if seconds is not None:
+                counters["seconds_total"] += seconds
+                counters["seconds_max"] = max(counters["seconds_max"], seconds)
+
+    def snapshot(self) -> dict:
+        """{backend: {"breaker": state, "methods": {method: counters}}}"""
+        with self._lock:
+            result = {
+                backend: {"breaker": breaker.state, "methods": {}} for backend, breaker in self._breakers.items()
+            }
+            for (backend, method), counters in sorted(self._methods.items()):
+                result.setdefault(backend, {"breaker": None, "methods": {}})["methods"][method] = dict(counters)
+        return result
+
+metrics = CallMetrics()
+
+
+# --- Policy Channel ---
+
+hedge_pool = futures.ThreadPoolExecutor(max_workers=HEDGE_POOL_WORKERS, thread_name_prefix="hedged-call")
+
+class PolicyChannel(grpc.Channel):
+    """Wraps a channel to one backend and applies the per-method call policies to every call."""
+
+    def __init__(self, channel, backend: str, policies: dict):
+        self.channel = channel
+        self.backend = backend
+        self.policies = policies
+        self.breaker = CircuitBreaker(backend)
+        metrics.register(self.breaker)
+
+    def policy(self, method: str) -> MethodPolicy:
+        return self.policies.get(method.lstrip("/")) or self.policies.get("*") or MethodPolicy()
+
+    def deadline_for(self, policy: MethodPolicy, timeout) -> tuple:
+        """Absolute deadline of a call: the tightest of the caller's timeout, the policy and the served call.
+
+        Returns (deadline, policy_bound); `policy_bound` is True when the policy's
+        own timeout is the tightest, i.e. when running out of time blames the backend.
+        """
+        limits = [t for t in (timeout, remaining_deadline()) if t is not None]
+        caller_limit = min(limits) if limits else None
+        if policy.timeout is not None and (caller_limit is None or policy.timeout <= caller_limit):
+            return time.monotonic() + policy.timeout, True
+        return (None if caller_limit is None else time.monotonic() + max(caller_limit, 0.0)), False
+
+    def admit(self, method: str):
+        if not self.breaker.allow():
+            metrics.count(self.backend, method, "short_circuited")
+            raise CircuitOpenError(self.backend)
+
+    def finish(self, method: str, started: float, code, breaker: bool = True, policy_bound: bool = True):
+        if breaker:
+            if code == grpc.StatusCode.DEADLINE_EXCEEDED and not policy_bound:
+                self.breaker.ignore() # The caller ran out of time, not the backend
+            else:
+                self.breaker.record(code)
+        metrics.count(self.backend, method, "calls", time.monotonic() - started)
+        if code != grpc.StatusCode.OK:
+            metrics.count(self.backend, method, "failures")
+
+    def unary_unary(self, method, request_serializer=None, response_deserializer=None, _registered_method=False):
+        inner = self.channel.unary_unary(method, request_serializer, response_deserializer, _registered_method=_registered_method)
+        return _PolicyUnaryResponse(self, method.lstrip("/"), inner, replayable=True)
+
+    def stream_unary(self, method, request_serializer=None, response_deserializer=None, _registered_method=False):
+        inner = self.channel.stream_unary(method, request_serializer, response_deserializer, _registered_method=_registered_method)
+        return _PolicyUnaryResponse(self, method.lstrip("/"), inner, replayable=False) # A request stream cannot be replayed
+
+    def unary_stream(self, method, request_serializer=None, response_deserializer=None, _registered_method=False):
+        inner = self.channel.unary_stream(method, request_serializer, response_deserializer, _registered_method=_registered_method)
+        return _PolicyStreamResponse(self, method.lstrip("/"), inner)
+
+    def stream_stream(self, method, request_serializer=None, response_deserializer=None, _registered_method=False):
+        inner = self.channel.stream_stream(method, request_serializer, response_deserializer, _registered_method=_registered_method)
+        return _PolicyStreamResponse(self, method.lstrip("/"), inner)
+
+    def subscribe(self, callback, try_to_connect=False):
+        self.channel.subscribe(callback, try_to_connect)
+
+    def unsubscribe(self, callback):
+        self.channel.unsubscribe(callback)
+
+    def close(self):
+        self.channel.close()
+
+
+def _timeout_until(deadline):
+    return None if deadline is None else max(deadline - time.monotonic(), 0.0)
+
+
+class _PolicyUnaryResponse:
+    """Unary-response multi-callable with deadline, breaker and (when allowed) hedging."""
+
+    def __init__(self, owner: PolicyChannel, method: str, inner, replayable: bool):
+        self._owner = owner
+        self._method = method
+        self._inner = inner
+        self._policy = owner.policy(method)
+        self._hedged = replayable and self._policy.hedged
+
+    def __call__(self, request, timeout=None, **kwargs):
+        response, _ = self.with_call(request, timeout, **kwargs)
+        return response
+
+    def with_call(self, request, timeout=None, **kwargs):
+        deadline, policy_bound = self._owner.deadline_for(self._policy, timeout)
+        if self._hedged:
+            return self._hedged_call(request, deadline, policy_bound, kwargs)
+        return self._attempt(request, deadline, policy_bound, kwargs)
+
+    def future(self, request, timeout=None, **kwargs):
+        owner, method = self._owner, self._method
+        owner.admit(method)
+        deadline, policy_bound = owner.deadline_for(self._policy, timeout)
+        started = time.monotonic()
+        try:
+            call = self._inner.future(request, timeout=_timeout_until(deadline), **kwargs)
+        except Exception:
+            owner.breaker.ignore() # Failed before reaching the backend; the probe slot is free again
+            raise
+        call.add_done_callback(lambda done: owner.finish(method, started, done.code(), policy_bound=policy_bound))
+        return call
+
+    def _attempt(self, request, deadline, policy_bound, kwargs):
+        """One attempt, bounded by the call deadline and the policy's attempt timeout."""
+        self._owner.admit(self._method)
+        timeout = _timeout_until(deadline)
+        attempt_timeout = self._policy.attempt_timeout
+        if attempt_timeout is not None and (timeout is None or attempt_timeout < timeout):
+            timeout, policy_bound = attempt_timeout, True
+        started = time.monotonic()
+        try:
+            response, call = self._inner.with_call(request, timeout=timeout, **kwargs)
+        except grpc.RpcError as e:
+            self._owner.finish(self._method, started, e.code(), policy_bound=policy_bound)
+            raise
+        except Exception:
+            self._owner.breaker.ignore() # Not an answer from the backend (e.g. an unserializable request)
+            raise
+        self._owner.finish(self._method, started, grpc.StatusCode.OK)
+        return response, call
+
+    def _hedged_call(self, request, deadline, policy_bound, kwargs):
+        """Races attempts: a hedge when the outstanding one is slow, a retry when all have failed.
+
+        A non-retryable error ends the call only once no attempt is left running:
+        an earlier attempt may still succeed (e.g. the write a hedge found already done).
+        """
+        policy, owner = self._policy, self._owner
+        pending, attempts, last_error, final_error = set(), 0, None, None
+
+        def launch(kind=None):
+            nonlocal attempts
+            attempts += 1
+            if kind:
+                metrics.count(owner.backend, self._method, kind)
+            pending.add(hedge_pool.submit(self._attempt, request, deadline, policy_bound, kwargs))
+
+        launch()
+        while pending:
+            remaining = _timeout_until(deadline)
+            can_launch = final_error is None and attempts < policy.max_attempts and (remaining is None or remaining > 0)
+            wait = None
+            if can_launch and policy.hedge_after is not None:
+                wait = policy.hedge_after if remaining is None else min(policy.hedge_after, remaining)
+            done, _ = futures.wait(pending, timeout=wait, return_when=futures.FIRST_COMPLETED)
+
+            if not done:
+                launch("hedges") # The outstanding attempt is slow: race another copy
+                continue
+            for attempt in done:
+                pending.discard(attempt)
+                try:
+                    return attempt.result()
+                except grpc.RpcError as e:
+                    if e.code() not in RETRYABLE_CODES or isinstance(e, CircuitOpenError):
+                        final_error = final_error or e # No more attempts; wait for the running ones
+                    else:
+                        last_error = e
+            if not pending and can_launch and final_error is None:
+                # Every attempt failed with a retryable error: back off, then try again
+                pause = policy.retry_backoff * attempts
+                time.sleep(pause if deadline is None else min(pause, _timeout_until(deadline)))
+                launch("retries")
+        raise final_error or last_error
+
+
+class _PolicyStreamResponse:
+    """Streaming-response multi-callable: deadline and metrics only.
+
+    Streams bypass the circuit breaker: a long-lived stream (WatchCourses) that
+    happened to be the probe would keep the breaker half-open until it ends.
+    """
+
+    def __init__(self, owner: PolicyChannel, method: str, inner):
+        self._owner = owner
+        self._method = method
+        self._inner = inner
+        self._policy = owner.policy(method)
+
+    def __call__(self, request, timeout=None, **kwargs):
+        owner, method = self._owner, self._method
+        started = time.monotonic()
+        call = self._inner(request, timeout=_timeout_until(owner.deadline_for(self._policy, timeout)[0]), **kwargs)
+        call.add_callback(lambda: owner.finish(method, started, call.code(), breaker=False))
+        return call
+
+
+_channels = {}
+_channels_lock = threading.Lock()
+
+def policy_channel(backend: str, channel, policies: dict) -> PolicyChannel:
+    """Returns the shared PolicyChannel of a backend (one breaker per backend and process)."""
+    wrapped = _channels.get(backend)
+    if wrapped is None:
+        with _channels_lock:
+            wrapped = _channels.get(backend)
+            if wrapped is None:
+                wrapped = _channels[backend] = PolicyChannel(channel, backend, policies)
+    return wrapped
@@ -0,0 +1,133 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+# Group commit for SQLite writes.
+#
+# Request handlers submit small write operations; a single background thread
+# drains them in batches (up to `max_batch` items, or whatever arrived within
+# `max_delay_ms` of the first one) and applies the whole batch inside ONE
+# transaction on the writer connection. Each operation runs in its own
+# SAVEPOINT so a failing item is rolled back alone, and every caller only gets
+# its result after the shared COMMIT has returned - durability is unchanged,
+# but N concurrent writers now pay for one commit instead of N.
+#
+# An operation may come with an `after_commit(result)` hook. Hooks run on the
+# writer thread right after their batch has committed, in the order the
+# operations were applied, so they observe commits in commit order (e.g. to
+# queue new work strictly in that order). They must be quick.
+
+
+class _PendingWrite:
+    __slots__ = ("operation", "args", "after_commit", "future")
+
+    def __init__(self, operation, args, after_commit):
+        self.operation = operation
+        self.args = args
+        self.after_commit = after_commit
+        self.future = Future()
+
+
+class GroupCommitWriter:
+    """Batches concurrent write operations into shared transactions."""
+
+    def __init__(self, engine, max_batch: int = 64, max_delay_ms: float = 2.0, name: str = "group-commit"):
+        self.engine = engine
+        self.max_batch = max_batch
+        self.max_delay = max_delay_ms / 1000.0
+        self._queue = queue.Queue()
+        self._last_batch_size = 0
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def submit(self, operation, *args, after_commit=None) -> Future:
+        """Queues `operation(connection, *args)`; the future resolves after commit (and `after_commit(result)`)."""
+        pending = _PendingWrite(operation, args, after_commit)
+        self._queue.put(pending)
+        return pending.future
+
+    def pending(self) -> int:
+        """Number of submitted operations not yet picked up by the writer thread."""
+        return self._queue.qsize()
+
+    def execute(self, operation, *args, timeout=None, after_commit=None):
+        """Queues an operation and blocks until its batch has committed."""
+        return self.submit(operation, *args, after_commit=after_commit).result(timeout)
+
+    # --- Background Writer ---
+
+    def _next_batch(self):
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.max_delay
+        while len(batch) < self.max_batch:
+            try:
+                # Take whatever is already queued without waiting...
+                batch.append(self._queue.get_nowait())
+                continue
+            except queue.Empty:
+                pass
+            # ...then wait for stragglers until the batch window closes. Once the
+            # batch is as large as the previous one every steady writer is
+            # already in it, so waiting longer would only add latency (this
+            # also lets a lone writer commit straight away).
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or len(batch) >= self._last_batch_size:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = [p for p in self._next_batch() if p.future.set_running_or_notify_cancel()]
+            self._last_batch_size = len(batch)
+            if batch:
+                self._commit(batch)
+
+    def _commit(self, batch):
+        outcomes = []
+        try:
+            with self.engine.connect() as conn:
+                with conn.begin() as transaction:
+                    if len(batch) == 1:
+                        # A lone write needs no SAVEPOINT: if it fails the whole
+                        # transaction is rolled back instead
+                        pending = batch[0]
+                        try:
+                            outcomes.append((pending, pending.operation(conn, *pending.args), None))
+                        except Exception as exc:
+                            transaction.rollback()
+                            outcomes.append((pending, None, exc))
+                    else:
+                        for pending in batch:
+                            outcomes.append(self._apply_in_savepoint(conn, pending))
+        except Exception as exc:
+            # The shared COMMIT (or BEGIN) failed: nothing in this batch is durable
+            for pending in batch:
+                pending.future.set_exception(exc)
+            return
+
+        for pending, result, exc in outcomes:
+            if exc is not None:
+                pending.future.set_exception(exc)
+                continue
+            if pending.after_commit is not None:
+                try:
+                    pending.after_commit(result)
+                except Exception as hook_exc:
+                    print(f"After-commit hook failed: {hook_exc}")
+            pending.future.set_result(result)
+
+    @staticmethod
+    def _apply_in_savepoint(conn, pending):
+        savepoint = conn.begin_nested()
+        try:
+            result = pending.operation(conn, *pending.args)
+        except Exception as exc:
+            savepoint.rollback()
+            return pending, None, exc
+        savepoint.commit()
+        return pending, result, None
@@ -0,0 +1,125 @@
+import threading
+import grpc
+from concurrent import futures
+
+from client import health_pb2
+from client import health_pb2_grpc
+from common.call_policy import DeadlinePropagation
+
+# Health checking and load reporting for the gRPC services.
+#
+# Every service runs the standard grpc.health.v1 Health service, so a caller
+# (or a probe such as grpc_health_probe) can tell a replica that is merely up
+# from one that is ready to serve. Every unary call also carries the server's
+# current load back in its trailing metadata: the calls still in flight and
+# the work queued behind them. Callers balancing over replicas
+# (common/balancing.py) use these reports to steer new calls away from a
+# saturated replica without any extra round trips.
+
+LOAD_IN_FLIGHT_KEY = "x-load-in-flight"
+LOAD_QUEUE_DEPTH_KEY = "x-load-queue-depth"
+HEALTH_WATCH_POLL_SECONDS = 1.0 # How often a Watch stream checks whether its caller went away
+
+SERVING = health_pb2.HealthCheckResponse.SERVING
+NOT_SERVING = health_pb2.HealthCheckResponse.NOT_SERVING
+SERVICE_UNKNOWN = health_pb2.HealthCheckResponse.SERVICE_UNKNOWN
+
+
+class HealthServicer(health_pb2_grpc.HealthServicer):
+    """grpc.health.v1.Health for one server: '' (the whole server) plus the given service names."""
+
+    def __init__(self, service_names: list, serving: bool = True):
+        self._condition = threading.Condition()
+        self._statuses = {name: NOT_SERVING for name in ["", *service_names]}
+        self.set_serving(serving)
+
+    def set_serving(self, serving: bool):
+        """Marks every service of this server as SERVING or NOT_SERVING."""
+        with self._condition:
+            for name in self._statuses:
+                self._statuses[name] = SERVING if serving else NOT_SERVING
+            self._condition.notify_all()
+
+    def Check(self, request, context):
+        status = self._statuses.get(request.service)
+        if status is None:
+            context.set_code(grpc.StatusCode.NOT_FOUND)
+            context.set_details(f"Unknown service '{request.service}'.")
+            return health_pb2.HealthCheckResponse()
+        return health_pb2.HealthCheckResponse(status=status)
+
+    def Watch(self, request, context):
+        """Sends the current status, then every change of it."""
+        last = None
+        while context.is_active():
+            with self._condition:
+                self._condition.wait_for(
+                    lambda: self._statuses.get(request.service, SERVICE_UNKNOWN) != last, HEALTH_WATCH_POLL_SECONDS
+                )
+                status = self._statuses.get(request.service, SERVICE_UNKNOWN)
+            if status != last:
+                last = status
+                yield health_pb2.HealthCheckResponse(status=status)
+
+
+class LoadReporter(grpc.ServerInterceptor):
+    """Counts the calls in flight and reports the load in the trailing metadata of every unary call.
+
+    The queue depth is the number of calls waiting for a worker of the server's
+    executor, plus whatever `backlog()` reports (e.g. queued writes).
+    """
+
+    def __init__(self, executor, backlog=None):
+        self.executor = executor
+        self.backlog = backlog
+        self._in_flight = 0
+        self._lock = threading.Lock()
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    def queue_depth(self) -> int:
+        depth = self.executor._work_queue.qsize() # Calls accepted but not yet picked up by a worker
+        return depth + (self.backlog() if self.backlog else 0)
+
+    def intercept_service(self, continuation, handler_call_details):
+        handler = continuation(handler_call_details)
+        if handler is None or handler.response_streaming:
+            return handler # Long-lived streams (WatchCourses) would read as permanent load
+
+        def reported(request, context):
+            with self._lock:
+                self._in_flight += 1
+            try:
+                return behavior(request, context)
+            finally:
+                with self._lock:
+                    self._in_flight -= 1
+                context.set_trailing_metadata((
+                    (LOAD_IN_FLIGHT_KEY, str(self._in_flight)),
+                    (LOAD_QUEUE_DEPTH_KEY, str(self.queue_depth())),
+                ))
+
+        if handler.request_streaming:
+            behavior = handler.stream_unary
+            return grpc.stream_unary_rpc_method_handler(
+                reported, handler.request_deserializer, handler.response_serializer
+            )
+        behavior = handler.unary_unary
+        return grpc.unary_unary_rpc_method_handler(reported, handler.request_deserializer, handler.response_serializer)
+
+
+def health_and_load_server(service_names: list, max_workers: int = 10, backlog=None, serving: bool = True) -> tuple:
+    """Creates a gRPC server that reports its load, serves grpc.health.v1.Health and
+    passes the deadline of every call on to the calls it makes (see common/call_policy.py).
+
+    Returns (server, health); the caller adds its own servicers and flips the
+    health status with health.set_serving() once it is ready.
+    """
+    executor = futures.ThreadPoolExecutor(max_workers=max_workers)
+    server = grpc.server(executor, interceptors=[LoadReporter(executor, backlog), DeadlinePropagation()])
+    health = HealthServicer(service_names, serving)
+    health_pb2_grpc.add_HealthServicer_to_server(health, server)
+    return server, health
+
@@ -0,0 +1,135 @@
+import bisect
+import json
+import os
+import threading
+import time
+import zlib
+
+# Student-based sharding of the enrollment service.
+#
+# Every student belongs to one of BUCKETS hash buckets (a stable CRC32 of the
+# username, so the same student always lands in the same bucket on every host
+# and Python version). The shard map assigns contiguous bucket ranges to shard
+# processes; the gateway routes student requests with it and the rebalancing
+# tool moves ranges between shards by rewriting it. A range without a shard is
+# being moved: requests for its students are refused until the move is done.
+#
+# Enrollment ids must stay unique across shards (rosters are merged by id and
+# grades are uploaded by id), so every shard allocates ids from its own block
+# of SHARD_ID_SPACE ids. The block an id came from names the shard that
+# created it; after a rebalance the record may live elsewhere.
+
+BUCKETS = 4096
+MAX_SHARDS = 16
+SHARD_ID_SPACE = (1 << 31) // MAX_SHARDS # Ids per shard; enrollment ids are int32 on the wire
+
+
+def student_bucket(student_username: str) -> int:
+    """Stable hash bucket of a student."""
+    return zlib.crc32(student_username.encode("utf-8")) % BUCKETS
+
+
+def enrollment_id_range(shard_index: int) -> tuple:
+    """(first, last) enrollment id a shard may allocate."""
+    if not 0 <= shard_index < MAX_SHARDS:
+        raise ValueError(f"Shard index must be between 0 and {MAX_SHARDS - 1}.")
+    return shard_index * SHARD_ID_SPACE + 1, (shard_index + 1) * SHARD_ID_SPACE - 1
+
+
+def origin_shard(enrollment_id: int) -> int:
+    """Index of the shard that allocated an enrollment id."""
+    return enrollment_id // SHARD_ID_SPACE
+
+
+class ShardMap:
+    """Bucket ranges -> shard index, and shard index -> gRPC address (comma-separated for replicas)."""
+
+    def __init__(self, shards: dict, ranges: list):
+        """`shards` maps index -> address; `ranges` is a list of (first_bucket, last_bucket, shard index or None)."""
+        self.shards = {int(index): address for index, address in shards.items()}
+        self.ranges = sorted((int(first), int(last), shard) for first, last, shard in ranges)
+        self._starts = [first for first, _, _ in self.ranges]
+
+        expected = 0
+        for first, last, shard in self.ranges:
+            if first != expected or last < first:
+                raise ValueError(f"Bucket ranges must cover 0..{BUCKETS - 1} without gaps or overlaps.")
+            if shard is not None and shard not in self.shards:
+                raise ValueError(f"Buckets {first}-{last} are assigned to unknown shard {shard}.")
+            expected = last + 1
+        if expected != BUCKETS:
+            raise ValueError(f"Bucket ranges must cover 0..{BUCKETS - 1} without gaps or overlaps.")
+
+    @classmethod
+    def even(cls, addresses: list):
+        """Spreads the buckets evenly over the given shard addresses (index = list position)."""
+        count = len(addresses)
+        ranges = [(i * BUCKETS // count, (i + 1) * BUCKETS // count - 1, i) for i in range(count)]
+        return cls(dict(enumerate(addresses)), ranges)
+
+    @classmethod
+    def load(cls, path: str):
+        with open(path) as f:
+            data = json.load(f)
+        return cls(data["shards"], [tuple(r) for r in data["ranges"]])
+
+    def save(self, path: str):
+        """Writes the map atomically, so readers never see a half-written file."""
+        data = {"shards": {str(i): a for i, a in sorted(self.shards.items())}, "ranges": [list(r) for r in self.ranges]}
+        temp_path = f"{path}.tmp"
+        with open(temp_path, "w") as f:
+            json.dump(data, f, indent=2)
+        os.replace(temp_path, path)
+
+    def shard_of_bucket(self, bucket: int):
+        """Shard index serving a bucket, or None while the bucket is being moved."""
+        return self.ranges[bisect.bisect_right(self._starts, bucket) - 1][2]
+
+    def shard_for(self, student_username: str):
+        return self.shard_of_bucket(student_bucket(student_username))
+
+    def reassign(self, first: int, last: int, shard):
+        """Returns a new map with buckets first..last assigned to `shard` (None = being moved)."""
+        ranges = []
+        for start, end, owner in self.ranges:
+            if end < first or start > last:
+                ranges.append((start, end, owner))
+                continue
+            if start < first:
+                ranges.append((start, first - 1, owner))
+            if end > last:
+                ranges.append((last + 1, end, owner))
+        ranges.append((first, last, shard))
+
+        # Merge neighbours with the same owner to keep the file small
+        merged = []
+        for start, end, owner in sorted(ranges):
+            if merged and merged[-1][2] == owner and merged[-1][1] + 1 == start:
+                merged[-1] = (merged[-1][0], end, owner)
+            else:
+                merged.append((start, end, owner))
+        return ShardMap(self.shards, merged)
+
+
+class ShardMapFile:
+    """A shard map loaded from disk and reloaded when the file changes (checked at most every `reload_seconds`)."""
+
+    def __init__(self, path: str, reload_seconds: float = 1.0):
+        self.path = path
+        self.reload_seconds = reload_seconds
+        self._lock = threading.Lock()
+        self._mtime = os.stat(path).st_mtime_ns
+        self._map = ShardMap.load(path)
+        self._checked_at = time.monotonic()
+
+    def current(self) -> ShardMap:
+        now = time.monotonic()
+        if now - self._checked_at >= self.reload_seconds:
+            with self._lock:
+                if now - self._checked_at >= self.reload_seconds:
+                    self._checked_at = now
+                    mtime = os.stat(self.path).st_mtime_ns
+                    if mtime != self._mtime:
+                        self._map = ShardMap.load(self.path)
+                        self._mtime = mtime
+        return self._map
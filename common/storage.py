@@ -0,0 +1,168 @@
+import os
+from sqlalchemy import create_engine, event, inspect
+from sqlalchemy.schema import CreateColumn
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import QueuePool
+
+# Shared SQLite storage layer used by every service.
+#
+# Each service gets two engines over the same database file:
+#   * a WRITER engine holding exactly one connection. Writers queue on the pool
+#     instead of fighting over SQLite's single write lock, and every write
+#     transaction starts with BEGIN IMMEDIATE so it never has to upgrade a
+#     read lock half way through (the classic SQLITE_BUSY deadlock).
+#   * a READER engine with a pool of read-only connections. With WAL enabled
+#     readers never block on the writer and the writer never blocks readers.
+
+# --- Tuning Defaults (overridable per service through environment variables) ---
+
+DEFAULT_SYNCHRONOUS = os.environ.get("SQLITE_SYNCHRONOUS", "NORMAL")  # NORMAL is durable in WAL mode except on power loss
+DEFAULT_MMAP_SIZE = int(os.environ.get("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))  # 256 MiB
+DEFAULT_CACHE_SIZE_KB = int(os.environ.get("SQLITE_CACHE_SIZE_KB", str(64 * 1024)))  # 64 MiB page cache per connection
+DEFAULT_BUSY_TIMEOUT_MS = int(os.environ.get("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+DEFAULT_READER_POOL_SIZE = int(os.environ.get("SQLITE_READER_POOL_SIZE", "8"))
+
+
+def database_path(env_var: str, default_path: str) -> str:
+    """Returns the database file path for a service, honoring an env override."""
+    return os.environ.get(env_var, default_path)
+
+
+def _apply_pragmas(dbapi_connection, synchronous, mmap_size, cache_size_kb, busy_timeout_ms, read_only):
+    """Applies the per-connection pragmas. journal_mode=WAL is persistent in the file."""
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute(f"PRAGMA synchronous={synchronous}")
+    cursor.execute(f"PRAGMA mmap_size={int(mmap_size)}")
+    # Negative cache_size is interpreted by SQLite as KiB rather than pages
+    cursor.execute(f"PRAGMA cache_size=-{int(cache_size_kb)}")
+    cursor.execute(f"PRAGMA busy_timeout={int(busy_timeout_ms)}")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    if read_only:
+        cursor.execute("PRAGMA query_only=ON")
+    cursor.close()
+
+
+class Storage:
+    """Tuned SQLite database with a single writer connection and a pool of readers."""
+
+    def __init__(
+        self,
+        path: str,
+        synchronous: str = DEFAULT_SYNCHRONOUS,
+        mmap_size: int = DEFAULT_MMAP_SIZE,
+        cache_size_kb: int = DEFAULT_CACHE_SIZE_KB,
+        busy_timeout_ms: int = DEFAULT_BUSY_TIMEOUT_MS,
+        reader_pool_size: int = DEFAULT_READER_POOL_SIZE,
+    ):
+        self.path = path
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+
+        url = f"sqlite:///{path}"
+        # The pysqlite driver manages transactions itself; we turn that off and
+        # issue BEGIN ourselves so the writer can use BEGIN IMMEDIATE.
+        connect_args = {"check_same_thread": False, "isolation_level": None}
+
+        self.writer = create_engine(
+            url,
+            connect_args=connect_args,
+            poolclass=QueuePool,
+            pool_size=1,
+            max_overflow=0,
+        )
+        self.reader = create_engine(
+            url,
+            connect_args=connect_args,
+            poolclass=QueuePool,
+            pool_size=reader_pool_size,
+            max_overflow=reader_pool_size,
+        )
+
+        for engine, read_only in ((self.writer, False), (self.reader, True)):
+            self._install_listeners(engine, synchronous, mmap_size, cache_size_kb, busy_timeout_ms, read_only)
+
+        # ORM sessions: writes go through the single writer connection,
+        # read-only sessions draw from the reader pool.
+        self.Session = sessionmaker(bind=self.writer)
+        self.ReadSession = sessionmaker(bind=self.reader)
+
+    def compile(self, statement):
+        """Precompiles a Core statement into a CompiledQuery bound to the reader pool."""
+        return CompiledQuery(statement, self.reader)
+
+    @staticmethod
+    def _install_listeners(engine, synchronous, mmap_size, cache_size_kb, busy_timeout_ms, read_only):
+        @event.listens_for(engine, "connect")
+        def on_connect(dbapi_connection, connection_record):
+            _apply_pragmas(dbapi_connection, synchronous, mmap_size, cache_size_kb, busy_timeout_ms, read_only)
+
+        begin_statement = "BEGIN" if read_only else "BEGIN IMMEDIATE"
+
+        @event.listens_for(engine, "begin")
+        def on_begin(connection):
+            connection.exec_driver_sql(begin_statement)
+
+    def create_all(self, metadata):
+        """Creates all tables of a declarative metadata on the writer connection."""
+        metadata.create_all(bind=self.writer)
+
+    def ensure_columns(self, table):
+        """Adds columns (and their indexes) that a model gained after its table was created.
+
+        create_all() never alters existing tables, so databases created by an older
+        version of a service are upgraded in place. New columns must be nullable or
+        carry a server_default.
+        """
+        with self.writer.begin() as conn:
+            existing = {c["name"] for c in inspect(conn).get_columns(table.name)}
+            for column in table.columns:
+                if column.name not in existing:
+                    ddl = CreateColumn(column).compile(dialect=self.writer.dialect)
+                    conn.exec_driver_sql(f"ALTER TABLE {table.name} ADD COLUMN {ddl}")
+        for index in table.indexes:
+            index.create(bind=self.writer, checkfirst=True)
+
+    def dispose(self):
+        """Closes every pooled connection (used by tools and benchmarks)."""
+        self.writer.dispose()
+        self.reader.dispose()
+
+
+class CompiledQuery:
+    """A Core select compiled to SQL once, executed straight on a pooled DBAPI cursor.
+
+    Hot read paths use this instead of ORM queries: there is no per-call statement
+    construction, cache-key generation, identity map or object hydration; rows come
+    back as plain tuples in the column order of the select.
+    """
+
+    def __init__(self, statement, engine):
+        compiled = statement.compile(dialect=engine.dialect)
+        self.engine = engine
+        self.sql = str(compiled)
+        # pysqlite uses positional "?" parameters; remember which name goes where
+        # together with any literal values baked into the statement.
+        self.param_names = tuple(compiled.positiontup or ())
+        self.defaults = {name: compiled.params[name] for name in self.param_names}
+
+    def _execute(self, params, fetch_all):
+        args = tuple(params[name] if name in params else self.defaults[name] for name in self.param_names)
+        connection = self.engine.raw_connection()
+        try:
+            cursor = connection.cursor()
+            try:
+                cursor.execute(self.sql, args)
+                return cursor.fetchall() if fetch_all else cursor.fetchone()
+            finally:
+                cursor.close()
+        finally:
+            connection.close()
+
+    def all(self, **params):
+        """Returns every row as a tuple."""
+        return self._execute(params, fetch_all=True)
+
+    def first(self, **params):
+        """Returns the first row as a tuple, or None."""
+        return self._execute(params, fetch_all=False)
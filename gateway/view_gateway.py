@@ -1,11 +1,29 @@
+import asyncio
+import csv
+import functools
+import inspect
 import grpc
+import hashlib
+import heapq
+import io
+import itertools
 import json
+import os
+import threading
 import time
-from typing import List, Optional, Union
-from fastapi import FastAPI, HTTPException, Depends
-from pydantic import BaseModel, Field
+import uuid
+from concurrent import futures
+from typing import Any, Dict, List, Optional, Union
+from urllib.parse import parse_qsl
+from fastapi import FastAPI, HTTPException, Depends, Header, Query, Request, Response, params
+from fastapi.encoders import jsonable_encoder
+from fastapi.routing import APIRoute
+from google.protobuf.message import DecodeError
+from pydantic import BaseModel, Field, ValidationError, create_model
 from datetime import datetime
 from starlette.middleware.cors import CORSMiddleware
+from starlette.concurrency import run_in_threadpool
+from starlette.routing import Match
 
 # IMPORTANT: Import generated gRPC code and protobuf messages
 from client import auth_pb2
@@ -14,6 +32,15 @@ from client import course_pb2
 from client import course_pb2_grpc
 from client import enrollment_pb2
 from client import enrollment_pb2_grpc
+from common.admission import AdmissionController, EndpointLimit, Rate, Rejected
+from common.balancing import service_channel
+from common.call_policy import MethodPolicy, deadline_scope, load_policies, metrics, policy_channel, remaining_deadline, submit_in_context
+from common.sharding import ShardMap, ShardMapFile, origin_shard
+
+try:
+    import orjson # Optional: a faster encoder for the large JSON responses
+except ImportError:
+    orjson = None
 
 # to run:
 # uvicorn view_gateway:app --reload --port 8888
@@ -21,9 +48,80 @@ from client import enrollment_pb2_grpc
 # CONFIG
 
 REST_PORT = 8888 # The port the frontend (browser) will connect to
-AUTH_SERVICE_ADDRESS = 'localhost:8000'
-COURSE_SERVICE_ADDRESS = 'localhost:8001'
-ENROLLMENT_SERVICE_ADDRESS = 'localhost:8002'
+AUTH_SERVICE_ADDRESS = os.environ.get("AUTH_SERVICE_ADDRESS", 'localhost:8000') # Comma-separated for replicas
+COURSE_SERVICE_ADDRESS = os.environ.get("COURSE_SERVICE_ADDRESS", 'localhost:8001') # Comma-separated for replicas
+ENROLLMENT_SERVICE_ADDRESS = os.environ.get("ENROLLMENT_SERVICE_ADDRESS", 'localhost:8002') # Comma-separated for replicas
+ENROLLMENT_SHARD_MAP = os.environ.get("ENROLLMENT_SHARD_MAP", "") # Shard map JSON (common/sharding.py); empty = one service at ENROLLMENT_SERVICE_ADDRESS
+LOAD_BALANCING_POLICY = os.environ.get("LOAD_BALANCING_POLICY", "least_outstanding") # Or round_robin (see common/balancing.py)
+SHARD_MAP_RELOAD_SECONDS = 1.0 # How often the shard map file is checked for changes
+ROSTER_PAGE_SIZE = 100 # Default records per /api/courses/{id}/roster page
+ROSTER_PAGE_MAX = 1000 # Largest page a client may ask for
+DASHBOARD_DEADLINE_SECONDS = float(os.environ.get("DASHBOARD_DEADLINE_SECONDS", "1.5")) # Sections not answered by then are left out
+BATCH_MAX_ITEMS = 25 # Most sub-requests in one /api/batch call
+BATCH_DEADLINE_SECONDS = 10.0 # The whole batch must finish within this; unfinished items answer 504
+BATCH_EXCLUDED_PATHS = frozenset({"/api/login", "/api/batch"}) # Paths a batch may not call
+ADMISSION_CONTROL = os.environ.get("ADMISSION_CONTROL", "1") != "0" # 0 = no rate limits (see Admission Control)
+ENROLL_FAIR_QUEUE = os.environ.get("ENROLL_FAIR_QUEUE", "1") != "0" # 0 = reject enrollments over the budget instead of queueing them
+ENROLL_QUEUE_SECONDS = 5.0 # Longest an enrollment waits in the fair queue
+ENROLL_BUDGET_PER_SECOND = float(os.environ.get("ENROLL_BUDGET_PER_SECOND", "500")) # Enrollments passed to the backend per second, all users
+
+# Admission limits per endpoint (see common/admission.py): a rate per user by role,
+# and a budget for everyone. Enrollments over the budget queue up in arrival order
+# (ENROLL_FAIR_QUEUE); everything else over a limit is answered 429 with Retry-After.
+ENROLL_QUEUE = ENROLL_QUEUE_SECONDS if ENROLL_FAIR_QUEUE else None
+ADMISSION_LIMITS = {
+    "/api/enroll": EndpointLimit(
+        per_user={"student": Rate(1, burst=5)},
+        total=Rate(ENROLL_BUDGET_PER_SECOND, burst=100), queue_seconds=ENROLL_QUEUE,
+    ),
+    "/api/enroll/batch": EndpointLimit(
+        per_user={"student": Rate(0.2, burst=2)},
+        total=Rate(ENROLL_BUDGET_PER_SECOND / 10, burst=10), queue_seconds=ENROLL_QUEUE,
+    ),
+    "/api/waitlist": EndpointLimit(per_user={"student": Rate(1, burst=5)}, total=Rate(ENROLL_BUDGET_PER_SECOND, burst=100)),
+    "/api/courses": EndpointLimit(
+        per_user={"student": Rate(1, burst=10), "faculty": Rate(2, burst=20)}, total=Rate(2000, burst=500),
+    ),
+    "/api/grades": EndpointLimit(per_user={"student": Rate(1, burst=10)}, total=Rate(2000, burst=500)),
+    "/api/dashboard": EndpointLimit(
+        per_user={"student": Rate(0.5, burst=5), "faculty": Rate(0.5, burst=5)}, total=Rate(1000, burst=200),
+    ),
+    "/api/batch": EndpointLimit(per_user={"student": Rate(0.5, burst=5), "faculty": Rate(1, burst=10)}),
+}
+
+# Deadline, hedging and retries of every backend call, per method (see common/call_policy.py);
+# override per method with the CALL_POLICIES environment variable. Only idempotent
+# methods may be hedged: reads, and the calls the gateway always sends with an idempotency key.
+KEYED_WRITE = MethodPolicy(timeout=10.0, attempt_timeout=4.0, hedge_after=1.0, max_attempts=3)
+HEDGED_READ = MethodPolicy(timeout=3.0, hedge_after=0.3, max_attempts=2)
+CALL_POLICIES = load_policies({
+    "*": MethodPolicy(timeout=5.0),
+    "auth.AuthService/VerifyToken": MethodPolicy(timeout=2.0, hedge_after=0.2, max_attempts=2),
+    "course.CourseService/ListCourses": HEDGED_READ,
+    "course.CourseService/GetCatalogVersion": HEDGED_READ,
+    "enrollment.EnrollmentService/Enroll": KEYED_WRITE,
+    "enrollment.EnrollmentService/UploadGrade": KEYED_WRITE,
+    "enrollment.EnrollmentService/UploadGrades": MethodPolicy(timeout=60.0), # Whole grade sheet
+    "enrollment.EnrollmentService/ListCourseRoster": MethodPolicy(timeout=30.0),
+    "enrollment.EnrollmentService/GetEnrollment": HEDGED_READ,
+    "enrollment.EnrollmentService/GetEnrollmentStatus": HEDGED_READ,
+    "enrollment.EnrollmentService/ViewGrades": HEDGED_READ,
+    "enrollment.EnrollmentService/GetTranscriptSummary": HEDGED_READ,
+    "enrollment.EnrollmentService/GetCourseClosure": HEDGED_READ,
+    "enrollment.EnrollmentService/GetGradesVersion": HEDGED_READ,
+})
+# Read-only methods whose identical concurrent calls share one backend call (see Request Coalescing)
+COALESCED_METHODS = frozenset({
+    "auth.AuthService/VerifyToken",
+    "course.CourseService/ListCourses",
+    "course.CourseService/GetCatalogVersion",
+    "enrollment.EnrollmentService/GetEnrollment",
+    "enrollment.EnrollmentService/GetEnrollmentStatus",
+    "enrollment.EnrollmentService/ViewGrades",
+    "enrollment.EnrollmentService/GetTranscriptSummary",
+    "enrollment.EnrollmentService/GetCourseClosure",
+    "enrollment.EnrollmentService/GetGradesVersion",
+})
 
 app = FastAPI(title="View Node / REST-to-gRPC Gateway")
 
@@ -36,20 +134,257 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# --- Request Coalescing ---
+# When registration opens, hundreds of users load the course list and have the
+# same kind of token verified at the same moment. Identical read calls that are
+# in flight at the same time (same backend address, same method, same request
+# bytes) share one backend call: the first caller makes it and the others wait
+# for its result, so the backend sees one call per distinct request. Only
+# COALESCED_METHODS are coalesced, and nothing is cached: a call arriving after
+# the shared one has finished makes a new one.
+#
+# The shared call runs under the first caller's deadline. A caller waits for it
+# no longer than its own deadline, and a caller with time left when the shared
+# call ran out of time makes its own call instead of failing with it.
+
+class SingleFlight:
+    """Runs one call per key at a time; concurrent callers with the same key get its result."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {} # key -> Future of the call in flight
+
+    def do(self, key, call, wait=None):
+        """Returns (result, shared): `shared` is True if another caller's call was joined.
+
+        A joining caller waits at most `wait` seconds, then gets futures.TimeoutError.
+        """
+        with self._lock:
+            future = self._calls.get(key)
+            if future is None:
+                future = self._calls[key] = futures.Future()
+                leader = True
+            else:
+                leader = False
+        if not leader:
+            return future.result(timeout=wait), True
+
+        try:
+            result = call()
+        except BaseException as e:
+            with self._lock:
+                del self._calls[key]
+            future.set_exception(e)
+            raise
+        with self._lock:
+            del self._calls[key] # Callers from now on make a new call
+        future.set_result(result)
+        return result, False
+
+single_flight = SingleFlight()
+
+class CoalescingChannel(grpc.Channel):
+    """Wraps a backend channel so that plain calls of COALESCED_METHODS go through single_flight."""
+
+    def __init__(self, channel, backend: str, address: str):
+        self.channel = channel
+        self.backend = backend
+        self.address = address # Only calls to the same backend replicas may share an answer
+
+    def unary_unary(self, method, request_serializer=None, response_deserializer=None, _registered_method=False):
+        inner = self.channel.unary_unary(method, request_serializer, response_deserializer, _registered_method=_registered_method)
+        if method.lstrip("/") not in COALESCED_METHODS:
+            return inner
+        return _CoalescedCall(self.backend, self.address, method.lstrip("/"), inner, request_serializer, response_deserializer is None)
+
+    def unary_stream(self, method, request_serializer=None, response_deserializer=None, _registered_method=False):
+        return self.channel.unary_stream(method, request_serializer, response_deserializer, _registered_method=_registered_method)
+
+    def stream_unary(self, method, request_serializer=None, response_deserializer=None, _registered_method=False):
+        return self.channel.stream_unary(method, request_serializer, response_deserializer, _registered_method=_registered_method)
+
+    def stream_stream(self, method, request_serializer=None, response_deserializer=None, _registered_method=False):
+        return self.channel.stream_stream(method, request_serializer, response_deserializer, _registered_method=_registered_method)
+
+    def subscribe(self, callback, try_to_connect=False):
+        self.channel.subscribe(callback, try_to_connect)
+
+    def unsubscribe(self, callback):
+        self.channel.unsubscribe(callback)
+
+    def close(self):
+        self.channel.close()
+
+class _CoalescedCall:
+    def __init__(self, backend: str, address: str, method: str, inner, request_serializer, undecoded: bool):
+        self.backend = backend
+        self.address = address
+        self.method = method
+        self.inner = inner
+        self.request_serializer = request_serializer
+        self.undecoded = undecoded # Returns the response bytes, so it must not share calls with decoding callers
+
+    def __call__(self, request, timeout=None, metadata=None, **kwargs):
+        if metadata:
+            return self.inner(request, timeout=timeout, metadata=metadata, **kwargs) # Metadata may change the answer
+        limits = [t for t in (timeout, remaining_deadline()) if t is not None]
+        deadline = time.monotonic() + min(limits) if limits else None
+        time_left = lambda: None if deadline is None else max(deadline - time.monotonic(), 0.0)
+        led = []
+
+        def lead():
+            led.append(True)
+            return self.inner(request, timeout=timeout, **kwargs)
+
+        key = (self.address, self.method, self.undecoded, self.request_serializer(request))
+        try:
+            response, shared = single_flight.do(key, lead, wait=time_left())
+        except futures.TimeoutError:
+            # The shared call outlived this caller's deadline: its own call ends it with DEADLINE_EXCEEDED
+            return self.inner(request, timeout=time_left(), **kwargs)
+        except grpc.RpcError as e:
+            if led or e.code() != grpc.StatusCode.DEADLINE_EXCEEDED or time_left() == 0.0:
+                raise
+            # The shared call ran out of the first caller's time; this caller has some left
+            return self.inner(request, timeout=time_left(), **kwargs)
+        if shared:
+            metrics.count(self.backend, self.method, "coalesced")
+        return response
+
+    def with_call(self, *args, **kwargs):
+        return self.inner.with_call(*args, **kwargs)
+
+    def future(self, *args, **kwargs):
+        return self.inner.future(*args, **kwargs)
+
 # --- gRPC Stub Initialization ---
 
-# Helper function to get gRPC stubs
+@functools.lru_cache(maxsize=None)
+def backend_channel(backend: str, address: str):
+    """Returns the channel to one backend, created once.
+
+    Calls are balanced over the replicas listed in `address` (see common/balancing.py),
+    follow CALL_POLICIES and are coalesced where allowed.
+    """
+    channel = policy_channel(backend, service_channel(address, LOAD_BALANCING_POLICY), CALL_POLICIES)
+    return CoalescingChannel(channel, backend, address)
+
+class UndecodedChannel(grpc.Channel):
+    """Wraps a backend channel so that unary calls return the response bytes as received.
+
+    Stubs built on it serve the protobuf responses (see Protobuf Content Negotiation).
+    """
+
+    def __init__(self, channel):
+        self.channel = channel
+
+    def unary_unary(self, method, request_serializer=None, response_deserializer=None, _registered_method=False):
+        return self.channel.unary_unary(method, request_serializer, None, _registered_method=_registered_method)
+
+    def unary_stream(self, method, request_serializer=None, response_deserializer=None, _registered_method=False):
+        return self.channel.unary_stream(method, request_serializer, response_deserializer, _registered_method=_registered_method)
+
+    def stream_unary(self, method, request_serializer=None, response_deserializer=None, _registered_method=False):
+        return self.channel.stream_unary(method, request_serializer, None, _registered_method=_registered_method)
+
+    def stream_stream(self, method, request_serializer=None, response_deserializer=None, _registered_method=False):
+        return self.channel.stream_stream(method, request_serializer, response_deserializer, _registered_method=_registered_method)
+
+    def subscribe(self, callback, try_to_connect=False):
+        self.channel.subscribe(callback, try_to_connect)
+
+    def unsubscribe(self, callback):
+        self.channel.unsubscribe(callback)
+
+    def close(self):
+        self.channel.close()
+
+# Helper functions to get gRPC stubs (created once); `undecoded` stubs return response bytes
+@functools.lru_cache(maxsize=None)
 def get_auth_stub():
-    channel = grpc.insecure_channel(AUTH_SERVICE_ADDRESS)
-    return auth_pb2_grpc.AuthServiceStub(channel)
+    return auth_pb2_grpc.AuthServiceStub(backend_channel("auth", AUTH_SERVICE_ADDRESS))
+
+@functools.lru_cache(maxsize=None)
+def get_course_stub(undecoded: bool = False):
+    channel = backend_channel("course", COURSE_SERVICE_ADDRESS)
+    return course_pb2_grpc.CourseServiceStub(UndecodedChannel(channel) if undecoded else channel)
+
+# --- Enrollment Shard Routing ---
+# Students are spread over the enrollment shards by a stable hash of their
+# username (see common/sharding.py). Student requests go to the student's shard;
+# course-wide queries are sent to every shard and the answers merged.
+
+shard_map_file = ShardMapFile(ENROLLMENT_SHARD_MAP, SHARD_MAP_RELOAD_SECONDS) if ENROLLMENT_SHARD_MAP else None
+single_shard_map = ShardMap.even([ENROLLMENT_SERVICE_ADDRESS])
+shard_call_pool = futures.ThreadPoolExecutor(max_workers=32, thread_name_prefix="shard-call")
+
+def enrollment_shard_map() -> ShardMap:
+    return shard_map_file.current() if shard_map_file else single_shard_map
+
+@functools.lru_cache(maxsize=None)
+def enrollment_stub_at(address: str, undecoded: bool = False):
+    """Stub for one shard; its address may list the shard's replicas. Each shard has its own circuit breaker."""
+    backend = f"enrollment shard {address}" if shard_map_file else "enrollment"
+    channel = backend_channel(backend, address)
+    return enrollment_pb2_grpc.EnrollmentServiceStub(UndecodedChannel(channel) if undecoded else channel)
+
+def get_enrollment_stub(student_username: str, undecoded: bool = False):
+    """Returns a stub for the enrollment shard that holds a student's records."""
+    shard_map = enrollment_shard_map()
+    shard = shard_map.shard_for(student_username)
+    if shard is None:
+        raise HTTPException(status_code=503, detail="Your records are being moved to another server. Try again shortly.")
+    return enrollment_stub_at(shard_map.shards[shard], undecoded)
+
+def all_enrollment_stubs() -> list:
+    """Stubs for every enrollment shard, in shard index order."""
+    shard_map = enrollment_shard_map()
+    return [enrollment_stub_at(address) for _, address in sorted(shard_map.shards.items())]
+
+def scatter(call, stubs: list) -> list:
+    """Runs `call(stub)` against every shard concurrently; returns the results in stub order.
 
-def get_course_stub():
-    channel = grpc.insecure_channel(COURSE_SERVICE_ADDRESS)
-    return course_pb2_grpc.CourseServiceStub(channel)
+    A shard answering NOT_FOUND yields None; any other error is raised. The calls
+    run within the caller's deadline_scope.
+    """
+    def attempt(stub):
+        try:
+            return call(stub)
+        except grpc.RpcError as e:
+            if e.code() == grpc.StatusCode.NOT_FOUND:
+                return None
+            raise
+    if len(stubs) == 1:
+        return [attempt(stubs[0])]
+    jobs = [submit_in_context(shard_call_pool, attempt, stub) for stub in stubs]
+    return [job.result() for job in jobs]
 
-def get_enrollment_stub():
-    channel = grpc.insecure_channel(ENROLLMENT_SERVICE_ADDRESS)
-    return enrollment_pb2_grpc.EnrollmentServiceStub(channel)
+def locate_enrollment(enrollment_id: int):
+    """Finds the shard holding an enrollment; returns (shard address, record).
+
+    The shard that allocated the id is asked first; the others only if the record
+    has been moved there by a rebalance.
+    """
+    shard_map = enrollment_shard_map()
+    origin = origin_shard(enrollment_id)
+    last_error = None
+    for index in sorted(shard_map.shards, key=lambda i: i != origin):
+        address = shard_map.shards[index]
+        try:
+            request = enrollment_pb2.GetEnrollmentRequest(enrollment_id=enrollment_id)
+            return address, enrollment_stub_at(address).GetEnrollment(request).record
+        except grpc.RpcError as e:
+            if e.code() != grpc.StatusCode.NOT_FOUND:
+                raise
+            last_error = e
+    raise last_error
+
+def stub_for_enrollment(enrollment_id: int, undecoded: bool = False):
+    """Stub for the shard holding an enrollment (no lookup needed with a single shard)."""
+    shard_map = enrollment_shard_map()
+    if len(shard_map.shards) == 1:
+        return enrollment_stub_at(next(iter(shard_map.shards.values())), undecoded)
+    return enrollment_stub_at(locate_enrollment(enrollment_id)[0], undecoded)
 
 # --- Utility Functions ---
 
@@ -64,14 +399,75 @@ def handle_grpc_error(e: grpc.RpcError):
         raise HTTPException(status_code=404, detail=details or "Resource not found.")
     elif code == grpc.StatusCode.ALREADY_EXISTS:
         raise HTTPException(status_code=409, detail=details or "Resource already exists.")
+    elif code == grpc.StatusCode.FAILED_PRECONDITION:
+        raise HTTPException(status_code=409, detail=details or "Request conflicts with the current state.")
+    elif code == grpc.StatusCode.INVALID_ARGUMENT:
+        raise HTTPException(status_code=400, detail=details or "Invalid request.")
     elif code == grpc.StatusCode.RESOURCE_EXHAUSTED:
         raise HTTPException(status_code=429, detail=details or "Resource exhausted (e.g., course full).")
     elif code == grpc.StatusCode.UNAVAILABLE:
         raise HTTPException(status_code=503, detail=details or "Backend service is currently unavailable.")
+    elif code == grpc.StatusCode.DEADLINE_EXCEEDED:
+        raise HTTPException(status_code=504, detail=details or "Backend service did not answer in time.")
     else:
         # Catch-all for other internal errors
         raise HTTPException(status_code=500, detail=f"Internal Service Error: {code.name} - {details}")
 
+fan_out_pool = futures.ThreadPoolExecutor(max_workers=32, thread_name_prefix="fan-out")
+
+def fan_out(calls: dict, timeout: float) -> tuple:
+    """Runs every `calls[name]()` concurrently and waits at most `timeout` seconds for them.
+
+    Returns (results, errors): the results of the calls that finished, and for the
+    others an error message by name. A call still running at the deadline is left
+    to finish on its own. The calls run within the caller's deadline_scope, so one
+    around fan_out() bounds their backend calls as well.
+    """
+    jobs = {name: submit_in_context(fan_out_pool, call) for name, call in calls.items()}
+    futures.wait(jobs.values(), timeout=timeout)
+    results, errors = {}, {}
+    for name, job in jobs.items():
+        if not job.done():
+            errors[name] = f"No answer within {timeout:g}s."
+            continue
+        try:
+            results[name] = job.result()
+        except grpc.RpcError as e:
+            errors[name] = e.details() or e.code().name
+        except HTTPException as e:
+            errors[name] = e.detail
+    return results, errors
+
+def parse_grade_sheet(content_type: str, body: bytes) -> list:
+    """Parses a CSV or JSON grade sheet.
+
+    Returns one entry per row: an (enrollment_id, grade) tuple, or an error message
+    for rows that cannot be parsed. CSV needs 'enrollment_id' and 'grade' columns;
+    JSON is a list of {"enrollment_id", "grade"} objects (optionally under "grades").
+    """
+    if "csv" in content_type:
+        try:
+            raw_rows = list(csv.DictReader(io.StringIO(body.decode("utf-8-sig"))))
+        except (UnicodeDecodeError, csv.Error) as e:
+            raise HTTPException(status_code=400, detail=f"Invalid CSV grade sheet: {e}")
+    else:
+        try:
+            raw_rows = json.loads(body)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=f"Invalid JSON grade sheet: {e}")
+        if isinstance(raw_rows, dict):
+            raw_rows = raw_rows.get("grades")
+        if not isinstance(raw_rows, list):
+            raise HTTPException(status_code=400, detail="Grade sheet must be a list of {enrollment_id, grade} rows.")
+
+    rows = []
+    for raw in raw_rows:
+        try:
+            rows.append((int(raw["enrollment_id"]), float(raw["grade"])))
+        except (KeyError, TypeError, ValueError):
+            rows.append("Row needs a numeric 'enrollment_id' and 'grade'.")
+    return rows
+
 # --- Pydantic Schemas (REST Data Models) ---
 
 class LoginRequest(BaseModel):
@@ -97,11 +493,44 @@ class CourseOut(BaseModel):
 
 class EnrollmentRequest(BaseModel):
     course_id: int
+    queued: bool = Field(default=False, description="Queue the enrollment and return a ticket immediately")
 
 class EnrollmentResponse(BaseModel):
     success: bool
     message: str
     enrollment_id: int
+    ticket_id: str = Field(default="", description="Set for queued enrollments; poll /api/enroll/status/{ticket_id}")
+
+class BatchEnrollmentRequest(BaseModel):
+    course_ids: List[int] = Field(..., min_length=1)
+    all_or_nothing: bool = Field(default=True, description="Enroll in every course or in none of them")
+
+class CourseEnrollResultOut(BaseModel):
+    course_id: int
+    success: bool
+    message: str
+    enrollment_id: int
+
+class BatchEnrollmentResponse(BaseModel):
+    success: bool
+    message: str
+    results: List[CourseEnrollResultOut]
+
+class WaitlistRequest(BaseModel):
+    course_id: int
+
+class WaitlistResponse(BaseModel):
+    success: bool
+    message: str
+    waitlist_id: int
+    position: int = Field(..., description="1 = next student to be enrolled when a seat frees up")
+
+class EnrollmentStatusOut(BaseModel):
+    ticket_id: str
+    status: str # QUEUED, ENROLLED or FAILED
+    message: str
+    enrollment_id: int
+    course_id: int
 
 class GradeRecordOut(BaseModel):
     enrollment_id: int
@@ -112,10 +541,194 @@ class GradeRecordOut(BaseModel):
     grade: float = Field(default=0.0, description="Numerical grade, 0.0 to 4.0")
     status: str
 
+class RosterPage(BaseModel):
+    records: List[GradeRecordOut]
+    next_cursor: Optional[int] = Field(default=None, description="Pass as ?cursor= for the next page; null on the last page")
+
+class TranscriptSummaryOut(BaseModel):
+    gpa: float
+    completed_count: int
+    in_progress_count: int
+
+class DashboardOut(BaseModel):
+    user: VerificationResult
+    courses: Optional[List[CourseOut]] = None
+    grades: Optional[List[GradeRecordOut]] = None # Students only
+    transcript: Optional[TranscriptSummaryOut] = None # Students only
+    partial: bool = Field(default=False, description="True when a section is missing; see errors")
+    errors: Dict[str, str] = Field(default_factory=dict, description="Why each missing section is missing")
+
+class BatchItem(BaseModel):
+    method: str = "GET"
+    path: str = Field(..., description="Gateway path, optionally with a query string, e.g. /api/enrollments/7")
+    body: Optional[Any] = None # JSON body for POST sub-requests
+    idempotency_key: Optional[str] = Field(default=None, description="Sent as the Idempotency-Key of a write that takes one")
+
+class BatchRequest(BaseModel):
+    requests: List[BatchItem] = Field(..., min_length=1)
+
+class BatchItemResult(BaseModel):
+    status: int # The HTTP status the sub-request would have answered with
+    body: Any = None
+
+class BatchResponse(BaseModel):
+    results: List[BatchItemResult] # In request order
+
+class CourseClosureOut(BaseModel):
+    course_id: int
+    status: str # RUNNING or DONE
+    total_enrollments: int
+    dropped_count: int
+    cancelled_waitlist: int
+
 class UploadGradeRequest(BaseModel):
     enrollment_id: int
     grade: float = Field(..., ge=0.0, le=4.0)
 
+class GradeSheetRowResult(BaseModel):
+    row: int # 0-based row of the uploaded sheet (CSV header excluded)
+    enrollment_id: int
+    success: bool
+    message: str
+    grade: float
+
+class GradeSheetUploadResponse(BaseModel):
+    success: bool # True when every row was applied
+    applied: int
+    failed: int
+    results: List[GradeSheetRowResult]
+
+
+# --- Fast JSON Responses ---
+# The large list responses (the catalog, a student's grades, the dashboard)
+# skip building a Pydantic model per record and FastAPI validating and
+# serializing each one again: every protobuf record becomes a plain dict with
+# exactly the fields of its documented model, and the response is encoded in
+# one pass. Plain dicts are also what the encoders handle fastest; rows as
+# __slots__ objects took about four times as long to encode, as both orjson and
+# json need a dict per object from a `default` hook. The endpoints keep their
+# response_model, so the documented schema is unchanged.
+
+class EncodedJSONResponse(Response):
+    """A response whose body is already-encoded JSON."""
+    media_type = "application/json"
+
+def encode_json(content) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(content)
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+def course_row(c) -> dict:
+    """A course.Course as a CourseOut-shaped dict."""
+    return {"id": c.id, "code": c.code, "title": c.title, "slots": c.slots, "is_open": c.is_open}
+
+def grade_record_row(r) -> dict:
+    """An enrollment.GradeRecord as a GradeRecordOut-shaped dict."""
+    return {
+        "enrollment_id": r.enrollment_id,
+        "course_id": r.course_id,
+        "course_code": r.course_code,
+        "course_title": r.course_title,
+        "student_username": r.student_username,
+        "grade": r.grade, # 0.0 when no grade is assigned yet
+        "status": r.status,
+    }
+
+def records_response(rows: list) -> EncodedJSONResponse:
+    return EncodedJSONResponse(encode_json(rows))
+
+
+# --- Protobuf Content Negotiation ---
+# Machine clients can skip JSON altogether. Endpoints that answer with one
+# backend response send it, on `Accept: application/x-protobuf`, as the very
+# bytes the backend returned (an undecoded stub never parses them), and the
+# write endpoints also take the backend's request message as a protobuf body.
+# Fields the gateway derives from the token (the student or faculty username)
+# are always overwritten. Errors stay JSON.
+#
+# A protobuf body is served by an endpoint of its own: a ProtobufBodyRoute
+# registered for the same path ahead of the JSON endpoint, which it leaves every
+# other request to. The JSON endpoints keep their plain model bodies, so their
+# documented schema and validation errors are those of a JSON-only endpoint.
+
+PROTOBUF_MEDIA_TYPE = "application/x-protobuf"
+
+class ProtobufResponse(Response):
+    """A response whose body is a serialized protobuf message."""
+    media_type = PROTOBUF_MEDIA_TYPE
+
+def wants_protobuf(accept: Optional[str]) -> bool:
+    return bool(accept) and PROTOBUF_MEDIA_TYPE in accept
+
+class ProtobufBodyRoute(APIRoute):
+    """A route that matches only requests with a protobuf body."""
+
+    def matches(self, scope):
+        match, child_scope = super().matches(scope)
+        content_type = dict(scope.get("headers") or ()).get(b"content-type", b"").decode("latin-1")
+        if PROTOBUF_MEDIA_TYPE not in content_type:
+            return Match.NONE, {}
+        return match, child_scope
+
+def protobuf_post(path: str, **kwargs):
+    """Registers the POST endpoint for `path` requests with a protobuf body.
+
+    Declare it before the JSON endpoint of `path`, which would take these requests too.
+    """
+    def register(endpoint):
+        app.router.add_api_route(
+            path, endpoint, methods=["POST"], include_in_schema=False, route_class_override=ProtobufBodyRoute, **kwargs
+        )
+        return endpoint
+    return register
+
+def protobuf_body(message_type):
+    """Dependency that parses the request body into a `message_type` message."""
+    async def parse(request: Request):
+        message = message_type()
+        try:
+            message.ParseFromString(await request.body())
+        except DecodeError:
+            raise HTTPException(status_code=400, detail=f"Body is not a valid {message_type.DESCRIPTOR.full_name}.")
+        return message
+    return parse
+
+
+# --- Conditional GET ---
+# /api/courses and /api/grades carry strong ETags made from the version the
+# backend reports with the data: the catalog version, or the version of the
+# student's records. A request with If-None-Match only asks the backend for the
+# current version (one index lookup) and gets 304 Not Modified while it still
+# matches, instead of a full ListCourses or ViewGrades. Only JSON responses are
+# tagged: protobuf responses are passed on undecoded, so their version is not read.
+
+def catalog_etag(version: int) -> str:
+    return f'"catalog-{version}"'
+
+def grades_etag(student_username: str, version: int) -> str:
+    """Versions are counted per student, so the tag also names the (hashed) student."""
+    student = hashlib.blake2s(student_username.encode(), digest_size=6).hexdigest()
+    return f'"grades-{student}-{version}"'
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Weak comparison, as If-None-Match requires."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return any(tag.strip().removeprefix("W/") == etag for tag in if_none_match.split(","))
+
+def validator_headers(etag: str, private: bool) -> dict:
+    """Caches must revalidate every time; private (per-user) responses vary with the token."""
+    return {
+        "ETag": etag,
+        "Cache-Control": "private, no-cache" if private else "no-cache",
+        "Vary": "Accept, Authorization" if private else "Accept",
+    }
+
+def not_modified(etag: str, private: bool) -> Response:
+    return Response(status_code=304, headers=validator_headers(etag, private))
+
 
 # --- Dependency: Token Verification and User Extraction ---
 
@@ -149,16 +762,50 @@ def verify_token_dependency(auth_token: Optional[str] = Depends(lambda header: h
         raise HTTPException(status_code=500, detail="Token verification failed.")
 
 
+# --- Admission Control ---
+# When enrollment opens, every student clicks Enroll (and reloads the course
+# list) at once. The gateway admits requests per verified user and endpoint
+# before any backend call is made: a user over their rate, or anyone over the
+# endpoint's budget, gets 429 with Retry-After. Enrollments over the budget are
+# not rejected but wait their turn, in arrival order, up to ENROLL_QUEUE_SECONDS.
+# Limits apply to the route (/api/enroll, not the path with its parameters), to
+# batch sub-requests as well, and are kept in memory per gateway process.
+
+admission = AdmissionController(ADMISSION_LIMITS if ADMISSION_CONTROL else {})
+
+def too_many_requests(e: Rejected) -> HTTPException:
+    return HTTPException(status_code=429, detail=e.message, headers={"Retry-After": e.retry_after_header})
+
+async def admission_control(request: Request, user: VerificationResult = Depends(verify_token_dependency)):
+    """Admits the request under its route's limits, waiting its turn if it was queued; 429 otherwise."""
+    try:
+        wait = admission.admit(request.scope["route"].path, user.username, user.role)
+    except Rejected as e:
+        raise too_many_requests(e)
+    if wait:
+        await asyncio.sleep(wait)
+
+
 # --- API ENDPOINTS (The REST Layer) ---
 
 @app.get("/")
 def health_check():
     return {"status": "View Node (REST Gateway) is running", "port": REST_PORT}
 
+@app.get("/api/metrics")
+def call_metrics():
+    """Backend call counters per method and the state of every backend's circuit breaker."""
+    return metrics.snapshot()
+
+@app.get("/api/admission")
+def admission_metrics():
+    """Requests admitted, queued and rejected per limited endpoint, and the users holding rate state."""
+    return admission.snapshot()
+
 # --- 1. AUTH Endpoints ---
 
 @app.post("/api/login", response_model=LoginResponse)
-async def login(request: LoginRequest):
+def login(request: LoginRequest):
     """Receives REST login request and calls Auth gRPC Service."""
     auth_stub = get_auth_stub()
     try:
@@ -180,125 +827,702 @@ async def verify_auth(user: VerificationResult = Depends(verify_token_dependency
 
 # --- 2. COURSE Endpoints (Requires Auth) ---
 
-@app.get("/api/courses", response_model=List[CourseOut])
-async def list_open_courses(user: VerificationResult = Depends(verify_token_dependency)):
-    """Lists open courses by calling Course gRPC Service."""
-    course_stub = get_course_stub()
+@app.get("/api/courses", response_model=List[CourseOut], dependencies=[Depends(admission_control)])
+def list_open_courses(
+    user: VerificationResult = Depends(verify_token_dependency),
+    accept: Optional[str] = Header(default=None),
+    if_none_match: Optional[str] = Header(default=None)
+):
+    """Lists open courses by calling Course gRPC Service.
+
+    A plain def, so FastAPI runs it on its thread pool: concurrent requests are then
+    really concurrent and share one ListCourses call (see Request Coalescing).
+    """
     try:
+        if wants_protobuf(accept):
+            return ProtobufResponse(get_course_stub(undecoded=True).ListCourses(course_pb2.ListCoursesRequest()))
+
+        course_stub = get_course_stub()
+        if if_none_match:
+            version = course_stub.GetCatalogVersion(course_pb2.CatalogVersionRequest()).version
+            if version and etag_matches(if_none_match, catalog_etag(version)):
+                return not_modified(catalog_etag(version), private=False)
         list_response = course_stub.ListCourses(course_pb2.ListCoursesRequest())
         
-        # Convert gRPC Course message to Pydantic CourseOut model
-        return [
-            CourseOut(
-                id=c.id, code=c.code, title=c.title, slots=c.slots, is_open=c.is_open
-            ) for c in list_response.courses
-        ]
+        # Encode the gRPC Course messages straight to CourseOut JSON (see Fast JSON Responses)
+        response = records_response([course_row(c) for c in list_response.courses])
+        if list_response.version: # 0: a write raced the listing, so it matches no version
+            response.headers.update(validator_headers(catalog_etag(list_response.version), private=False))
+        return response
     except grpc.RpcError as e:
         handle_grpc_error(e)
 
 
+@app.get("/api/dashboard", response_model=DashboardOut, dependencies=[Depends(admission_control)])
+def dashboard(user: VerificationResult = Depends(verify_token_dependency)):
+    """Everything the landing page shows, in one request.
+
+    The token is verified once; the course list and, for students, the grades and
+    transcript summary are then fetched from the backends concurrently. Whatever
+    has not arrived within DASHBOARD_DEADLINE_SECONDS (or failed) is left out and
+    named in `errors`, so one slow backend does not hold up the whole page.
+    """
+    timeout = DASHBOARD_DEADLINE_SECONDS
+    calls = {"courses": lambda: get_course_stub().ListCourses(course_pb2.ListCoursesRequest())}
+    if user.role == "student":
+        enroll_stub = get_enrollment_stub(user.username)
+
+        def grades():
+            try:
+                return enroll_stub.ViewGrades(enrollment_pb2.ViewGradesRequest(student_username=user.username)).records
+            except grpc.RpcError as e:
+                if e.code() == grpc.StatusCode.NOT_FOUND:
+                    return [] # No enrollments yet
+                raise
+
+        calls["grades"] = grades
+        calls["transcript"] = lambda: enroll_stub.GetTranscriptSummary(
+            enrollment_pb2.TranscriptSummaryRequest(student_username=user.username)
+        )
+    with deadline_scope(time.monotonic() + timeout): # Bounds every backend call of the page, however late it starts
+        results, errors = fan_out(calls, timeout)
+
+    # Encode the page straight to DashboardOut JSON (see Fast JSON Responses)
+    transcript = results.get("transcript")
+    return EncodedJSONResponse(encode_json({
+        "user": {"valid": user.valid, "username": user.username, "role": user.role},
+        "courses": [course_row(c) for c in results["courses"].courses] if "courses" in results else None,
+        "grades": [grade_record_row(r) for r in results["grades"]] if "grades" in results else None,
+        "transcript": None if transcript is None else {
+            "gpa": transcript.gpa,
+            "completed_count": transcript.completed_count,
+            "in_progress_count": transcript.in_progress_count,
+        },
+        "partial": bool(errors),
+        "errors": errors,
+    }))
+
+
 # --- 3. ENROLLMENT Endpoints (Requires Auth) ---
 
-@app.post("/api/enroll", response_model=EnrollmentResponse)
-async def enroll_student(
+def send_enroll(enroll_request, user: VerificationResult, idempotency_key: Optional[str], accept: Optional[str]):
+    """Sends an enrollment.EnrollRequest for the student; answers in the format the client accepts."""
+    if user.role != "student":
+        raise HTTPException(status_code=403, detail="Only students can enroll in courses.")
+
+    enroll_request.student_username = user.username
+    # A client-supplied Idempotency-Key also covers the client's own retries;
+    # otherwise the key only makes the gateway's retries and hedges safe
+    enroll_request.idempotency_key = idempotency_key or enroll_request.idempotency_key or uuid.uuid4().hex
+
+    enroll_stub = get_enrollment_stub(user.username, undecoded=wants_protobuf(accept))
+    try:
+        enroll_response = enroll_stub.Enroll(enroll_request) # Hedged and retried safely thanks to the key
+        if wants_protobuf(accept):
+            return ProtobufResponse(enroll_response)
+        
+        return EnrollmentResponse(
+            success=enroll_response.success,
+            message=enroll_response.message,
+            enrollment_id=enroll_response.enrollment_id,
+            ticket_id=enroll_response.ticket_id
+        )
+    except grpc.RpcError as e:
+        handle_grpc_error(e)
+
+@protobuf_post("/api/enroll", response_model=EnrollmentResponse, dependencies=[Depends(admission_control)])
+def enroll_student_protobuf(
+    enroll_request: enrollment_pb2.EnrollRequest = Depends(protobuf_body(enrollment_pb2.EnrollRequest)),
+    user: VerificationResult = Depends(verify_token_dependency),
+    idempotency_key: Optional[str] = Header(default=None),
+    accept: Optional[str] = Header(default=None)
+):
+    """Enrolls student with an enrollment.EnrollRequest body."""
+    return send_enroll(enroll_request, user, idempotency_key, accept)
+
+@app.post("/api/enroll", response_model=EnrollmentResponse, dependencies=[Depends(admission_control)])
+def enroll_student(
     request: EnrollmentRequest, 
-    user: VerificationResult = Depends(verify_token_dependency)
+    user: VerificationResult = Depends(verify_token_dependency),
+    idempotency_key: Optional[str] = Header(default=None),
+    accept: Optional[str] = Header(default=None)
 ):
     """Enrolls student by calling Enrollment gRPC Service."""
-    
+    enroll_request = enrollment_pb2.EnrollRequest(course_id=request.course_id, queued=request.queued)
+    return send_enroll(enroll_request, user, idempotency_key, accept)
+
+def send_enroll_many(enroll_many_request, user: VerificationResult, accept: Optional[str]):
+    """Sends an enrollment.EnrollManyRequest for the student; answers in the format the client accepts."""
     if user.role != "student":
         raise HTTPException(status_code=403, detail="Only students can enroll in courses.")
+
+    enroll_many_request.student_username = user.username
+
+    enroll_stub = get_enrollment_stub(user.username, undecoded=wants_protobuf(accept))
+    try:
+        enroll_response = enroll_stub.EnrollMany(enroll_many_request)
+        if wants_protobuf(accept):
+            return ProtobufResponse(enroll_response)
+        
+        return BatchEnrollmentResponse(
+            success=enroll_response.success,
+            message=enroll_response.message,
+            results=[
+                CourseEnrollResultOut(
+                    course_id=r.course_id,
+                    success=r.success,
+                    message=r.message,
+                    enrollment_id=r.enrollment_id
+                ) for r in enroll_response.results
+            ]
+        )
+    except grpc.RpcError as e:
+        handle_grpc_error(e)
+
+@protobuf_post("/api/enroll/batch", response_model=BatchEnrollmentResponse, dependencies=[Depends(admission_control)])
+def enroll_student_batch_protobuf(
+    enroll_many_request: enrollment_pb2.EnrollManyRequest = Depends(protobuf_body(enrollment_pb2.EnrollManyRequest)),
+    user: VerificationResult = Depends(verify_token_dependency),
+    accept: Optional[str] = Header(default=None)
+):
+    """Enrolls student in several courses with an enrollment.EnrollManyRequest body."""
+    if not enroll_many_request.course_ids:
+        raise HTTPException(status_code=400, detail="List at least one course.")
+    return send_enroll_many(enroll_many_request, user, accept)
+
+@app.post("/api/enroll/batch", response_model=BatchEnrollmentResponse, dependencies=[Depends(admission_control)])
+def enroll_student_batch(
+    request: BatchEnrollmentRequest,
+    user: VerificationResult = Depends(verify_token_dependency),
+    accept: Optional[str] = Header(default=None)
+):
+    """Enrolls student in several courses at once by calling Enrollment gRPC Service."""
+    enroll_many_request = enrollment_pb2.EnrollManyRequest(
+        course_ids=request.course_ids,
+        all_or_nothing=request.all_or_nothing
+    )
+    return send_enroll_many(enroll_many_request, user, accept)
+
+@app.post("/api/waitlist", response_model=WaitlistResponse, dependencies=[Depends(admission_control)])
+def join_waitlist(
+    request: WaitlistRequest,
+    user: VerificationResult = Depends(verify_token_dependency)
+):
+    """Joins a full course's waitlist by calling Enrollment gRPC Service."""
+    
+    if user.role != "student":
+        raise HTTPException(status_code=403, detail="Only students can join waitlists.")
         
-    enroll_stub = get_enrollment_stub()
+    enroll_stub = get_enrollment_stub(user.username)
     try:
-        enroll_request = enrollment_pb2.EnrollRequest(
+        waitlist_response = enroll_stub.JoinWaitlist(enrollment_pb2.JoinWaitlistRequest(
             student_username=user.username,
             course_id=request.course_id
+        ))
+        
+        return WaitlistResponse(
+            success=waitlist_response.success,
+            message=waitlist_response.message,
+            waitlist_id=waitlist_response.waitlist_id,
+            position=waitlist_response.position
+        )
+    except grpc.RpcError as e:
+        handle_grpc_error(e)
+
+@app.get("/api/enroll/status/{ticket_id}", response_model=EnrollmentStatusOut)
+def enrollment_status(ticket_id: str, user: VerificationResult = Depends(verify_token_dependency)):
+    """Reports the outcome of a queued enrollment by calling Enrollment gRPC Service."""
+    enroll_stub = get_enrollment_stub(user.username)
+    try:
+        status_response = enroll_stub.GetEnrollmentStatus(
+            enrollment_pb2.EnrollmentStatusRequest(ticket_id=ticket_id)
         )
-        enroll_response = enroll_stub.Enroll(enroll_request)
         
-        return EnrollmentResponse(
-            success=enroll_response.success,
-            message=enroll_response.message,
-            enrollment_id=enroll_response.enrollment_id
+        # Tickets are only visible to the student who queued them
+        if status_response.student_username != user.username:
+            raise HTTPException(status_code=404, detail="Enrollment ticket not found.")
+
+        return EnrollmentStatusOut(
+            ticket_id=status_response.ticket_id,
+            status=status_response.status,
+            message=status_response.message,
+            enrollment_id=status_response.enrollment_id,
+            course_id=status_response.course_id
         )
     except grpc.RpcError as e:
         handle_grpc_error(e)
 
-@app.get("/api/grades", response_model=List[GradeRecordOut])
-async def view_grades(user: VerificationResult = Depends(verify_token_dependency)):
+@app.get("/api/grades", response_model=List[GradeRecordOut], dependencies=[Depends(admission_control)])
+def view_grades(
+    user: VerificationResult = Depends(verify_token_dependency),
+    accept: Optional[str] = Header(default=None),
+    if_none_match: Optional[str] = Header(default=None)
+):
     """Views student's grades by calling Enrollment gRPC Service."""
     
     if user.role != "student":
         raise HTTPException(status_code=403, detail="Only students can view their grades.")
         
-    enroll_stub = get_enrollment_stub()
+    enroll_stub = get_enrollment_stub(user.username)
     try:
         view_request = enrollment_pb2.ViewGradesRequest(student_username=user.username)
+        if wants_protobuf(accept):
+            return ProtobufResponse(get_enrollment_stub(user.username, undecoded=True).ViewGrades(view_request))
+
+        if if_none_match:
+            version = enroll_stub.GetGradesVersion(
+                enrollment_pb2.GradesVersionRequest(student_username=user.username)
+            ).version
+            if version and etag_matches(if_none_match, grades_etag(user.username, version)):
+                return not_modified(grades_etag(user.username, version), private=True)
         view_response = enroll_stub.ViewGrades(view_request)
         
-        # Convert gRPC GradeRecord message to Pydantic GradeRecordOut model
-        return [
-            GradeRecordOut(
-                enrollment_id=r.enrollment_id,
-                course_id=r.course_id,
-                course_code=r.course_code,
-                course_title=r.course_title,
-                student_username=r.student_username,
-                grade=r.grade, # Float transfer is handled automatically
-                status=r.status
-            ) for r in view_response.records
-        ]
+        # Encode the gRPC GradeRecord messages straight to GradeRecordOut JSON (see Fast JSON Responses)
+        response = records_response([grade_record_row(r) for r in view_response.records])
+        if view_response.version:
+            response.headers.update(validator_headers(grades_etag(user.username, view_response.version), private=True))
+        return response
+    except grpc.RpcError as e:
+        handle_grpc_error(e)
+
+
+@app.get("/api/transcript", response_model=TranscriptSummaryOut)
+def transcript_summary(
+    user: VerificationResult = Depends(verify_token_dependency),
+    accept: Optional[str] = Header(default=None)
+):
+    """Returns the student's precomputed GPA summary by calling Enrollment gRPC Service."""
+    
+    if user.role != "student":
+        raise HTTPException(status_code=403, detail="Only students can view their transcript.")
+        
+    enroll_stub = get_enrollment_stub(user.username, undecoded=wants_protobuf(accept))
+    try:
+        summary = enroll_stub.GetTranscriptSummary(
+            enrollment_pb2.TranscriptSummaryRequest(student_username=user.username)
+        )
+        if wants_protobuf(accept):
+            return ProtobufResponse(summary)
+
+        return TranscriptSummaryOut(
+            gpa=summary.gpa,
+            completed_count=summary.completed_count,
+            in_progress_count=summary.in_progress_count
+        )
+    except grpc.RpcError as e:
+        handle_grpc_error(e)
+
+@app.get("/api/enrollments/{enrollment_id}", response_model=GradeRecordOut)
+def get_enrollment(enrollment_id: int, user: VerificationResult = Depends(verify_token_dependency)):
+    """Fetches a single enrollment record by calling Enrollment gRPC Service."""
+    try:
+        if user.role == "faculty":
+            _, record = locate_enrollment(enrollment_id)
+        else:
+            # A student's records all live on the student's own shard
+            record = get_enrollment_stub(user.username).GetEnrollment(
+                enrollment_pb2.GetEnrollmentRequest(enrollment_id=enrollment_id)
+            ).record
+
+        # Students only see their own records; faculty can look up any record
+        if user.role != "faculty" and record.student_username != user.username:
+            raise HTTPException(status_code=404, detail="Enrollment record not found.")
+
+        return GradeRecordOut(
+            enrollment_id=record.enrollment_id,
+            course_id=record.course_id,
+            course_code=record.course_code,
+            course_title=record.course_title,
+            student_username=record.student_username,
+            grade=record.grade,
+            status=record.status
+        )
+    except grpc.RpcError as e:
+        handle_grpc_error(e)
+
+@app.post("/api/enrollments/{enrollment_id}/drop", response_model=GradeRecordOut)
+def drop_enrollment(enrollment_id: int, user: VerificationResult = Depends(verify_token_dependency)):
+    """Drops one of the student's active enrollments by calling Enrollment gRPC Service."""
+    
+    if user.role != "student":
+        raise HTTPException(status_code=403, detail="Only students can drop their enrollments.")
+        
+    enroll_stub = get_enrollment_stub(user.username)
+    try:
+        # The service only drops the record if it belongs to this student
+        record = enroll_stub.DropEnrollment(enrollment_pb2.DropEnrollmentRequest(
+            enrollment_id=enrollment_id,
+            student_username=user.username
+        )).record
+
+        return GradeRecordOut(
+            enrollment_id=record.enrollment_id,
+            course_id=record.course_id,
+            course_code=record.course_code,
+            course_title=record.course_title,
+            student_username=record.student_username,
+            grade=record.grade,
+            status=record.status
+        )
+    except grpc.RpcError as e:
+        handle_grpc_error(e)
+
+def send_upload_grade(upload_request, user: VerificationResult, idempotency_key: Optional[str], accept: Optional[str]):
+    """Sends an enrollment.UploadGradeRequest for the faculty; answers in the format the client accepts."""
+    if user.role != "faculty":
+        raise HTTPException(status_code=403, detail="Only faculty can upload grades.")
+
+    upload_request.faculty_username = user.username
+    upload_request.idempotency_key = idempotency_key or upload_request.idempotency_key or uuid.uuid4().hex # See send_enroll
+
+    try:
+        enroll_stub = stub_for_enrollment(upload_request.enrollment_id, undecoded=wants_protobuf(accept))
+        upload_response = enroll_stub.UploadGrade(upload_request) # Hedged and retried safely thanks to the key
+        if wants_protobuf(accept):
+            return ProtobufResponse(upload_response)
+
+        # The response already carries the complete updated record
+        record = upload_response.record
+        return GradeRecordOut(
+            enrollment_id=record.enrollment_id,
+            course_id=record.course_id,
+            course_code=record.course_code,
+            course_title=record.course_title,
+            student_username=record.student_username,
+            grade=record.grade,
+            status=record.status
+        )
+
     except grpc.RpcError as e:
         handle_grpc_error(e)
 
+@protobuf_post("/api/upload_grade", response_model=GradeRecordOut)
+def upload_grade_protobuf(
+    upload_request: enrollment_pb2.UploadGradeRequest = Depends(protobuf_body(enrollment_pb2.UploadGradeRequest)),
+    user: VerificationResult = Depends(verify_token_dependency),
+    idempotency_key: Optional[str] = Header(default=None),
+    accept: Optional[str] = Header(default=None)
+):
+    """Uploads a grade with an enrollment.UploadGradeRequest body."""
+    return send_upload_grade(upload_request, user, idempotency_key, accept)
 
 @app.post("/api/upload_grade", response_model=GradeRecordOut)
-async def upload_grade(
+def upload_grade(
     request: UploadGradeRequest,
-    user: VerificationResult = Depends(verify_token_dependency)
+    user: VerificationResult = Depends(verify_token_dependency),
+    idempotency_key: Optional[str] = Header(default=None),
+    accept: Optional[str] = Header(default=None)
 ):
     """Uploads a grade by calling Enrollment gRPC Service."""
+    upload_request = enrollment_pb2.UploadGradeRequest(enrollment_id=request.enrollment_id, grade=request.grade)
+    return send_upload_grade(upload_request, user, idempotency_key, accept)
+
+
+@app.post("/api/upload_grades", response_model=GradeSheetUploadResponse)
+async def upload_grade_sheet(
+    request: Request,
+    user: VerificationResult = Depends(verify_token_dependency)
+):
+    """Uploads a CSV or JSON grade sheet through the streaming UploadGrades gRPC call."""
     
     if user.role != "faculty":
         raise HTTPException(status_code=403, detail="Only faculty can upload grades.")
-        
-    enroll_stub = get_enrollment_stub()
-    try:
-        upload_request = enrollment_pb2.UploadGradeRequest(
-            faculty_username=user.username,
-            enrollment_id=request.enrollment_id,
-            grade=request.grade
+
+    rows = parse_grade_sheet(request.headers.get("content-type", ""), await request.body())
+    if not rows:
+        raise HTTPException(status_code=400, detail="Grade sheet is empty.")
+
+    def upload_sheet():
+        """The blocking part: streams the rows to the shards and collects the results."""
+        # Only parsable rows go to the backend; remember which sheet row each one was
+        forwarded = [index for index, row in enumerate(rows) if isinstance(row, tuple)]
+        results = {
+            index: GradeSheetRowResult(row=index, enrollment_id=0, success=False, message=row, grade=0.0)
+            for index, row in enumerate(rows) if not isinstance(row, tuple)
+        }
+        codes = {}  # sheet row -> status code name of its latest result (see UploadGradeResult.code)
+
+        def upload_to_shard(stub, indexes):
+            """Streams some sheet rows to one shard; returns {sheet row: result}."""
+            upload_requests = (
+                enrollment_pb2.UploadGradeRequest(
+                    faculty_username=user.username,
+                    enrollment_id=rows[index][0],
+                    grade=rows[index][1]
+                ) for index in indexes
+            )
+            shard_results = {}
+            for r in stub.UploadGrades(upload_requests):
+                index = indexes[r.row]
+                codes[index] = r.code
+                shard_results[index] = GradeSheetRowResult(
+                    row=index,
+                    enrollment_id=r.enrollment_id,
+                    success=r.success,
+                    message=r.message,
+                    grade=r.grade
+                )
+            return shard_results
+
+        shard_map = enrollment_shard_map()
+        stubs = {index: enrollment_stub_at(address) for index, address in shard_map.shards.items()}
+        try:
+            # Each row goes to the shard that allocated its id, all shards concurrently...
+            by_shard = {}
+            for index in forwarded:
+                shard = origin_shard(rows[index][0])
+                by_shard.setdefault(shard if shard in stubs else min(stubs), []).append(index)
+            jobs = [
+                submit_in_context(shard_call_pool, upload_to_shard, stubs[shard], indexes)
+                for shard, indexes in by_shard.items()
+            ]
+            for job in jobs:
+                results.update(job.result())
+
+            # ...and rows it does not have (moved by a rebalance) are tried on the other shards
+            for shard, indexes in by_shard.items():
+                missing = [i for i in indexes if codes.get(i) == grpc.StatusCode.NOT_FOUND.name]
+                for other in sorted(stubs):
+                    if not missing:
+                        break
+                    if other != shard:
+                        retried = upload_to_shard(stubs[other], missing)
+                        results.update({i: r for i, r in retried.items() if r.success})
+                        missing = [i for i in missing if not retried[i].success]
+        except grpc.RpcError as e:
+            handle_grpc_error(e)
+
+        ordered = [results[index] for index in range(len(rows))]
+        applied = sum(1 for r in ordered if r.success)
+        return GradeSheetUploadResponse(
+            success=applied == len(ordered),
+            applied=applied,
+            failed=len(ordered) - applied,
+            results=ordered
         )
-        upload_response = enroll_stub.UploadGrade(upload_request)
-        
-        # To return the full GradeRecordOut, we need to immediately call ViewGrades 
-        # to fetch the updated record. This is a common pattern when updating data.
-        
-        # Optimization: For simplicity, we assume success and return a partial object.
-        # In a real app, you'd fetch the complete record after the update.
-        
-        # Re-fetch the record for a proper response payload
-        view_request = enrollment_pb2.ViewGradesRequest(student_username="student1") # HACK: Need a better way to find the student
-        view_response = enroll_stub.ViewGrades(view_request)
+
+    return await run_in_threadpool(upload_sheet) # Keeps the event loop free while the shards answer
+
+
+@app.get("/api/courses/{course_id}/roster", response_model=RosterPage)
+def course_roster(
+    course_id: int,
+    status: str = "",
+    cursor: int = 0,
+    limit: int = Query(default=ROSTER_PAGE_SIZE, ge=1, le=ROSTER_PAGE_MAX),
+    user: VerificationResult = Depends(verify_token_dependency)
+):
+    """Returns one page of a course's roster from the streaming ListCourseRoster gRPC call."""
+    
+    if user.role != "faculty":
+        raise HTTPException(status_code=403, detail="Only faculty can view course rosters.")
         
-        updated_record = next(
-            (r for r in view_response.records if r.enrollment_id == request.enrollment_id), 
-            None
+    try:
+        # Ask every shard for one extra record to learn whether another page
+        # follows; enrollment ids are unique across shards, so the shard pages
+        # merge into one page in id order
+        roster_request = enrollment_pb2.ListCourseRosterRequest(
+            course_id=course_id,
+            status=status.upper(),
+            cursor=cursor,
+            limit=limit + 1
         )
+        shard_pages = scatter(lambda stub: list(stub.ListCourseRoster(roster_request)), all_enrollment_stubs())
+        merged = heapq.merge(*(page or [] for page in shard_pages), key=lambda r: r.enrollment_id)
+        records = [
+            GradeRecordOut(
+                enrollment_id=r.enrollment_id,
+                course_id=r.course_id,
+                course_code=r.course_code,
+                course_title=r.course_title,
+                student_username=r.student_username,
+                grade=r.grade,
+                status=r.status
+            ) for r in itertools.islice(merged, limit + 1)
+        ]
+    except grpc.RpcError as e:
+        handle_grpc_error(e)
 
-        if updated_record:
-             return GradeRecordOut(
-                enrollment_id=updated_record.enrollment_id,
-                course_id=updated_record.course_id,
-                course_code=updated_record.course_code,
-                course_title=updated_record.course_title,
-                student_username=updated_record.student_username,
-                grade=updated_record.grade,
-                status=updated_record.status
-            )
-        
-        raise HTTPException(status_code=500, detail="Grade uploaded but could not re-fetch the updated record.")
+    has_more = len(records) > limit
+    records = records[:limit]
+    return RosterPage(
+        records=records,
+        next_cursor=records[-1].enrollment_id if has_more else None
+    )
+
+@app.get("/api/courses/{course_id}/closure", response_model=CourseClosureOut)
+def course_closure(course_id: int, user: VerificationResult = Depends(verify_token_dependency)):
+    """Reports how far the drop cascade of a closed course has got."""
+    
+    if user.role != "faculty":
+        raise HTTPException(status_code=403, detail="Only faculty can view course closures.")
         
+    try:
+        closure_request = enrollment_pb2.CourseClosureRequest(course_id=course_id)
+        shard_closures = scatter(lambda stub: stub.GetCourseClosure(closure_request), all_enrollment_stubs())
     except grpc.RpcError as e:
-        handle_grpc_error(e)
\ No newline at end of file
+        handle_grpc_error(e)
+
+    # Every shard runs its own cascade; a shard that has not started yet counts as running
+    started = [c for c in shard_closures if c is not None]
+    if not started:
+        raise HTTPException(status_code=404, detail=f"No closure recorded for Course ID {course_id}.")
+    return CourseClosureOut(
+        course_id=course_id,
+        status="DONE" if len(started) == len(shard_closures) and all(c.status == "DONE" for c in started) else "RUNNING",
+        total_enrollments=sum(c.total_enrollments for c in started),
+        dropped_count=sum(c.dropped_count for c in started),
+        cancelled_waitlist=sum(c.cancelled_waitlist for c in started)
+    )
+
+
+# --- 4. BATCH Endpoint (Requires Auth) ---
+# A batch runs its sub-requests through the endpoints above, called directly
+# with the user the batch authenticated, so each one behaves (and fails) exactly
+# as its own REST call would. Consecutive GETs are independent and run
+# concurrently; every other sub-request runs on its own, after everything
+# before it, so a batch can e.g. enroll and then read the grades back.
+# A write that has not answered by the batch deadline may still take effect
+# in the backend: its 504 says the outcome is unknown and, for writes that take
+# an idempotency key, carries the key it was sent with, so a retry with that
+# key returns the real outcome instead of applying the write twice.
+
+batch_pool = futures.ThreadPoolExecutor(max_workers=32, thread_name_prefix="batch")
+
+def match_route(method: str, path: str):
+    """Finds the endpoint serving `method path`; returns (route, path_params)."""
+    allowed = False
+    for route in app.routes:
+        if not isinstance(route, APIRoute):
+            continue
+        match, child_scope = route.matches({"type": "http", "method": method, "path": path})
+        if match == Match.FULL:
+            return route, child_scope["path_params"]
+        allowed = allowed or match == Match.PARTIAL # Path matches, method does not
+    if allowed:
+        raise HTTPException(status_code=405, detail=f"Method {method} not allowed for {path}.")
+    raise HTTPException(status_code=404, detail=f"No endpoint at {path}.")
+
+@functools.lru_cache(maxsize=None)
+def endpoint_parameters(endpoint) -> tuple:
+    """Splits an endpoint's parameters into (user, body, body model, path/query model, header defaults) for batch calls.
+
+    Sub-requests carry no headers of their own: header parameters get their defaults.
+    """
+    user_name = body_name = body_model = None
+    fields, headers = {}, {}
+    for name, parameter in inspect.signature(endpoint).parameters.items():
+        annotation = parameter.annotation
+        if annotation is VerificationResult:
+            user_name = name
+        elif isinstance(parameter.default, params.Header):
+            headers[name] = parameter.default.default
+        elif annotation is Request:
+            raise HTTPException(status_code=400, detail="This endpoint reads the raw request and cannot be batched.")
+        elif inspect.isclass(annotation) and issubclass(annotation, BaseModel):
+            body_name, body_model = name, annotation
+        else:
+            fields[name] = (annotation, ... if parameter.default is inspect.Parameter.empty else parameter.default)
+    return user_name, body_name, body_model, create_model(f"{endpoint.__name__}_params", **fields), headers
+
+def idempotency_key_for(item: BatchItem) -> Optional[str]:
+    """The key a write sub-request is sent with (its own, or a fresh one), if its endpoint takes one."""
+    if item.method.upper() == "GET":
+        return None
+    try:
+        route, _ = match_route(item.method.upper(), item.path.partition("?")[0])
+        if "idempotency_key" not in endpoint_parameters(route.endpoint)[4]:
+            return None
+    except HTTPException:
+        return None # The sub-request fails on its own when it runs
+    return item.idempotency_key or uuid.uuid4().hex
+
+def unknown_outcome(detail: str, idempotency_key: Optional[str]) -> BatchItemResult:
+    """504 for a write that may still take effect after the batch gave up on it."""
+    body = {"detail": f"{detail} The request may still take effect.", "outcome": "unknown"}
+    if idempotency_key:
+        body["idempotency_key"] = idempotency_key # Retry with this key to learn the outcome
+    return BatchItemResult(status=504, body=body)
+
+def run_batch_item(item: BatchItem, user: VerificationResult, deadline: float,
+                   idempotency_key: Optional[str] = None) -> BatchItemResult:
+    """Runs one sub-request and returns what its own REST call would have answered."""
+    method = item.method.upper()
+    path, _, query = item.path.partition("?")
+    try:
+        route, path_params = match_route(method, path)
+        if route.path in BATCH_EXCLUDED_PATHS:
+            raise HTTPException(status_code=400, detail=f"{route.path} cannot be part of a batch.")
+        user_name, body_name, body_model, params_model, headers = endpoint_parameters(route.endpoint)
+        kwargs = dict(params_model.model_validate({**dict(parse_qsl(query)), **path_params}), **headers)
+        if user_name:
+            kwargs[user_name] = user
+        if idempotency_key:
+            kwargs["idempotency_key"] = idempotency_key
+        if body_name:
+            kwargs[body_name] = body_model.model_validate(item.body if item.body is not None else {})
+        try:
+            wait = admission.admit(route.path, user.username, user.role) # Same limits as the REST call
+        except Rejected as e:
+            raise too_many_requests(e)
+        if wait:
+            time.sleep(min(wait, max(deadline - time.monotonic(), 0.0)))
+        with deadline_scope(deadline): # Backend calls give up when the batch does
+            result = route.endpoint(**kwargs)
+            if inspect.iscoroutine(result):
+                result = asyncio.run(result)
+        if isinstance(result, Response): # Already encoded JSON (see Fast JSON Responses)
+            return BatchItemResult(status=result.status_code, body=json.loads(result.body))
+        return BatchItemResult(status=route.status_code or 200, body=jsonable_encoder(result))
+    except HTTPException as e:
+        if e.status_code == 504 and method != "GET":
+            return unknown_outcome(e.detail, idempotency_key)
+        body = {"detail": e.detail}
+        if e.headers and "Retry-After" in e.headers: # Sub-requests have no headers of their own
+            body["retry_after"] = int(e.headers["Retry-After"])
+        return BatchItemResult(status=e.status_code, body=body)
+    except ValidationError as e:
+        return BatchItemResult(status=422, body={"detail": jsonable_encoder(e.errors(include_url=False))})
+    except Exception as e:
+        print(f"Batch sub-request {method} {path} failed: {e}")
+        return BatchItemResult(status=500, body={"detail": "Internal error."})
+
+@app.post("/api/batch", response_model=BatchResponse, dependencies=[Depends(admission_control)])
+def batch(request: BatchRequest, user: VerificationResult = Depends(verify_token_dependency)):
+    """Runs up to BATCH_MAX_ITEMS sub-requests with one token verification.
+
+    Results come back in request order, each with the status and body its own
+    REST call would have had. Sub-requests still unfinished when the batch
+    deadline passes answer 504 (writes with "outcome": "unknown"); the ones that
+    never got to run are not run.
+    """
+    if len(request.requests) > BATCH_MAX_ITEMS:
+        raise HTTPException(status_code=413, detail=f"A batch may hold at most {BATCH_MAX_ITEMS} requests.")
+
+    deadline = time.monotonic() + BATCH_DEADLINE_SECONDS
+    keys = [idempotency_key_for(item) for item in request.requests]
+    results = [None] * len(request.requests)
+    index = 0
+    while index < len(request.requests) and time.monotonic() < deadline:
+        # The next group: a run of consecutive GETs, or a single other request
+        end = index + 1
+        if request.requests[index].method.upper() == "GET":
+            while end < len(request.requests) and request.requests[end].method.upper() == "GET":
+                end += 1
+        jobs = {
+            i: batch_pool.submit(run_batch_item, request.requests[i], user, deadline, keys[i]) for i in range(index, end)
+        }
+        futures.wait(jobs.values(), timeout=max(deadline - time.monotonic(), 0.0))
+        for i, job in jobs.items():
+            if job.done():
+                results[i] = job.result()
+                continue
+            detail = f"Did not finish within the batch deadline of {BATCH_DEADLINE_SECONDS:g}s."
+            if request.requests[i].method.upper() == "GET":
+                results[i] = BatchItemResult(status=504, body={"detail": detail})
+            else:
+                results[i] = unknown_outcome(detail, keys[i])
+        index = end
+    for i in range(index, len(request.requests)):
+        results[i] = BatchItemResult(status=504, body={"detail": "Not run: the batch deadline passed first."})
+    return BatchResponse(results=results)
@@ -1,17 +1,19 @@
 import grpc
+import os
 import time
-from concurrent import futures
 from passlib.context import CryptContext
 from datetime import datetime, timedelta
 from jose import jwt, JWTError
 
 # SQLAlchemy imports for database persistence
-from sqlalchemy import create_engine, Column, Integer, String
-from sqlalchemy.orm import declarative_base, sessionmaker
+from sqlalchemy import Column, Integer, String, select, bindparam
+from sqlalchemy.orm import declarative_base
 
 # Import generated gRPC code
 from client import auth_pb2
 from client import auth_pb2_grpc
+from common.health import health_and_load_server
+from common.storage import Storage, database_path
 
 # Make sure to run the compilation command:
 # python -m grpc_tools.protoc -I. --python_out=. --pyi_out=. --grpc_python_out=. auth.proto course.proto
@@ -23,7 +25,8 @@ from client import auth_pb2_grpc
 SECRET_KEY = "supersecretkey"
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 60
-GRPC_PORT = "8000"
+GRPC_PORT = os.environ.get("AUTH_GRPC_PORT", "8000") # Set a different port for each replica
+AUTH_SERVICE_NAME = auth_pb2.DESCRIPTOR.services_by_name["AuthService"].full_name # Name reported by the Health service
 
 # Define allowed roles for validation
 ALLOWED_ROLES = ["student", "faculty"]
@@ -33,10 +36,13 @@ pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 # DATABASE SETUP
 
-DATABASE_URL = "sqlite:///./services/auth_service/auth.db"
+DATABASE_PATH = database_path("AUTH_DB_PATH", "./services/auth_service/auth.db")
 
-engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False}) 
-SessionLocal = sessionmaker(bind=engine)
+# WAL-mode SQLite with one writer connection and a pool of readers (see common/storage.py)
+storage = Storage(DATABASE_PATH)
+engine = storage.writer
+SessionLocal = storage.Session # Writes (account creation)
+ReadSessionLocal = storage.ReadSession # Read-only ORM lookups (login, account checks)
 Base = declarative_base()
 
 # --- Database Model ---
@@ -51,6 +57,11 @@ class User(Base):
 
 Base.metadata.create_all(bind=engine)
 
+# Precompiled existence check for the hot VerifyToken path (no ORM hydration)
+USER_EXISTS = storage.compile(
+    select(User.id).where(User.username == bindparam("username")).limit(1)
+)
+
 # --- UTILITY FUNCTIONS ---
 def verify_password(plain, hashed):
     """Verifies a plain text password against a hashed one."""
@@ -58,11 +69,15 @@ def verify_password(plain, hashed):
 
 def get_user_by_username(username: str):
     """Fetches a user from the database by username."""
-    db = SessionLocal()
+    db = ReadSessionLocal()
     user = db.query(User).filter(User.username == username).first()
     db.close()
     return user
 
+def user_exists(username: str) -> bool:
+    """Checks whether a username exists, using the precompiled lookup."""
+    return USER_EXISTS.first(username=username) is not None
+
 def create_user_in_db(username: str, password: str, role: str):
     """Creates a new user in the database."""
     db = SessionLocal()
@@ -100,7 +115,8 @@ def create_access_token(data: dict, expires_delta: timedelta):
 # --- Initialization: Create Default Users if DB is Empty ---
 def initialize_users():
     """Ensures default accounts ('student1', 'teacher1') exist."""
-    db = SessionLocal()
+    # Count on a reader: create_user_in_db below needs the single writer connection
+    db = ReadSessionLocal()
     if db.query(User).count() == 0:
         print("Initializing default users...")
         create_user_in_db("student1", "password123", "student")
@@ -148,7 +164,7 @@ class AuthServicer(auth_pb2_grpc.AuthServiceServicer):
             username = payload.get("sub")
             role = payload.get("role")
             
-            if not username or not role or not get_user_by_username(username):
+            if not username or not role or not user_exists(username):
                 raise JWTError("User not found or missing claims.")
 
             return auth_pb2.VerifyTokenResponse(
@@ -196,7 +212,8 @@ class AuthServicer(auth_pb2_grpc.AuthServiceServicer):
 
 def serve():
     """Starts the gRPC server for the Auth Service."""
-    server = grpc.server(futures.ThreadPoolExecutor(max_workers=10))
+    # Also serves the Health service and reports its load on every call (see common/health.py)
+    server, health = health_and_load_server([AUTH_SERVICE_NAME], max_workers=10)
     auth_pb2_grpc.add_AuthServiceServicer_to_server(AuthServicer(), server)
 
     bind_address = f'[::]:{GRPC_PORT}'
@@ -1,8 +1,9 @@
 import grpc
+import os
 import time
-from concurrent import futures
-from sqlalchemy import create_engine, Column, Integer, String, Boolean
-from sqlalchemy.orm import declarative_base, sessionmaker
+import threading
+from sqlalchemy import Column, Integer, String, Boolean, Float, select, func, bindparam, delete
+from sqlalchemy.orm import declarative_base
 from sqlalchemy.exc import IntegrityError
 
 # IMPORTANT: These imports rely on the generated gRPC files.
@@ -10,16 +11,24 @@ from sqlalchemy.exc import IntegrityError
 # python -m grpc_tools.protoc -I. --python_out=. --pyi_out=. --grpc_python_out=. auth.proto course.proto
 from client import course_pb2
 from client import course_pb2_grpc
+from common.health import health_and_load_server
+from common.storage import Storage, database_path
 
 
 
 # DATABASE SETUP
 
-DATABASE_URL = "sqlite:///./services/course_service/courses.db"
-GRPC_PORT = "8001" # This node runs on port 8001
+DATABASE_PATH = database_path("COURSE_DB_PATH", "./services/course_service/courses.db")
+GRPC_PORT = os.environ.get("COURSE_GRPC_PORT", "8001") # This node runs on port 8001
+COURSE_SERVICE_NAME = course_pb2.DESCRIPTOR.services_by_name["CourseService"].full_name # Name reported by the Health service
+WATCH_POLL_SECONDS = 0.5 # How often WatchCourses streams look for writes made by other processes
+SLOT_BATCH_RETENTION_SECONDS = 7 * 24 * 3600 # How long applied ApplySlotDeltas batch ids are remembered
 
-engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
-SessionLocal = sessionmaker(bind=engine)
+# WAL-mode SQLite with one writer connection and a pool of readers (see common/storage.py)
+storage = Storage(DATABASE_PATH)
+engine = storage.writer
+SessionLocal = storage.Session # Writes (AddCourse, CloseCourse, UpdateSlots)
+ReadSessionLocal = storage.ReadSession # Ad-hoc read-only ORM queries
 Base = declarative_base()
 
 class Course(Base):
@@ -30,8 +39,70 @@ class Course(Base):
     title = Column(String)
     slots = Column(Integer)
     is_open = Column(Boolean, default=True)
+    version = Column(Integer, default=0, server_default="0", index=True) # Catalog version of the last change
+
+class AppliedSlotBatch(Base):
+    """Id of a slot-delta batch or seat reservation that was applied; a redelivered one is recognised and skipped."""
+    __tablename__ = "applied_slot_batches"
+
+    batch_id = Column(String, primary_key=True)
+    applied_at = Column(Float, index=True)
+    granted = Column(Integer, nullable=True) # Seats granted (ReserveSlots only)
 
 Base.metadata.create_all(bind=engine)
+storage.ensure_columns(Course.__table__) # Upgrade databases created before 'version' existed
+storage.ensure_columns(AppliedSlotBatch.__table__)
+
+# --- Precompiled Read Queries ---
+# Hot read paths skip the ORM: the statement is compiled once and rows come
+# back as plain tuples that are copied straight into protobuf messages.
+# The ORM (SessionLocal) is only used for administrative writes.
+
+LIST_OPEN_COURSES = storage.compile(
+    select(Course.id, Course.code, Course.title, Course.slots, Course.is_open)
+    .where(Course.is_open == True)
+)
+
+CATALOG_VERSION = storage.compile(select(func.coalesce(func.max(Course.version), 0))) # Index-only lookup
+
+COURSES_CHANGED_SINCE = storage.compile(
+    select(Course.id, Course.code, Course.title, Course.slots, Course.is_open, Course.version)
+    .where(Course.version > bindparam("since"))
+    .order_by(Course.version)
+)
+
+# --- Catalog Change Feed ---
+# Every write stamps the course with the next catalog version. The version is
+# taken inside the BEGIN IMMEDIATE write transaction, so versions commit in
+# order. WatchCourses streams the rows with a newer version. Writers in this
+# process wake the streams immediately, and a short poll picks up writes made
+# by other processes.
+
+class CatalogSignal:
+    """Wakes WatchCourses streams when this process commits a catalog change."""
+
+    def __init__(self):
+        self._condition = threading.Condition()
+        self._generation = 0
+
+    def generation(self) -> int:
+        return self._generation
+
+    def notify(self):
+        with self._condition:
+            self._generation += 1
+            self._condition.notify_all()
+
+    def wait(self, seen_generation: int, timeout: float):
+        """Blocks until a change newer than `seen_generation` is committed, or the timeout expires."""
+        with self._condition:
+            self._condition.wait_for(lambda: self._generation != seen_generation, timeout)
+
+catalog_signal = CatalogSignal()
+
+def stamp_version(db, course):
+    """Assigns the next catalog version to a course that is about to be written."""
+    course.version = (db.query(func.max(Course.version)).scalar() or 0) + 1
 
 # --- gRPC Servicer Implementation ---
 
@@ -40,27 +111,21 @@ class CourseServicer(course_pb2_grpc.CourseServiceServicer):
     """Implements the Course Service defined in course.proto."""
 
     def ListCourses(self, request, context):
-        """Lists all open courses."""
-        db = SessionLocal()
-        try:
-            # Filter for open courses
-            courses_db = db.query(Course).filter(Course.is_open == True).all()
-            
-            # Map SQLAlchemy objects to gRPC Course message objects
-            courses_grpc = [
-                course_pb2.Course(
-                    id=c.id,
-                    code=c.code,
-                    title=c.title,
-                    slots=c.slots,
-                    is_open=c.is_open
-                ) for c in courses_db
-            ]
-            
-            # Return the structured gRPC response
-            return course_pb2.ListCoursesResponse(courses=courses_grpc)
-        finally:
-            db.close()
+        """Lists all open courses, with the catalog version they reflect."""
+        # Every write bumps the catalog version, so the list belongs to a version
+        # if that version is still current once the list has been read
+        version = CATALOG_VERSION.first()[0]
+        courses_grpc = [
+            course_pb2.Course(id=id, code=code, title=title, slots=slots, is_open=is_open)
+            for id, code, title, slots, is_open in LIST_OPEN_COURSES.all()
+        ]
+        if CATALOG_VERSION.first()[0] != version:
+            version = 0 # A write landed in between: the list matches no single version
+        return course_pb2.ListCoursesResponse(courses=courses_grpc, version=version)
+
+    def GetCatalogVersion(self, request, context):
+        """Returns the catalog version alone, for callers checking whether their copy is current."""
+        return course_pb2.CatalogVersionResponse(version=CATALOG_VERSION.first()[0])
 
 
     def AddCourse(self, request, context):
@@ -80,10 +145,12 @@ class CourseServicer(course_pb2_grpc.CourseServiceServicer):
                 slots=request.slots,
                 is_open=True
             )
+            stamp_version(db, new_course)
 
             db.add(new_course)
             db.commit()
             db.refresh(new_course)
+            catalog_signal.notify()
 
             # Return the new course as a gRPC Course message
             return course_pb2.AddCourseResponse(
@@ -110,7 +177,9 @@ class CourseServicer(course_pb2_grpc.CourseServiceServicer):
                 return course_pb2.OperationResponse(success=False)
 
             course.is_open = False
+            stamp_version(db, course)
             db.commit()
+            catalog_signal.notify()
 
             return course_pb2.OperationResponse(
                 success=True,
@@ -136,7 +205,9 @@ class CourseServicer(course_pb2_grpc.CourseServiceServicer):
                 return course_pb2.OperationResponse(success=False)
 
             course.slots = request.new_slots
+            stamp_version(db, course)
             db.commit()
+            catalog_signal.notify()
 
             return course_pb2.OperationResponse(
                 success=True,
@@ -145,12 +216,112 @@ class CourseServicer(course_pb2_grpc.CourseServiceServicer):
         finally:
             db.close()
 
+    def ApplySlotDeltas(self, request, context):
+        """Applies a batch of slot deltas exactly once, keyed by batch_id.
+
+        Deltas record seats that were already taken or released on the enrollment
+        side, so they are applied unconditionally (closed courses included).
+        """
+        totals = {}
+        for slot_delta in request.deltas:
+            totals[slot_delta.course_id] = totals.get(slot_delta.course_id, 0) + slot_delta.delta
+
+        db = SessionLocal()
+        try:
+            duplicate = db.get(AppliedSlotBatch, request.batch_id) is not None
+            courses = db.query(Course).filter(Course.id.in_(list(totals))).all()
+
+            if not duplicate:
+                version = (db.query(func.max(Course.version)).scalar() or 0) + 1 # One version for the whole batch
+                for course in courses:
+                    course.slots += totals[course.id]
+                    course.version = version
+                now = time.time()
+                db.add(AppliedSlotBatch(batch_id=request.batch_id, applied_at=now))
+                db.execute(delete(AppliedSlotBatch).where(AppliedSlotBatch.applied_at < now - SLOT_BATCH_RETENTION_SECONDS))
+                db.commit()
+                catalog_signal.notify()
+
+            return course_pb2.ApplySlotDeltasResponse(
+                duplicate=duplicate,
+                courses=[
+                    course_pb2.CourseChange(
+                        version=course.version,
+                        course=course_pb2.Course(
+                            id=course.id, code=course.code, title=course.title, slots=course.slots, is_open=course.is_open
+                        )
+                    ) for course in courses
+                ]
+            )
+        finally:
+            db.close()
+
+    def ReserveSlots(self, request, context):
+        """Takes up to `seats` free slots of an open course exactly once, keyed by reservation_id."""
+        db = SessionLocal()
+        try:
+            course = db.query(Course).filter(Course.id == request.course_id).first()
+
+            if not course:
+                context.set_code(grpc.StatusCode.NOT_FOUND)
+                context.set_details(f"Course ID {request.course_id} not found")
+                return course_pb2.ReserveSlotsResponse()
+
+            reservation = db.get(AppliedSlotBatch, request.reservation_id)
+            duplicate = reservation is not None
+            if duplicate:
+                granted = reservation.granted or 0
+            else:
+                granted = min(max(request.seats, 0), max(course.slots, 0)) if course.is_open else 0
+                if granted:
+                    course.slots -= granted
+                    stamp_version(db, course)
+                # Recorded even when nothing was granted, so a retry gets the same answer
+                db.add(AppliedSlotBatch(batch_id=request.reservation_id, applied_at=time.time(), granted=granted))
+                db.commit()
+                if granted:
+                    catalog_signal.notify()
+
+            return course_pb2.ReserveSlotsResponse(
+                granted=granted,
+                duplicate=duplicate,
+                course=course_pb2.CourseChange(
+                    version=course.version,
+                    course=course_pb2.Course(
+                        id=course.id, code=course.code, title=course.title, slots=course.slots, is_open=course.is_open
+                    )
+                )
+            )
+        finally:
+            db.close()
+
+    def WatchCourses(self, request, context):
+        """Streams every course change after since_version (the whole catalog first when it is 0)."""
+        version = request.since_version if request.since_version > 0 else -1
+        caught_up = False
+
+        while context.is_active():
+            generation = catalog_signal.generation()
+            changes = COURSES_CHANGED_SINCE.all(since=version)
+            for id, code, title, slots, is_open, row_version in changes:
+                yield course_pb2.CourseChange(
+                    version=row_version,
+                    course=course_pb2.Course(id=id, code=code, title=title, slots=slots, is_open=is_open)
+                )
+                version = row_version
+
+            if changes or not caught_up:
+                # Course-less marker: the subscriber now has everything up to `version`
+                yield course_pb2.CourseChange(version=max(version, 0))
+                caught_up = True
+            catalog_signal.wait(generation, WATCH_POLL_SECONDS)
+
 # --- gRPC Server Startup ---
 
 def serve():
     """Starts the gRPC server for the Course Service."""
-    # Use a ThreadPoolExecutor to handle concurrent requests
-    server = grpc.server(futures.ThreadPoolExecutor(max_workers=10))
+    # A pool of 10 worker threads, plus the Health service and per-call load reports (see common/health.py)
+    server, health = health_and_load_server([COURSE_SERVICE_NAME], max_workers=10)
     
     # Add the implemented servicer to the server
     course_pb2_grpc.add_CourseServiceServicer_to_server(CourseServicer(), server)
@@ -0,0 +1,52 @@
+import threading
+
+# Local copy of the course catalog, fed by the CourseWatcher.
+#
+# The initial WatchCourses snapshot loads every course once (closed courses
+# included); after that only changed courses arrive on the stream, so the
+# cache is kept current incrementally and readers never call the Course
+# Service. Entries are replaced whole, so a reader always sees a consistent
+# Course message without taking a lock. Every entry remembers the catalog
+# version it came from and never goes back to an older one, so states learned
+# from other sources (e.g. ApplySlotDeltas responses) cannot be undone by a
+# lagging change stream.
+
+
+class CourseCatalogCache:
+    """course_id -> latest known Course message (change stream or ApplySlotDeltas)."""
+
+    def __init__(self, watcher):
+        self._courses = {}
+        self._versions = {} # course_id -> catalog version of the cached state
+        self._lock = threading.Lock()
+        self._watcher = watcher
+        watcher.add_listener(self.apply)
+
+    def apply(self, course, version: int):
+        """Stores the state of a course as of `version`, unless a newer one is already cached."""
+        with self._lock:
+            if version < self._versions.get(course.id, -1):
+                return
+            self._versions[course.id] = version
+            self._courses[course.id] = course
+
+    def get(self, course_id: int):
+        """Returns the cached Course, or None if the catalog does not know it (yet)."""
+        return self._courses.get(course_id)
+
+    def slots(self, course_id: int) -> tuple:
+        """Returns (slots, is_open); unknown courses are reported as (0, False)."""
+        course = self._courses.get(course_id)
+        return (course.slots, course.is_open) if course else (0, False)
+
+    @property
+    def ready(self) -> threading.Event:
+        """Set once the initial catalog snapshot has been received."""
+        return self._watcher.ready
+
+    def wait_ready(self, timeout: float) -> bool:
+        """Blocks until the initial snapshot is loaded or the timeout expires."""
+        return self._watcher.ready.wait(timeout)
+
+    def __len__(self):
+        return len(self._courses)
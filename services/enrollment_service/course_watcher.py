@@ -0,0 +1,57 @@
+import threading
+import time
+import grpc
+
+from client import course_pb2
+
+# Follows the Course Service's WatchCourses change stream. Listeners are called
+# with every changed Course (closed courses included) and the catalog version
+# it reached; the stream reconnects
+# with backoff and resumes from the last catalog version it has seen.
+
+
+class CourseWatcher:
+    """Background subscriber to the Course Service catalog change stream."""
+
+    def __init__(self, stub_factory, retry_seconds: float = 1.0, max_retry_seconds: float = 10.0):
+        """`stub_factory()` must return a CourseServiceStub."""
+        self.stub_factory = stub_factory
+        self.retry_seconds = retry_seconds
+        self.max_retry_seconds = max_retry_seconds
+        self.version = 0 # Last catalog version fully received
+        self.ready = threading.Event() # Set once the initial catalog has been received
+        self._listeners = []
+        self._thread = None
+
+    def add_listener(self, listener):
+        """Registers `listener(course, version)`, called from the watcher thread for every change."""
+        self._listeners.append(listener)
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="course-watcher", daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        delay = self.retry_seconds
+        while True:
+            try:
+                stream = self.stub_factory().WatchCourses(
+                    course_pb2.WatchCoursesRequest(since_version=self.version)
+                )
+                for change in stream:
+                    delay = self.retry_seconds
+                    if not change.HasField("course"):
+                        # Caught-up marker: everything up to change.version has been delivered
+                        self.version = change.version
+                        self.ready.set()
+                        continue
+                    for listener in self._listeners:
+                        try:
+                            listener(change.course, change.version)
+                        except Exception as e:
+                            print(f"Course watcher listener failed for Course ID {change.course.id}: {e}")
+            except grpc.RpcError as e:
+                print(f"Course change stream interrupted ({e.code().name}); reconnecting in {delay:.0f}s.")
+            time.sleep(delay)
+            delay = min(delay * 2, self.max_retry_seconds)
@@ -1,8 +1,15 @@
+import functools
 import grpc
+import heapq
+import os
+import itertools
+import threading
 import time
-from concurrent import futures
-from sqlalchemy import create_engine, Column, Integer, String, Boolean, Float # Import Float
-from sqlalchemy.orm import declarative_base, sessionmaker
+import uuid
+from collections import Counter
+from sqlalchemy import Column, Integer, String, Boolean, Float, LargeBinary, select, insert, update, delete, bindparam, func, case, literal, or_, union_all # Import Float
+from sqlalchemy.orm import declarative_base
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 
 # Import generated gRPC code
 from client import enrollment_pb2
@@ -10,16 +17,78 @@ from client import enrollment_pb2_grpc
 # Import Course gRPC client necessities for inter-service communication
 from client import course_pb2
 from client import course_pb2_grpc 
+from common.balancing import service_channel
+from common.call_policy import MethodPolicy, load_policies, policy_channel
+from common.health import health_and_load_server
+from common.storage import Storage, database_path
+from common.group_commit import GroupCommitWriter
+from common.sharding import enrollment_id_range
+from services.enrollment_service.ticket_queue import TicketQueue
+from services.enrollment_service.course_watcher import CourseWatcher
+from services.enrollment_service.course_cache import CourseCatalogCache
+from services.enrollment_service.waitlist import WaitlistPromoter
+from services.enrollment_service.batch_job import BackgroundBatchJob
+from services.enrollment_service.outbox import OutboxRelay
+from services.enrollment_service.idempotency import (
+    AlreadyRecorded, IdempotencyConflict, IdempotencyGuard, request_fingerprint
+)
 
 
 # CONFIG
 
-DATABASE_URL = "sqlite:///./services/enrollment_service/enrollment.db"
-GRPC_PORT = "8002" # This node runs on port 8002
-COURSE_SERVICE_ADDRESS = 'localhost:8001' # Address of the Course Node
+DATABASE_PATH = database_path("ENROLLMENT_DB_PATH", "./services/enrollment_service/enrollment.db")
+GRPC_PORT = os.environ.get("ENROLLMENT_GRPC_PORT", "8002") # This node runs on port 8002
+COURSE_SERVICE_ADDRESS = os.environ.get("COURSE_SERVICE_ADDRESS", 'localhost:8001') # Course Node; comma-separated for replicas
+LOAD_BALANCING_POLICY = os.environ.get("LOAD_BALANCING_POLICY", "least_outstanding") # Or round_robin (see common/balancing.py)
+ENROLLMENT_SERVICE_NAME = enrollment_pb2.DESCRIPTOR.services_by_name["EnrollmentService"].full_name # Name reported by the Health service
+GROUP_COMMIT_MAX_BATCH = 64 # Flush a write batch after this many items...
+GROUP_COMMIT_MAX_DELAY_MS = 2.0 # ...or this long after the first one arrived
+ENROLLMENT_QUEUE_WORKERS = 4 # Worker threads processing queued enrollments
+ENROLLMENT_QUEUE_BATCH = 50 # Max tickets of one course settled in a single transaction
+ENROLL_MANY_MAX_COURSES = 10 # Upper bound on courses in one EnrollMany (cart checkout) call
+UPLOAD_GRADES_MAX_ROWS = 5000 # Upper bound on rows in one UploadGrades (grade sheet) stream
+ROSTER_CHUNK_ROWS = 500 # Rows fetched per chunk while streaming a course roster
+ROSTER_STATUSES = ("ENROLLED", "COMPLETED", "DROPPED") # Accepted ListCourseRoster status filters
+CATALOG_READY_TIMEOUT_SECONDS = 2.0 # How long a read waits for the initial catalog snapshot after startup
+ARCHIVE_AFTER_SECONDS = 30 * 24 * 3600 # Finished enrollments stay in the hot table this long before archiving
+ARCHIVE_BATCH_ROWS = 500 # Rows moved to the archive per write transaction
+ARCHIVE_INTERVAL_SECONDS = 3600 # How often the archive mover looks for finished enrollments
+IDEMPOTENCY_TTL_SECONDS = 24 * 3600 # How long a recorded Enroll/UploadGrade response is replayed
+IDEMPOTENCY_MAX_KEYS = 100000 # Upper bound on recorded responses; the oldest are evicted first
+IDEMPOTENCY_PURGE_INTERVAL_SECONDS = 300 # How often expired and excess keys are deleted...
+IDEMPOTENCY_PURGE_BATCH = 500 # ...and how many per write transaction
+OUTBOX_BATCH_ROWS = 500 # Slot outbox rows delivered per ApplySlotDeltas call
+OUTBOX_POLL_SECONDS = 1.0 # Relay wake-up interval when no local write has signalled new rows
+OUTBOX_RETRY_SECONDS = 0.5 # First retry delay after a failed delivery (doubles up to the max)
+OUTBOX_MAX_RETRY_SECONDS = 10.0
+OUTBOX_DELIVERY_TIMEOUT_SECONDS = 5.0 # Deadline of one ApplySlotDeltas call (see COURSE_CALL_POLICIES)
+CLOSURE_BATCH_ROWS = 500 # Enrollments of a closed course dropped per write transaction
+CLOSURE_INTERVAL_SECONDS = 60 # Safety poll for unfinished closures (new closures wake the job directly)
+SHARD_INDEX = int(os.environ.get("ENROLLMENT_SHARD_INDEX", "0")) # This shard's position in the shard map
+SHARD_COUNT = int(os.environ.get("ENROLLMENT_SHARD_COUNT", "1")) # Shards sharing the course catalog
+SEAT_LEASES = SHARD_COUNT > 1 # Shards take seats from leased blocks instead of the shared catalog count
+SEAT_LEASE_BLOCK = 20 # Most seats of one course reserved from the Course Service at a time
+SEAT_LEASE_TIMEOUT_SECONDS = 2.0 # Deadline of one ReserveSlots call, hedges included
+SEAT_LEASE_ATTEMPTS = 3 # Writes retried when concurrent writes used up the lease they had reserved for
+SEAT_LEASE_IDLE_SECONDS = 30 # Leased seats unused this long go back to the Course Service
+SEAT_LEASE_INTERVAL_SECONDS = 10 # How often unanswered reservations and idle leases are handled
 
-engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
-SessionLocal = sessionmaker(bind=engine)
+# Deadlines, hedging and circuit breaking of Course Service calls (see common/call_policy.py);
+# override per method with the CALL_POLICIES environment variable
+COURSE_CALL_POLICIES = load_policies({
+    "*": MethodPolicy(timeout=5.0),
+    "course.CourseService/WatchCourses": MethodPolicy(), # Long-lived change stream: no deadline
+    "course.CourseService/ListCourses": MethodPolicy(timeout=3.0, hedge_after=0.3, max_attempts=2),
+    "course.CourseService/ApplySlotDeltas": MethodPolicy(timeout=OUTBOX_DELIVERY_TIMEOUT_SECONDS), # The relay retries
+    # Applied once per reservation_id, so a slow reservation can be hedged
+    "course.CourseService/ReserveSlots": MethodPolicy(timeout=SEAT_LEASE_TIMEOUT_SECONDS, hedge_after=0.5, max_attempts=2),
+})
+
+# WAL-mode SQLite with one writer connection and a pool of readers (see common/storage.py)
+storage = Storage(DATABASE_PATH)
+engine = storage.writer
+SessionLocal = storage.Session # Ad-hoc ORM writes
+ReadSessionLocal = storage.ReadSession # Ad-hoc read-only ORM queries
 Base = declarative_base()
 
 # --- Database Models ---
@@ -32,178 +101,1524 @@ class Enrollment(Base):
     course_id = Column(Integer, index=True) # ID from the Course Service's DB
     grade = Column(Float, nullable=True)   
     status = Column(String, default="ENROLLED") # ENROLLED, COMPLETED, DROPPED
+    finished_at = Column(Float, nullable=True) # Unix time it became COMPLETED/DROPPED; drives archiving
+
+class ArchivedEnrollment(Base):
+    """A finished enrollment moved out of the hot table; keeps its original id."""
+    __tablename__ = "enrollments_archive"
+
+    id = Column(Integer, primary_key=True) # Same id it had in "enrollments"
+    student_username = Column(String, index=True)
+    course_id = Column(Integer, index=True)
+    grade = Column(Float, nullable=True)
+    status = Column(String) # COMPLETED, DROPPED
+    finished_at = Column(Float, nullable=True)
+
+class EnrollmentTicket(Base):
+    """A queued enrollment request and its outcome."""
+    __tablename__ = "enrollment_tickets"
+
+    id = Column(String, primary_key=True) # Opaque ticket id handed to the client
+    student_username = Column(String, index=True)
+    course_id = Column(Integer)
+    status = Column(String, default="QUEUED", index=True) # QUEUED, ENROLLED, FAILED
+    message = Column(String, default="")
+    enrollment_id = Column(Integer, nullable=True)
+    created_at = Column(Float) # Unix time; orders tickets when re-queued after a restart
+
+class WaitlistEntry(Base):
+    """A student waiting for a seat in a full course; served in id (arrival) order."""
+    __tablename__ = "waitlist"
+
+    id = Column(Integer, primary_key=True, index=True)
+    student_username = Column(String, index=True)
+    course_id = Column(Integer, index=True)
+    status = Column(String, default="WAITING") # WAITING, PROMOTED, CANCELLED
+    enrollment_id = Column(Integer, nullable=True) # Set when PROMOTED
+    created_at = Column(Float)
+
+class Transcript(Base):
+    """Per-student transcript summary, kept current by every enrollment and grade write."""
+    __tablename__ = "transcripts"
+
+    student_username = Column(String, primary_key=True)
+    completed_count = Column(Integer, default=0) # Graded (COMPLETED) enrollments
+    in_progress_count = Column(Integer, default=0) # ENROLLED, not yet graded
+    grade_points = Column(Float, default=0.0) # Sum of the grades of completed enrollments; GPA = grade_points / completed_count
+    version = Column(Integer, default=0, server_default="0") # Bumped by every write to the student's records (versions ViewGrades)
+
+class IdempotencyRecord(Base):
+    """The response of a successful idempotency-keyed call, replayed to retries of it."""
+    __tablename__ = "idempotency_keys"
+
+    key = Column(String, primary_key=True) # "<method>:<caller>:<client key>"
+    fingerprint = Column(String) # Hash of the original request
+    response = Column(LargeBinary) # Serialized response message
+    created_at = Column(Float, index=True)
+
+class SlotOutboxEntry(Base):
+    """A slot change committed locally but not yet delivered to the Course Service."""
+    __tablename__ = "slot_outbox"
+
+    id = Column(Integer, primary_key=True)
+    course_id = Column(Integer, index=True)
+    delta = Column(Integer) # -1 per seat taken, +1 per seat released
+    batch_id = Column(String, nullable=True, index=True) # Set once the relay has claimed the row for delivery
+    created_at = Column(Float)
+
+class CourseClosure(Base):
+    """Progress of the cascade that drops the active enrollments of a closed course."""
+    __tablename__ = "course_closures"
+
+    course_id = Column(Integer, primary_key=True)
+    status = Column(String, default="RUNNING", index=True) # RUNNING, DONE
+    total_enrollments = Column(Integer, default=0) # Active enrollments when the closure started
+    dropped_count = Column(Integer, default=0)
+    cancelled_waitlist = Column(Integer, default=0)
+    started_at = Column(Float)
+    finished_at = Column(Float, nullable=True)
+
+class SeatLease(Base):
+    """Seats of a course reserved from the Course Service and not yet used by this shard."""
+    __tablename__ = "seat_leases"
+
+    course_id = Column(Integer, primary_key=True)
+    seats = Column(Integer, default=0)
+    used_at = Column(Float) # Last time seats were granted or taken; idle leases are returned
+
+class SeatLeaseRequest(Base):
+    """A ReserveSlots call that has not been answered yet; resent with the same id after a failure."""
+    __tablename__ = "seat_lease_requests"
+
+    id = Column(String, primary_key=True) # The reservation id sent to the Course Service
+    course_id = Column(Integer)
+    seats = Column(Integer)
+    created_at = Column(Float, index=True)
 
 Base.metadata.create_all(bind=engine)
+storage.ensure_columns(Enrollment.__table__) # Upgrade databases created before 'finished_at' existed
+storage.ensure_columns(Transcript.__table__) # ...and before transcripts had a 'version'
+
+# Active records live in the hot table, finished ones may have been archived:
+# reads that can see finished records union both (archive first: it holds the older ids)
+ENROLLMENT_TABLES = (ArchivedEnrollment, Enrollment)
+ENROLLMENT_COLUMNS = ("id", "student_username", "course_id", "grade", "status", "finished_at")
+
+# --- Precompiled Read Queries ---
+# Hot read paths skip the ORM: the statement is compiled once and rows come
+# back as plain tuples that are copied straight into protobuf messages.
+# The ORM (SessionLocal) is only used for writes.
+
+ACTIVE_ENROLLMENT_ID = storage.compile(
+    select(Enrollment.id).where(
+        Enrollment.student_username == bindparam("student_username"),
+        Enrollment.course_id == bindparam("course_id"),
+        Enrollment.status == "ENROLLED"
+    ).limit(1)
+)
+
+ENROLLMENT_BY_ID = storage.compile(union_all(*(
+    select(table.id, table.student_username, table.course_id, table.grade, table.status)
+    .where(table.id == bindparam("enrollment_id"))
+    for table in ENROLLMENT_TABLES
+)))
+
+TRANSCRIPT_BY_STUDENT = storage.compile(
+    select(Transcript.completed_count, Transcript.in_progress_count, Transcript.grade_points)
+    .where(Transcript.student_username == bindparam("student_username"))
+)
+
+GRADES_VERSION = storage.compile(
+    select(Transcript.version).where(Transcript.student_username == bindparam("student_username"))
+)
+
+STUDENT_ENROLLMENTS = storage.compile(union_all(*(
+    select(table.id, table.course_id, table.grade, table.status)
+    .where(table.student_username == bindparam("student_username"))
+    for table in ENROLLMENT_TABLES
+)))
+
+IDEMPOTENT_RESPONSE = storage.compile(
+    select(IdempotencyRecord.fingerprint, IdempotencyRecord.response).where(
+        IdempotencyRecord.key == bindparam("key"),
+        IdempotencyRecord.created_at > bindparam("not_before")
+    )
+)
+
+TICKET_BY_ID = storage.compile(
+    select(
+        EnrollmentTicket.status, EnrollmentTicket.message, EnrollmentTicket.enrollment_id,
+        EnrollmentTicket.course_id, EnrollmentTicket.student_username
+    ).where(EnrollmentTicket.id == bindparam("ticket_id"))
+)
+
+QUEUED_TICKET_ID = storage.compile(
+    select(EnrollmentTicket.id).where(
+        EnrollmentTicket.student_username == bindparam("student_username"),
+        EnrollmentTicket.course_id == bindparam("course_id"),
+        EnrollmentTicket.status == "QUEUED"
+    ).limit(1)
+)
+
+QUEUED_TICKETS = storage.compile(
+    select(EnrollmentTicket.id, EnrollmentTicket.student_username, EnrollmentTicket.course_id)
+    .where(EnrollmentTicket.status == "QUEUED")
+    .order_by(EnrollmentTicket.created_at)
+)
+
+WAITLIST_HEAD = storage.compile(
+    select(WaitlistEntry.id, WaitlistEntry.student_username)
+    .where(WaitlistEntry.course_id == bindparam("course_id"), WaitlistEntry.status == "WAITING")
+    .order_by(WaitlistEntry.id)
+    .limit(bindparam("limit"))
+)
+
+WAITING_ENTRY_ID = storage.compile(
+    select(WaitlistEntry.id).where(
+        WaitlistEntry.student_username == bindparam("student_username"),
+        WaitlistEntry.course_id == bindparam("course_id"),
+        WaitlistEntry.status == "WAITING"
+    ).limit(1)
+)
+
+SEAT_LEASE_BALANCE = storage.compile(
+    select(SeatLease.seats).where(SeatLease.course_id == bindparam("course_id"))
+)
+
+COURSE_CLOSURE = storage.compile(
+    select(
+        CourseClosure.status,
+        CourseClosure.total_enrollments,
+        CourseClosure.dropped_count,
+        CourseClosure.cancelled_waitlist
+    ).where(CourseClosure.course_id == bindparam("course_id"))
+)
+
+WAITLIST_POSITION = storage.compile(
+    select(func.count(WaitlistEntry.id)).where(
+        WaitlistEntry.course_id == bindparam("course_id"),
+        WaitlistEntry.status == "WAITING",
+        WaitlistEntry.id <= bindparam("waitlist_id")
+    )
+)
+
+# --- Write Operations (Group Commit) ---
+# Enroll and UploadGrade hand these to the group-commit writer, which applies
+# concurrent calls in one shared transaction (see common/group_commit.py).
+
+write_batcher = GroupCommitWriter(
+    engine,
+    max_batch=GROUP_COMMIT_MAX_BATCH,
+    max_delay_ms=GROUP_COMMIT_MAX_DELAY_MS,
+    name="enrollment-group-commit"
+)
+
+_transcript_insert = sqlite_insert(Transcript).values(
+    student_username=bindparam("b_student"),
+    completed_count=bindparam("b_completed"),
+    in_progress_count=bindparam("b_in_progress"),
+    grade_points=bindparam("b_grade_points"),
+    version=1
+)
+# Built once: per-call statement construction dominated bulk drops and grade uploads
+TRANSCRIPT_UPSERT = _transcript_insert.on_conflict_do_update(
+    index_elements=[Transcript.student_username],
+    set_={
+        "completed_count": Transcript.completed_count + _transcript_insert.excluded.completed_count,
+        "in_progress_count": Transcript.in_progress_count + _transcript_insert.excluded.in_progress_count,
+        "grade_points": Transcript.grade_points + _transcript_insert.excluded.grade_points,
+        "version": Transcript.version + 1,
+    }
+)
+
+def adjust_transcripts(conn, deltas: dict):
+    """Applies {student_username: (completed, in_progress, grade_points)} deltas in one executemany.
+
+    Every write to a student's records goes through here, which also bumps the
+    student's records version, even when all deltas are zero.
+    """
+    if deltas:
+        conn.execute(TRANSCRIPT_UPSERT, [
+            {"b_student": student_username, "b_completed": completed,
+             "b_in_progress": in_progress, "b_grade_points": grade_points}
+            for student_username, (completed, in_progress, grade_points) in deltas.items()
+        ])
+
+def adjust_transcript(conn, student_username: str, completed: int = 0, in_progress: int = 0, grade_points: float = 0.0):
+    """Applies deltas to a student's transcript summary, creating it on first use."""
+    adjust_transcripts(conn, {student_username: (completed, in_progress, grade_points)})
+
+def grade_transcript_delta(old_status: str, old_grade, new_grade: float) -> tuple:
+    """(completed, in_progress, grade_points) deltas for grading one enrollment."""
+    if old_status == "COMPLETED": # Re-grade: only the grade points change
+        return 0, 0, new_grade - (old_grade or 0.0)
+    if old_status == "ENROLLED":
+        return 1, -1, new_grade
+    return 1, 0, new_grade # e.g. a DROPPED record graded after the fact
+
+def rebuild_transcripts(conn) -> int:
+    """Backfill: recomputes every transcript summary from the enrollment rows. Returns the student count."""
+    conn.execute(Transcript.__table__.delete())
+    rows = union_all(*(
+        select(table.student_username, table.grade, table.status) for table in ENROLLMENT_TABLES
+    )).subquery()
+    result = conn.execute(
+        insert(Transcript).from_select(
+            ["student_username", "completed_count", "in_progress_count", "grade_points", "version"],
+            select(
+                rows.c.student_username,
+                func.sum(case((rows.c.status == "COMPLETED", 1), else_=0)),
+                func.sum(case((rows.c.status == "ENROLLED", 1), else_=0)),
+                func.coalesce(func.sum(case((rows.c.status == "COMPLETED", rows.c.grade), else_=0.0)), 0.0),
+                literal(1),
+            ).group_by(rows.c.student_username)
+        )
+    )
+    return result.rowcount
+
+def transcripts_need_backfill() -> bool:
+    """True for a database that has enrollments but no transcript summaries yet."""
+    db = ReadSessionLocal()
+    try:
+        has_enrollments = db.query(Enrollment.id).first() is not None
+        return has_enrollments and db.query(Transcript.student_username).first() is None
+    finally:
+        db.close()
+
+FIRST_ENROLLMENT_ID, LAST_ENROLLMENT_ID = enrollment_id_range(SHARD_INDEX)
+
+def next_enrollment_id(conn) -> int:
+    """Next free id in this shard's id block (records moved in from other shards keep theirs)."""
+    newest = max(
+        conn.execute(
+            select(func.max(table.id)).where(table.id.between(FIRST_ENROLLMENT_ID, LAST_ENROLLMENT_ID))
+        ).scalar() or 0
+        for table in ENROLLMENT_TABLES
+    )
+    return max(newest + 1, FIRST_ENROLLMENT_ID)
+
+def insert_enrollment(conn, student_username: str, course_id: int) -> int:
+    """Inserts an ENROLLED record and returns its new enrollment id."""
+    enrollment_id = next_enrollment_id(conn)
+    conn.execute(
+        insert(Enrollment).values(
+            id=enrollment_id,
+            student_username=student_username,
+            course_id=course_id,
+            status="ENROLLED"
+        )
+    )
+    adjust_transcript(conn, student_username, in_progress=1)
+    return enrollment_id
+
+# --- Seat Accounting (Transactional Outbox) ---
+# A seat is taken or released in the same local transaction as the enrollment
+# record, by writing a slot delta to the outbox; the relay delivers it to the
+# Course Service afterwards (see outbox.py). Seat checks therefore run inside
+# the write transaction, against the cached catalog count plus the deltas that
+# are still waiting in the outbox. While a delivered batch is being confirmed
+# the change stream may already show it, so the count can briefly be too low,
+# never too high.
+#
+# With several shards the catalog count is shared, so a shard cannot see the
+# seats the others are taking. Sharded deployments therefore lease seats: a
+# shard reserves a block of seats with ReserveSlots first and only takes seats
+# from its own lease (see Seat Leases below). Released seats always go back to
+# the Course Service through the outbox.
+
+WAITLIST_FIRST_MESSAGE = "Course is full and students are waiting. Join the waitlist instead."
+COURSE_FULL_MESSAGE = "Course is full."
+ALL_OR_NOTHING_MESSAGE = "Not enrolled: another course in the request could not be enrolled."
+
+class WriteRejected(Exception):
+    """Raised by a write operation that must not go ahead (e.g. no free seat); carries the gRPC status to report."""
+
+    def __init__(self, code, message: str):
+        super().__init__(message)
+        self.code = code
+        self.message = message
+
+class SeatsExhausted(WriteRejected):
+    """No free seat was left; with seat leases, reserving more may still succeed."""
+
+def is_enrolled(conn, student_username: str, course_id: int) -> bool:
+    return conn.execute(
+        select(Enrollment.id).where(
+            Enrollment.student_username == student_username,
+            Enrollment.course_id == course_id,
+            Enrollment.status == "ENROLLED"
+        ).limit(1)
+    ).first() is not None
+
+def has_waiting_students(conn, course_id: int) -> bool:
+    return conn.execute(
+        select(WaitlistEntry.id).where(WaitlistEntry.course_id == course_id, WaitlistEntry.status == "WAITING").limit(1)
+    ).first() is not None
+
+def free_seats(conn, course_id: int) -> int:
+    """Seats left in an open course: the catalog's count plus the undelivered outbox deltas
+    (with seat leases: the seats this shard has leased)."""
+    course = course_cache.get(course_id)
+    if course is None or not course.is_open:
+        raise WriteRejected(grpc.StatusCode.NOT_FOUND, f"Course ID {course_id} not found or is closed.")
+    if SEAT_LEASES:
+        return conn.execute(select(SeatLease.seats).where(SeatLease.course_id == course_id)).scalar() or 0
+    pending = conn.execute(
+        select(func.coalesce(func.sum(SlotOutboxEntry.delta), 0)).where(SlotOutboxEntry.course_id == course_id)
+    ).scalar()
+    return course.slots + pending
+
+def queue_slot_delta(conn, course_id: int, delta: int):
+    """Records a slot change in the outbox (part of the caller's transaction)."""
+    conn.execute(insert(SlotOutboxEntry).values(course_id=course_id, delta=delta, created_at=time.time()))
+    outbox_relay.notify() # Its claim is a later write, so it runs after this transaction has committed
+
+def take_seats(conn, course_id: int, count: int):
+    """Takes seats counted by free_seats() (part of the caller's transaction)."""
+    if SEAT_LEASES:
+        conn.execute(
+            update(SeatLease).where(SeatLease.course_id == course_id)
+            .values(seats=SeatLease.seats - count, used_at=time.time())
+        )
+    else:
+        queue_slot_delta(conn, course_id, -count)
+
+def check_enrollable(conn, student_username: str, course_id: int) -> int:
+    """Raises WriteRejected unless the student can take a seat right now; returns the free seats."""
+    if is_enrolled(conn, student_username, course_id):
+        raise WriteRejected(grpc.StatusCode.ALREADY_EXISTS, "Student is already enrolled in this course.")
+    # Freed seats belong to the waitlist, not to whoever retries fastest
+    if has_waiting_students(conn, course_id):
+        raise WriteRejected(grpc.StatusCode.RESOURCE_EXHAUSTED, WAITLIST_FIRST_MESSAGE)
+    seats = free_seats(conn, course_id)
+    if seats <= 0:
+        raise SeatsExhausted(grpc.StatusCode.RESOURCE_EXHAUSTED, COURSE_FULL_MESSAGE)
+    return seats
+
+def enroll_with_seat(conn, student_username: str, course_id: int) -> tuple:
+    """Takes a seat and inserts the ENROLLED record in one transaction. Returns (enrollment_id, seats left)."""
+    seats = check_enrollable(conn, student_username, course_id)
+    enrollment_id = insert_enrollment(conn, student_username, course_id)
+    take_seats(conn, course_id, 1)
+    return enrollment_id, seats - 1
+
+def enroll_many_with_seats(conn, student_username: str, course_ids: list, all_or_nothing: bool) -> tuple:
+    """Cart checkout in one transaction. Returns ({course_id: enrollment_id}, {course_id: failure message})."""
+    failures = {}
+    for course_id in course_ids:
+        try:
+            check_enrollable(conn, student_username, course_id)
+        except WriteRejected as e:
+            failures[course_id] = e.message
+
+    if all_or_nothing and failures:
+        for course_id in course_ids:
+            failures.setdefault(course_id, ALL_OR_NOTHING_MESSAGE)
+        return {}, failures
+
+    enrollment_ids = {}
+    for course_id in course_ids:
+        if course_id not in failures:
+            enrollment_ids[course_id] = insert_enrollment(conn, student_username, course_id)
+            take_seats(conn, course_id, 1)
+    return enrollment_ids, failures
+
+def claim_outbox_batch(conn, limit: int):
+    """Picks the next outbox batch to deliver; returns (batch_id, [(course_id, delta)]) or None.
+
+    A batch claimed earlier but never confirmed (e.g. the process died mid-delivery)
+    is handed out again with the same id, so the Course Service can recognise it.
+    """
+    batch_id = conn.execute(
+        select(SlotOutboxEntry.batch_id).where(SlotOutboxEntry.batch_id.is_not(None))
+        .order_by(SlotOutboxEntry.id).limit(1)
+    ).scalar()
+    if batch_id is None:
+        ids = conn.execute(
+            select(SlotOutboxEntry.id).where(SlotOutboxEntry.batch_id.is_(None)).order_by(SlotOutboxEntry.id).limit(limit)
+        ).scalars().all()
+        if not ids:
+            return None
+        batch_id = uuid.uuid4().hex
+        conn.execute(update(SlotOutboxEntry).where(SlotOutboxEntry.id.in_(ids)).values(batch_id=batch_id))
+
+    deltas = conn.execute(
+        select(SlotOutboxEntry.course_id, func.sum(SlotOutboxEntry.delta))
+        .where(SlotOutboxEntry.batch_id == batch_id)
+        .group_by(SlotOutboxEntry.course_id)
+    ).all()
+    return batch_id, [tuple(row) for row in deltas]
+
+def complete_outbox_batch(conn, batch_id: str, changes):
+    """Deletes a delivered batch and caches the course states the Course Service returned.
+
+    Both happen on the writer thread, so no seat check sees the batch counted twice.
+    """
+    conn.execute(delete(SlotOutboxEntry).where(SlotOutboxEntry.batch_id == batch_id))
+    for change in changes:
+        course_cache.apply(change.course, change.version)
+
+# --- Seat Leases (sharded deployments) ---
+
+def record_lease_request(conn, request_id: str, course_id: int, seats: int):
+    conn.execute(insert(SeatLeaseRequest).values(id=request_id, course_id=course_id, seats=seats, created_at=time.time()))
+
+def settle_lease_request(conn, request_id: str, course_id: int, granted: int, change) -> bool:
+    """Adds the seats granted to a reservation to the lease; False if it was already settled."""
+    if not conn.execute(delete(SeatLeaseRequest).where(SeatLeaseRequest.id == request_id)).rowcount:
+        return False
+    statement = sqlite_insert(SeatLease).values(course_id=course_id, seats=granted, used_at=time.time())
+    conn.execute(statement.on_conflict_do_update(
+        index_elements=[SeatLease.course_id],
+        set_={"seats": SeatLease.seats + statement.excluded.seats, "used_at": statement.excluded.used_at}
+    ))
+    course_cache.apply(change.course, change.version) # Applied on the writer thread, like the outbox
+    return True
+
+def return_seat_lease(conn, course_id: int) -> int:
+    """Gives a course's leased seats back to the Course Service through the outbox."""
+    seats = conn.execute(select(SeatLease.seats).where(SeatLease.course_id == course_id)).scalar() or 0
+    if seats > 0:
+        conn.execute(update(SeatLease).where(SeatLease.course_id == course_id).values(seats=0))
+        queue_slot_delta(conn, course_id, seats)
+    return seats
+
+def return_idle_seat_leases(conn, idle_before: float) -> int:
+    """Returns the leases that have not been used since the cutoff; returns how many seats went back."""
+    course_ids = conn.execute(
+        select(SeatLease.course_id).where(SeatLease.seats > 0, SeatLease.used_at < idle_before)
+    ).scalars().all()
+    return sum(return_seat_lease(conn, course_id) for course_id in course_ids)
+
+# --- Drops and Course Closures ---
+# Dropping marks the record DROPPED and gives its seat back through the outbox
+# in the same transaction. Closing a course starts a cascade that drops every
+# active enrollment of the course in batches of CLOSURE_BATCH_ROWS: each batch
+# is one short write transaction that also releases all of its seats with a
+# single outbox delta. Progress lives in course_closures, so a cascade that is
+# interrupted by a restart simply continues where it stopped.
+
+def drop_enrollment(conn, enrollment_id: int, student_username: str):
+    """Drops an active enrollment; returns the updated (id, student_username, course_id, grade, status) row.
+
+    With a student_username, records of other students are treated as unknown.
+    """
+    for table in (Enrollment, ArchivedEnrollment):
+        row = conn.execute(
+            select(table.student_username, table.course_id, table.grade, table.status)
+            .where(table.id == enrollment_id)
+        ).first()
+        if row is not None:
+            break
+    else:
+        row = None
+
+    if row is None or (student_username and row.student_username != student_username):
+        raise WriteRejected(grpc.StatusCode.NOT_FOUND, f"Enrollment ID {enrollment_id} not found.")
+    if row.status != "ENROLLED":
+        raise WriteRejected(
+            grpc.StatusCode.FAILED_PRECONDITION,
+            f"Enrollment ID {enrollment_id} is no longer active ({row.status})."
+        )
+
+    # Only hot records can still be ENROLLED
+    conn.execute(
+        update(Enrollment).where(Enrollment.id == enrollment_id).values(status="DROPPED", finished_at=time.time())
+    )
+    adjust_transcript(conn, row.student_username, in_progress=-1)
+    queue_slot_delta(conn, row.course_id, 1)
+    return enrollment_id, row.student_username, row.course_id, row.grade, "DROPPED"
+
+def start_course_closure(conn, course_id: int) -> bool:
+    """Records the closure of a course and cancels its waitlist; False if it was already recorded."""
+    if conn.execute(select(CourseClosure.course_id).where(CourseClosure.course_id == course_id)).first():
+        return False
+
+    active = conn.execute(
+        select(func.count(Enrollment.id)).where(Enrollment.course_id == course_id, Enrollment.status == "ENROLLED")
+    ).scalar()
+    cancelled = conn.execute(
+        update(WaitlistEntry)
+        .where(WaitlistEntry.course_id == course_id, WaitlistEntry.status == "WAITING")
+        .values(status="CANCELLED")
+    ).rowcount
+    return_seat_lease(conn, course_id)
+    conn.execute(insert(CourseClosure).values(
+        course_id=course_id,
+        status="RUNNING",
+        total_enrollments=active,
+        dropped_count=0,
+        cancelled_waitlist=cancelled,
+        started_at=time.time()
+    ))
+    return True
+
+def advance_course_closures(conn, limit: int) -> tuple:
+    """Drops up to `limit` enrollments of the oldest running closure.
+
+    Closures with nothing left to drop are marked DONE on the way. Returns
+    (enrollments dropped, course ids of the closures marked DONE).
+    """
+    finished = []
+    while True:
+        course_id = conn.execute(
+            select(CourseClosure.course_id).where(CourseClosure.status == "RUNNING")
+            .order_by(CourseClosure.started_at).limit(1)
+        ).scalar()
+        if course_id is None:
+            return 0, finished
+
+        rows = conn.execute(
+            select(Enrollment.id, Enrollment.student_username)
+            .where(Enrollment.course_id == course_id, Enrollment.status == "ENROLLED")
+            .order_by(Enrollment.id).limit(limit)
+        ).all()
+        if rows:
+            break
+
+        # Enrollments that raced with the closure are dropped too, so the total can grow
+        conn.execute(
+            update(CourseClosure).where(CourseClosure.course_id == course_id).values(
+                status="DONE",
+                finished_at=time.time(),
+                total_enrollments=func.max(CourseClosure.total_enrollments, CourseClosure.dropped_count)
+            )
+        )
+        finished.append(course_id)
+
+    conn.execute(
+        update(Enrollment)
+        .where(Enrollment.id.in_([enrollment_id for enrollment_id, _ in rows]))
+        .values(status="DROPPED", finished_at=time.time())
+    )
+    adjust_transcripts(conn, {
+        student_username: (0, -count, 0.0)
+        for student_username, count in Counter(student for _, student in rows).items()
+    })
+    queue_slot_delta(conn, course_id, len(rows)) # Every seat of the batch in one delta
+    conn.execute(
+        update(CourseClosure).where(CourseClosure.course_id == course_id)
+        .values(dropped_count=CourseClosure.dropped_count + len(rows))
+    )
+    return len(rows), finished
+
+def apply_grade(conn, enrollment_id: int, grade: float):
+    """Stores a grade and marks the enrollment COMPLETED.
+
+    Returns the updated (id, student_username, course_id, grade, status) row, read
+    back in the same transaction, or None if the id is unknown.
+    """
+    for table in (Enrollment, ArchivedEnrollment): # Archived records can still be re-graded
+        row = conn.execute(
+            select(table.student_username, table.course_id, table.grade, table.status)
+            .where(table.id == enrollment_id)
+        ).first()
+        if row is not None:
+            break
+    else:
+        return None
+
+    student_username, course_id, old_grade, old_status = row
+    conn.execute(
+        update(table)
+        .where(table.id == enrollment_id)
+        .values(grade=grade, status="COMPLETED", finished_at=time.time())
+    )
+    completed, in_progress, grade_points = grade_transcript_delta(old_status, old_grade, grade)
+    adjust_transcript(conn, student_username, completed, in_progress, grade_points)
+    return enrollment_id, student_username, course_id, grade, "COMPLETED"
+
+def apply_grades(conn, grades: list) -> set:
+    """Applies (enrollment_id, grade) pairs with one bulk UPDATE; returns the ids that exist."""
+    found = {} # enrollment_id -> (table, student_username, old_grade, old_status)
+    ids = [enrollment_id for enrollment_id, _ in grades]
+    for table in ENROLLMENT_TABLES:
+        for start in range(0, len(ids), 500): # Stay well below SQLite's bound-parameter limit
+            for enrollment_id, student_username, old_grade, old_status in conn.execute(
+                select(table.id, table.student_username, table.grade, table.status)
+                .where(table.id.in_(ids[start:start + 500]))
+            ):
+                found[enrollment_id] = (table, student_username, old_grade, old_status)
+
+    finished_at = time.time()
+    for table in ENROLLMENT_TABLES:
+        rows = [
+            {"b_id": enrollment_id, "b_grade": grade} for enrollment_id, grade in grades
+            if enrollment_id in found and found[enrollment_id][0] is table
+        ]
+        if rows:
+            conn.execute(
+                update(table)
+                .where(table.id == bindparam("b_id"))
+                .values(grade=bindparam("b_grade"), status="COMPLETED", finished_at=finished_at),
+                rows
+            )
+
+    # One transcript adjustment per student, however many of their rows the sheet had
+    deltas = {}
+    for enrollment_id, grade in grades:
+        if enrollment_id in found:
+            _, student_username, old_grade, old_status = found[enrollment_id]
+            delta = grade_transcript_delta(old_status, old_grade, grade)
+            total = deltas.get(student_username, (0, 0, 0.0))
+            deltas[student_username] = tuple(a + b for a, b in zip(total, delta))
+    adjust_transcripts(conn, deltas)
+    return set(found)
+
+def archive_finished_enrollments(conn, finished_before: float, limit: int) -> int:
+    """Moves up to `limit` enrollments that finished before the cutoff into the archive table.
+
+    Records finished before 'finished_at' existed have no timestamp and count as old.
+    New ids are allocated past the newest id of both tables (next_enrollment_id), so
+    archived ids are never reused. Returns the number of rows moved.
+    """
+    rows = conn.execute(
+        select(Enrollment.id, Enrollment.student_username).where(
+            Enrollment.status.in_(("COMPLETED", "DROPPED")),
+            or_(Enrollment.finished_at.is_(None), Enrollment.finished_at < finished_before)
+        ).order_by(Enrollment.id).limit(limit)
+    ).all()
+    ids = [enrollment_id for enrollment_id, _ in rows]
+    if ids:
+        columns = [getattr(Enrollment, name) for name in ENROLLMENT_COLUMNS]
+        conn.execute(
+            insert(ArchivedEnrollment).from_select(ENROLLMENT_COLUMNS, select(*columns).where(Enrollment.id.in_(ids)))
+        )
+        conn.execute(delete(Enrollment).where(Enrollment.id.in_(ids)))
+        # The move can reorder a student's ViewGrades records: give them a new version
+        adjust_transcripts(conn, {student_username: (0, 0, 0.0) for _, student_username in rows})
+    return len(ids)
+
+def record_response(conn, key: str, fingerprint: str, response_bytes: bytes):
+    """Stores the response of an idempotency-keyed call (replacing an expired record of the key)."""
+    statement = sqlite_insert(IdempotencyRecord).values(
+        key=key, fingerprint=fingerprint, response=response_bytes, created_at=time.time()
+    )
+    conn.execute(statement.on_conflict_do_update(
+        index_elements=[IdempotencyRecord.key],
+        set_={"fingerprint": statement.excluded.fingerprint, "response": statement.excluded.response,
+              "created_at": statement.excluded.created_at}
+    ))
+
+def recorded_write(operation, key: str, fingerprint: str, respond):
+    """Wraps a write operation so its response is recorded under an idempotency key in the same transaction.
+
+    `respond(result)` builds the call's response from the operation's result, or
+    returns None when the call had no effect (nothing is recorded then). If the key
+    already has a live record, the operation does not run: AlreadyRecorded is raised.
+    """
+    def run(conn, *args):
+        recorded = conn.execute(
+            select(IdempotencyRecord.fingerprint, IdempotencyRecord.response).where(
+                IdempotencyRecord.key == key,
+                IdempotencyRecord.created_at > time.time() - IDEMPOTENCY_TTL_SECONDS
+            )
+        ).first()
+        if recorded is not None:
+            raise AlreadyRecorded(*recorded)
+        result = operation(conn, *args)
+        response = respond(result)
+        if response is not None:
+            record_response(conn, key, fingerprint, response.SerializeToString())
+        return result
+    return run
+
+def purge_idempotency_keys(conn, not_before: float, max_keys: int, limit: int) -> int:
+    """Deletes up to `limit` records that expired or, beyond `max_keys`, are the oldest. Returns the number deleted."""
+    cutoff = not_before
+    newest_excess = conn.execute( # created_at of the newest record that no longer fits in max_keys
+        select(IdempotencyRecord.created_at).order_by(IdempotencyRecord.created_at.desc()).offset(max_keys).limit(1)
+    ).scalar()
+    if newest_excess is not None:
+        cutoff = max(cutoff, newest_excess)
+    keys = conn.execute(
+        select(IdempotencyRecord.key).where(IdempotencyRecord.created_at <= cutoff)
+        .order_by(IdempotencyRecord.created_at).limit(limit)
+    ).scalars().all()
+    if keys:
+        conn.execute(delete(IdempotencyRecord).where(IdempotencyRecord.key.in_(keys)))
+    return len(keys)
+
+def insert_ticket(conn, ticket_id: str, student_username: str, course_id: int):
+    """Records a newly queued enrollment ticket."""
+    conn.execute(
+        insert(EnrollmentTicket).values(
+            id=ticket_id,
+            student_username=student_username,
+            course_id=course_id,
+            status="QUEUED",
+            message="Waiting in the enrollment queue.",
+            created_at=time.time()
+        )
+    )
+
+def settle_ticket_batch(conn, course_id: int, tickets: list, final: bool = True) -> list:
+    """Settles queued (ticket_id, student) tickets of one course, oldest first, in one transaction.
+
+    The first N eligible tickets (N = free seats) are enrolled and the rest are failed.
+    Unless `final`, tickets that only lack a seat stay queued instead; they are returned
+    so the caller can reserve more seats and settle them again.
+    """
+    try:
+        seats, full_reason = free_seats(conn, course_id), COURSE_FULL_MESSAGE
+    except WriteRejected as e:
+        seats, full_reason = 0, e.message
+    waitlisted = has_waiting_students(conn, course_id)
+
+    # A replica sharing this database may have settled some of them already
+    queued = set(conn.execute(
+        select(EnrollmentTicket.id)
+        .where(EnrollmentTicket.id.in_([ticket_id for ticket_id, _ in tickets]), EnrollmentTicket.status == "QUEUED")
+    ).scalars())
+    tickets = [ticket for ticket in tickets if ticket[0] in queued]
+
+    enrollment_ids, seen, unsettled = {}, set(), []
+    for ticket_id, student_username in tickets:
+        if waitlisted:
+            reason = WAITLIST_FIRST_MESSAGE
+        elif student_username in seen or is_enrolled(conn, student_username, course_id):
+            reason = "Student is already enrolled in this course."
+        elif len(enrollment_ids) >= seats:
+            if not final and full_reason == COURSE_FULL_MESSAGE:
+                unsettled.append((ticket_id, student_username))
+                continue
+            reason = full_reason
+        else:
+            seen.add(student_username)
+            enrollment_id = insert_enrollment(conn, student_username, course_id)
+            conn.execute(
+                update(EnrollmentTicket)
+                .where(EnrollmentTicket.id == ticket_id)
+                .values(status="ENROLLED", enrollment_id=enrollment_id,
+                        message=f"Successfully enrolled in Course ID {course_id}.")
+            )
+            enrollment_ids[ticket_id] = enrollment_id
+            continue
+
+        conn.execute(
+            update(EnrollmentTicket)
+            .where(EnrollmentTicket.id == ticket_id)
+            .values(status="FAILED", message=reason)
+        )
+
+    if enrollment_ids:
+        take_seats(conn, course_id, len(enrollment_ids))
+    return unsettled
+
+def insert_waitlist_entry(conn, student_username: str, course_id: int) -> int:
+    """Appends a student to the back of a course's waitlist; returns the entry id."""
+    result = conn.execute(
+        insert(WaitlistEntry).values(
+            student_username=student_username,
+            course_id=course_id,
+            status="WAITING",
+            created_at=time.time()
+        )
+    )
+    return result.inserted_primary_key[0]
+
+def promote_waitlist_entries(conn, course_id: int, entries: list) -> tuple:
+    """Turns (waitlist_id, student) entries into enrollments, in order, while seats are free.
+
+    Entries whose student got enrolled some other way meanwhile are cancelled.
+    Returns (promoted, cancelled).
+    """
+    try:
+        seats = free_seats(conn, course_id)
+    except WriteRejected:
+        return 0, 0
+
+    promoted = cancelled = 0
+    for waitlist_id, student_username in entries:
+        if promoted >= seats:
+            break
+
+        if is_enrolled(conn, student_username, course_id):
+            conn.execute(
+                update(WaitlistEntry).where(WaitlistEntry.id == waitlist_id).values(status="CANCELLED")
+            )
+            cancelled += 1
+            continue
+
+        enrollment_id = insert_enrollment(conn, student_username, course_id)
+        conn.execute(
+            update(WaitlistEntry)
+            .where(WaitlistEntry.id == waitlist_id)
+            .values(status="PROMOTED", enrollment_id=enrollment_id)
+        )
+        promoted += 1
+
+    if promoted:
+        take_seats(conn, course_id, promoted)
+    return promoted, cancelled
 
 # --- gRPC Inter-Service Client Helper ---
 
+@functools.lru_cache(maxsize=None)
 def get_course_stub():
-    """Returns a gRPC stub for the Course Service."""
-    channel = grpc.insecure_channel(COURSE_SERVICE_ADDRESS)
+    """Returns the gRPC stub for the Course Service (balanced over its replicas, with call policies)."""
+    channel = policy_channel("course", service_channel(COURSE_SERVICE_ADDRESS, LOAD_BALANCING_POLICY), COURSE_CALL_POLICIES)
     return course_pb2_grpc.CourseServiceStub(channel)
 
+def has_waitlist(course_id: int) -> bool:
+    """True while students are waiting for a course; new direct enrollments must queue behind them."""
+    return bool(WAITLIST_HEAD.first(course_id=course_id, limit=1))
+
+# --- Course Catalog Cache ---
+# The course watcher follows the Course Service change stream; the cache keeps
+# the latest state of every course (closed ones included), so course codes,
+# titles and slot counts are read locally (see course_cache.py).
+
+course_watcher = CourseWatcher(get_course_stub)
+course_cache = CourseCatalogCache(course_watcher) # Registered first: later listeners see the new state
+
+# --- Slot Outbox Relay ---
+
+def deliver_slot_deltas(batch_id: str, deltas: list):
+    """Sends one outbox batch to the Course Service; returns the resulting course states."""
+    response = get_course_stub().ApplySlotDeltas(
+        course_pb2.ApplySlotDeltasRequest(
+            batch_id=batch_id,
+            deltas=[course_pb2.SlotDelta(course_id=course_id, delta=delta) for course_id, delta in deltas]
+        )
+    )
+    return response.courses
+
+outbox_relay = OutboxRelay(
+    lambda: write_batcher.execute(claim_outbox_batch, OUTBOX_BATCH_ROWS),
+    deliver_slot_deltas,
+    lambda batch_id, changes: write_batcher.execute(complete_outbox_batch, batch_id, changes),
+    poll_seconds=OUTBOX_POLL_SECONDS,
+    retry_seconds=OUTBOX_RETRY_SECONDS,
+    max_retry_seconds=OUTBOX_MAX_RETRY_SECONDS
+)
+
+# --- Seat Lease Reservations ---
+# Only used with SHARD_COUNT > 1. Before a write that takes seats, the caller
+# makes sure the shard's lease covers them. A reservation is recorded locally
+# before ReserveSlots is called and settled afterwards; the Course Service
+# applies a reservation id once, so a reservation interrupted by a failure or a
+# restart is simply resent and granted seats are never lost.
+
+lease_locks = {} # course_id -> Lock; one reservation per course at a time
+lease_locks_guard = threading.Lock()
+
+def reserve_seat_lease(request_id: str, course_id: int, seats: int) -> int:
+    """Sends one reservation and adds the granted seats to the lease; returns the seats granted."""
+    response = get_course_stub().ReserveSlots(
+        course_pb2.ReserveSlotsRequest(reservation_id=request_id, course_id=course_id, seats=seats)
+    )
+    write_batcher.execute(settle_lease_request, request_id, course_id, response.granted, response.course)
+    return response.granted
+
+def ensure_seat_lease(course_id: int, wanted: int):
+    """Makes sure this shard has `wanted` seats of a course leased, reserving a block if not.
+
+    Does nothing without seat leases, or when the catalog says the course is full
+    or closed; the seat check inside the write then reports it.
+    """
+    if not SEAT_LEASES or (SEAT_LEASE_BALANCE.first(course_id=course_id) or (0,))[0] >= wanted:
+        return
+
+    with lease_locks_guard:
+        lock = lease_locks.setdefault(course_id, threading.Lock())
+    with lock:
+        balance = (SEAT_LEASE_BALANCE.first(course_id=course_id) or (0,))[0]
+        slots, is_open = course_cache.slots(course_id)
+        if balance >= wanted or not is_open or slots <= 0:
+            return
+
+        # Smaller blocks as the course fills up, so no shard hoards the last seats
+        block = max(1, min(SEAT_LEASE_BLOCK, slots // SHARD_COUNT))
+        seats = min(slots, max(wanted - balance, block))
+        request_id = uuid.uuid4().hex
+        write_batcher.execute(record_lease_request, request_id, course_id, seats)
+        try:
+            reserve_seat_lease(request_id, course_id, seats)
+        except grpc.RpcError as e:
+            print(f"Seat reservation for Course ID {course_id} failed ({e.code().name}); it will be resent.")
+
+def with_seat_lease(course_id: int, seats: int, write):
+    """Runs `write()`, a write that takes seats of a course, once the lease covers them.
+
+    Concurrent writes may use up the seats reserved for this one; as long as the
+    catalog still has free slots, more are reserved and the write is retried.
+    """
+    for attempt in range(1, SEAT_LEASE_ATTEMPTS + 1):
+        ensure_seat_lease(course_id, seats)
+        try:
+            return write()
+        except SeatsExhausted:
+            if not SEAT_LEASES or attempt == SEAT_LEASE_ATTEMPTS or course_cache.slots(course_id)[0] <= 0:
+                raise
+
+def lease_may_help(course_id: int, message: str) -> bool:
+    """True if a failure for lack of seats might succeed after reserving more."""
+    return SEAT_LEASES and message == COURSE_FULL_MESSAGE and course_cache.slots(course_id)[0] > 0
+
+def resend_lease_request() -> int:
+    """Resends the oldest reservation left unanswered (e.g. by a timeout or a restart); 0 when none are left."""
+    pending = SeatLeaseRequest.__table__
+    with storage.reader.connect() as conn:
+        row = conn.execute(
+            select(pending.c.id, pending.c.course_id, pending.c.seats)
+            .where(pending.c.created_at < time.time() - SEAT_LEASE_TIMEOUT_SECONDS)
+            .order_by(pending.c.created_at).limit(1)
+        ).first()
+    if row is None:
+        return 0
+    reserve_seat_lease(*row)
+    return 1
+
+lease_recovery = BackgroundBatchJob(
+    resend_lease_request,
+    interval_seconds=SEAT_LEASE_INTERVAL_SECONDS,
+    report="Resent {} unanswered seat reservations.",
+    name="lease-recovery"
+)
+
+lease_returner = BackgroundBatchJob(
+    lambda: write_batcher.execute(return_idle_seat_leases, time.time() - SEAT_LEASE_IDLE_SECONDS),
+    interval_seconds=SEAT_LEASE_INTERVAL_SECONDS,
+    report="Returned {} idle leased seats.",
+    name="lease-returner"
+)
+
+# --- Waitlist Promotion ---
+# Whenever a course with waiting students has free seats (after a drop, an
+# UpdateSlots increase or a new JoinWaitlist), it is marked and the promoter
+# moves the head of its waitlist into enrollments.
+
+def promote_waitlist(course_id: int):
+    """One promotion pass: enrolls the students at the head of the waitlist into the free seats."""
+    slots, is_open = course_cache.slots(course_id)
+    if not is_open or slots <= 0:
+        return
+
+    heads = WAITLIST_HEAD.all(course_id=course_id, limit=slots)
+    if not heads:
+        return
+    ensure_seat_lease(course_id, len(heads))
+
+    promoted, cancelled = write_batcher.execute(promote_waitlist_entries, course_id, heads)
+    if promoted:
+        print(f"Promoted {promoted} waitlisted students into Course ID {course_id}.")
+    if cancelled:
+        waitlist_promoter.mark(course_id) # Those seats are still free for the students behind them
+    # Once the relay has delivered the seats just taken, the course comes back on
+    # the change stream and is marked again if seats and waiters remain.
+
+waitlist_promoter = WaitlistPromoter(promote_waitlist)
+
+def on_course_change(course, version):
+    """Course watcher listener: wakes the promoter when a course with waiting students has free seats,
+    and starts the drop cascade when a course is closed."""
+    if course.is_open and course.slots > 0 and has_waitlist(course.id):
+        waitlist_promoter.mark(course.id)
+    elif not course.is_open and not COURSE_CLOSURE.first(course_id=course.id):
+        # Not waited for: the watcher thread must keep reading the change stream
+        started = write_batcher.submit(start_course_closure, course.id)
+        started.add_done_callback(lambda _: closure_job.wake())
+
+course_watcher.add_listener(on_course_change)
+
+def make_grade_record(enrollment_id, student_username, course_id, grade, status, course_data=None):
+    """Builds a GradeRecord from an enrollment row and (optionally) its course."""
+    return enrollment_pb2.GradeRecord(
+        enrollment_id=enrollment_id,
+        course_id=course_id,
+        course_code=course_data.code if course_data else "UNKNOWN",
+        course_title=course_data.title if course_data else "UNKNOWN COURSE",
+        student_username=student_username,
+        grade=grade if grade is not None else 0.0, # Ungraded records carry 0.0
+        status=status
+    )
+
+# Hot/archive partitioning: finished enrollments are moved out of the compact
+# hot table in small batches once they are ARCHIVE_AFTER_SECONDS old
+archive_mover = BackgroundBatchJob(
+    lambda: write_batcher.execute(
+        archive_finished_enrollments, time.time() - ARCHIVE_AFTER_SECONDS, ARCHIVE_BATCH_ROWS
+    ),
+    interval_seconds=ARCHIVE_INTERVAL_SECONDS,
+    report="Archived {} finished enrollments.",
+    name="archive-mover"
+)
+
+def run_closure_batch() -> int:
+    """One committed batch of closure drops; the closures it finished are reported by the closure job."""
+    dropped, finished = write_batcher.execute(advance_course_closures, CLOSURE_BATCH_ROWS)
+    for course_id in finished:
+        closure_job.log(f"Closure of Course ID {course_id} finished.")
+    return dropped
+
+closure_job = BackgroundBatchJob(
+    run_closure_batch,
+    interval_seconds=CLOSURE_INTERVAL_SECONDS,
+    report="Dropped {} enrollments of closed courses.",
+    name="closure-cascade"
+)
+
+# --- Idempotency Keys ---
+
+idempotency_guard = IdempotencyGuard(
+    lambda key: IDEMPOTENT_RESPONSE.first(key=key, not_before=time.time() - IDEMPOTENCY_TTL_SECONDS)
+)
+
+idempotency_purger = BackgroundBatchJob(
+    lambda: write_batcher.execute(
+        purge_idempotency_keys, time.time() - IDEMPOTENCY_TTL_SECONDS, IDEMPOTENCY_MAX_KEYS, IDEMPOTENCY_PURGE_BATCH
+    ),
+    interval_seconds=IDEMPOTENCY_PURGE_INTERVAL_SECONDS,
+    report="Purged {} expired idempotency keys.",
+    name="idempotency-purger"
+)
+
+# --- Queued Enrollment Processing ---
+
+def process_ticket_batch(course_id: int, tickets: list):
+    """Settles up to ENROLLMENT_QUEUE_BATCH queued tickets of one course in a single transaction."""
+    course_cache.ready.wait() # Seat checks need the catalog; tickets simply wait until it is loaded
+    for attempt in range(1, SEAT_LEASE_ATTEMPTS + 1):
+        ensure_seat_lease(course_id, len(tickets))
+        final = not SEAT_LEASES or attempt == SEAT_LEASE_ATTEMPTS or course_cache.slots(course_id)[0] <= 0
+        tickets = write_batcher.execute(settle_ticket_batch, course_id, tickets, final)
+        if not tickets:
+            return
+
+ticket_queue = TicketQueue(
+    process_ticket_batch,
+    workers=ENROLLMENT_QUEUE_WORKERS,
+    max_batch=ENROLLMENT_QUEUE_BATCH,
+    name="enrollment-queue"
+)
+
+def requeue_pending_tickets():
+    """Puts tickets that were still QUEUED when the service stopped back in line."""
+    pending = QUEUED_TICKETS.all()
+    for ticket_id, student_username, course_id in pending:
+        ticket_queue.put(course_id, (ticket_id, student_username))
+    return len(pending)
+
 # --- gRPC Servicer Implementation ---
 
 class EnrollmentServicer(enrollment_pb2_grpc.EnrollmentServiceServicer):
     """Implements the Enrollment Service defined in enrollment.proto."""
 
-    def Enroll(self, request, context):
-        """Handles student enrollment, checks course availability via Course Service."""
-        db = SessionLocal()
-        course_stub = get_course_stub()
-        
+    def _idempotent(self, method, caller, request, response_type, context, handler):
+        """Runs `handler(request, context, record)` at most once per idempotency key.
+
+        Keys are scoped by method and caller. The handler wraps its write operation
+        with `record` so the response is stored in the same transaction.
+        """
+        key = f"{method}:{caller}:{request.idempotency_key}"
+        fingerprint = request_fingerprint(request)
+
+        def record(operation, respond):
+            return recorded_write(operation, key, fingerprint, respond)
+
         try:
-            # 1. Check if student is already enrolled
-            existing = db.query(Enrollment).filter(
-                Enrollment.student_username == request.student_username,
-                Enrollment.course_id == request.course_id,
-                Enrollment.status == "ENROLLED"
-            ).first()
-            
-            if existing:
-                context.set_code(grpc.StatusCode.ALREADY_EXISTS)
-                context.set_details("Student is already enrolled in this course.")
-                return enrollment_pb2.EnrollResponse(success=False)
-
-            # 2. Call Course Service to check course details and attempt slot update
-            try:
-                # We need to list all courses to find the course details (e.g., current slots)
-                list_request = course_pb2.ListCoursesRequest()
-                # Assuming the Course Service is available, otherwise this raises RpcError
-                list_response = course_stub.ListCourses(list_request) 
-                
-                course_details = next((c for c in list_response.courses if c.id == request.course_id), None)
-                
-                if not course_details:
-                    context.set_code(grpc.StatusCode.NOT_FOUND)
-                    context.set_details(f"Course ID {request.course_id} not found or is closed.")
-                    return enrollment_pb2.EnrollResponse(success=False)
-                
-                if course_details.slots <= 0:
-                    context.set_code(grpc.StatusCode.RESOURCE_EXHAUSTED)
-                    context.set_details("Course is full.")
-                    return enrollment_pb2.EnrollResponse(success=False)
-
-                # Attempt to reserve a slot by calling UpdateSlots on the Course Service
-                new_slots = course_details.slots - 1
-                update_request = course_pb2.UpdateSlotsRequest(
-                    course_id=request.course_id,
-                    new_slots=new_slots
-                )
-                update_response = course_stub.UpdateSlots(update_request)
-                
-                if not update_response.success:
-                    context.set_code(grpc.StatusCode.ABORTED)
-                    context.set_details(f"Enrollment failed due to slot update error: {update_response.message}")
-                    return enrollment_pb2.EnrollResponse(success=False)
-
-            except grpc.RpcError as e:
-                # Handle failure in inter-service communication
-                context.set_code(grpc.StatusCode.UNAVAILABLE)
-                context.set_details(f"Course Service is unavailable or returned an error: {e.details()}")
-                return enrollment_pb2.EnrollResponse(success=False)
-
-
-            # 3. Create Enrollment Record
-            new_enrollment = Enrollment(
-                student_username=request.student_username,
-                course_id=request.course_id,
-                status="ENROLLED"
+            response, replayed = idempotency_guard.run(
+                key, fingerprint, response_type, lambda: handler(request, context, record)
+            )
+        except IdempotencyConflict:
+            context.set_code(grpc.StatusCode.INVALID_ARGUMENT)
+            context.set_details("Idempotency key was already used for a different request.")
+            return response_type(success=False)
+        if replayed:
+            context.set_code(grpc.StatusCode.OK) # Clears a failure the handler reported before the key was found
+            context.set_details("")
+        return response
+
+    def Enroll(self, request, context):
+        """Handles student enrollment; seats are checked against the local catalog cache and slot outbox."""
+        if request.idempotency_key:
+            return self._idempotent(
+                "Enroll", request.student_username, request, enrollment_pb2.EnrollResponse, context, self._enroll
             )
-            db.add(new_enrollment)
-            db.commit()
-            db.refresh(new_enrollment)
+        return self._enroll(request, context, lambda operation, respond: operation) # No key: nothing to record
+
+    def _enroll(self, request, context, record):
+        if request.queued:
+            return self._enqueue_enrollment(request, context, record)
+
+        # 1. Check if student is already enrolled
+        existing = ACTIVE_ENROLLMENT_ID.first(
+            student_username=request.student_username,
+            course_id=request.course_id
+        )
 
+        if existing:
+            context.set_code(grpc.StatusCode.ALREADY_EXISTS)
+            context.set_details("Student is already enrolled in this course.")
+            return enrollment_pb2.EnrollResponse(success=False)
+
+        if not course_cache.wait_ready(CATALOG_READY_TIMEOUT_SECONDS):
+            context.set_code(grpc.StatusCode.UNAVAILABLE)
+            context.set_details("Course catalog is still loading. Try again shortly.")
+            return enrollment_pb2.EnrollResponse(success=False)
+
+        # 2. Take a seat and create the record in one local transaction (committed
+        # together with concurrent writes); the slot change reaches the Course
+        # Service through the outbox, off the request path
+        def respond(result):
+            enrollment_id, seats_left = result
             return enrollment_pb2.EnrollResponse(
                 success=True,
-                message=f"Successfully enrolled in Course ID {request.course_id}. Slots remaining: {new_slots}",
-                enrollment_id=new_enrollment.id
+                message=f"Successfully enrolled in Course ID {request.course_id}. Slots remaining: {seats_left}",
+                enrollment_id=enrollment_id
             )
 
-        finally:
-            db.close()
+        try:
+            result = with_seat_lease(request.course_id, 1, lambda: write_batcher.execute(
+                record(enroll_with_seat, respond), request.student_username, request.course_id
+            ))
+        except WriteRejected as e:
+            context.set_code(e.code)
+            context.set_details(e.message)
+            return enrollment_pb2.EnrollResponse(success=False)
+        return respond(result)
+
+    def _enqueue_enrollment(self, request, context, record):
+        """Queued mode: records a ticket and returns immediately; a worker settles it later."""
+        if ACTIVE_ENROLLMENT_ID.first(student_username=request.student_username, course_id=request.course_id):
+            context.set_code(grpc.StatusCode.ALREADY_EXISTS)
+            context.set_details("Student is already enrolled in this course.")
+            return enrollment_pb2.EnrollResponse(success=False)
+
+        # A repeated click returns the ticket that is already waiting
+        existing = QUEUED_TICKET_ID.first(student_username=request.student_username, course_id=request.course_id)
+        if existing:
+            return enrollment_pb2.EnrollResponse(
+                success=True,
+                message=f"Enrollment in Course ID {request.course_id} is already queued.",
+                ticket_id=existing[0]
+            )
+
+        ticket_id = uuid.uuid4().hex
+        response = enrollment_pb2.EnrollResponse(
+            success=True,
+            message=f"Enrollment in Course ID {request.course_id} queued.",
+            ticket_id=ticket_id
+        )
+        # The ticket joins its course's queue from the writer thread, right after its
+        # commit: tickets are queued in commit order, which keeps each course FIFO
+        write_batcher.execute(
+            record(insert_ticket, lambda _: response), ticket_id, request.student_username, request.course_id,
+            after_commit=lambda _: ticket_queue.put(request.course_id, (ticket_id, request.student_username))
+        )
+        return response
+
+    def EnrollMany(self, request, context):
+        """Cart checkout: takes a seat in several courses and records them in one transaction."""
+        course_ids = list(dict.fromkeys(request.course_ids)) # De-duplicate, keep request order
+
+        if not course_ids or len(course_ids) > ENROLL_MANY_MAX_COURSES:
+            context.set_code(grpc.StatusCode.INVALID_ARGUMENT)
+            context.set_details(f"Provide between 1 and {ENROLL_MANY_MAX_COURSES} course IDs.")
+            return enrollment_pb2.EnrollManyResponse(success=False)
+
+        if not course_cache.wait_ready(CATALOG_READY_TIMEOUT_SECONDS):
+            context.set_code(grpc.StatusCode.UNAVAILABLE)
+            context.set_details("Course catalog is still loading. Try again shortly.")
+            return enrollment_pb2.EnrollManyResponse(success=False)
+
+        # Check and take a seat in every course, and record them, in a single transaction
+        enrollment_ids, failures, pending = {}, {}, course_ids
+        for attempt in range(1, SEAT_LEASE_ATTEMPTS + 1):
+            for course_id in pending:
+                ensure_seat_lease(course_id, 1)
+            enrolled, failed = write_batcher.execute(
+                enroll_many_with_seats, request.student_username, pending, request.all_or_nothing
+            )
+            enrollment_ids.update(enrolled)
+            failures.update(failed)
+
+            # With seat leases, retry courses that only lacked a leased seat
+            retry = [course_id for course_id, message in failed.items() if lease_may_help(course_id, message)]
+            if not retry or attempt == SEAT_LEASE_ATTEMPTS:
+                break
+            if request.all_or_nothing:
+                if len(retry) < sum(message != ALL_OR_NOTHING_MESSAGE for message in failed.values()):
+                    break # Another course failed for good: retrying cannot help
+                retry = pending
+            for course_id in retry:
+                del failures[course_id]
+            pending = retry
+
+        results = [
+            enrollment_pb2.CourseEnrollResult(
+                course_id=course_id,
+                success=course_id in enrollment_ids,
+                message=failures.get(course_id, f"Successfully enrolled in Course ID {course_id}."),
+                enrollment_id=enrollment_ids.get(course_id, 0)
+            ) for course_id in course_ids
+        ]
+
+        return enrollment_pb2.EnrollManyResponse(
+            success=not failures,
+            message=f"Enrolled in {len(enrollment_ids)} of {len(course_ids)} courses.",
+            results=results
+        )
+
+    def JoinWaitlist(self, request, context):
+        """Puts a student on a course's waitlist; the promoter enrolls them when a seat frees up."""
+        if ACTIVE_ENROLLMENT_ID.first(student_username=request.student_username, course_id=request.course_id):
+            context.set_code(grpc.StatusCode.ALREADY_EXISTS)
+            context.set_details("Student is already enrolled in this course.")
+            return enrollment_pb2.JoinWaitlistResponse(success=False)
+
+        if not course_cache.ready.is_set():
+            context.set_code(grpc.StatusCode.UNAVAILABLE)
+            context.set_details("Course catalog is still loading. Try again shortly.")
+            return enrollment_pb2.JoinWaitlistResponse(success=False)
+
+        slots, is_open = course_cache.slots(request.course_id)
+        if not is_open:
+            context.set_code(grpc.StatusCode.NOT_FOUND)
+            context.set_details(f"Course ID {request.course_id} not found or is closed.")
+            return enrollment_pb2.JoinWaitlistResponse(success=False)
+
+        existing = WAITING_ENTRY_ID.first(student_username=request.student_username, course_id=request.course_id)
+        if existing:
+            waitlist_id = existing[0]
+            message = f"Already on the waitlist for Course ID {request.course_id}."
+        else:
+            waitlist_id = write_batcher.execute(insert_waitlist_entry, request.student_username, request.course_id)
+            message = f"Joined the waitlist for Course ID {request.course_id}."
+
+        position = WAITLIST_POSITION.first(course_id=request.course_id, waitlist_id=waitlist_id)[0]
+
+        # Seats may already be free (e.g. the course was not actually full)
+        if slots > 0:
+            waitlist_promoter.mark(request.course_id)
+
+        return enrollment_pb2.JoinWaitlistResponse(
+            success=True,
+            message=message,
+            waitlist_id=waitlist_id,
+            position=position
+        )
+
+    def GetEnrollmentStatus(self, request, context):
+        """Reports the outcome of a queued enrollment ticket."""
+        ticket = TICKET_BY_ID.first(ticket_id=request.ticket_id)
+
+        if not ticket:
+            context.set_code(grpc.StatusCode.NOT_FOUND)
+            context.set_details(f"Enrollment ticket {request.ticket_id} not found.")
+            return enrollment_pb2.EnrollmentStatusResponse()
+
+        status, message, enrollment_id, course_id, student_username = ticket
+        return enrollment_pb2.EnrollmentStatusResponse(
+            ticket_id=request.ticket_id,
+            status=status,
+            message=message,
+            enrollment_id=enrollment_id or 0,
+            course_id=course_id,
+            student_username=student_username
+        )
 
 
     def ViewGrades(self, request, context):
         """Allows students to view their enrollment records and grades."""
-        db = SessionLocal()
-        course_stub = get_course_stub()
-        
-        try:
-            # 1. Get all enrollments for the student
-            enrollments = db.query(Enrollment).filter(
-                Enrollment.student_username == request.student_username
-            ).all()
-
-            if not enrollments:
-                context.set_code(grpc.StatusCode.NOT_FOUND)
-                context.set_details("No enrollment records found for this student.")
-                return enrollment_pb2.ViewGradesResponse()
-
-            # 2. Get Course details from Course Service
-            list_response = course_stub.ListCourses(course_pb2.ListCoursesRequest())
-            course_map = {c.id: c for c in list_response.courses}
-
-            records = []
-            for e in enrollments:
-                course_data = course_map.get(e.course_id)
-                
-                # Check if grade is present (not None) before passing to gRPC message
-                grade_value = e.grade if e.grade is not None else 0.0
-
-                records.append(
-                    enrollment_pb2.GradeRecord(
-                        enrollment_id=e.id,
-                        course_id=e.course_id,
-                        course_code=course_data.code if course_data else "UNKNOWN",
-                        course_title=course_data.title if course_data else "UNKNOWN COURSE",
-                        student_username=e.student_username,
-                        grade=grade_value, 
-                        status=e.status
-                    )
-                )
-
-            return enrollment_pb2.ViewGradesResponse(records=records)
+        # 1. Get all enrollments for the student
+        version_before = GRADES_VERSION.first(student_username=request.student_username)
+        enrollments = STUDENT_ENROLLMENTS.all(student_username=request.student_username)
 
-        except grpc.RpcError as e:
-            context.set_code(grpc.StatusCode.UNAVAILABLE)
-            context.set_details(f"Course Service is unavailable or returned an error: {e.details()}")
+        if not enrollments:
+            context.set_code(grpc.StatusCode.NOT_FOUND)
+            context.set_details("No enrollment records found for this student.")
             return enrollment_pb2.ViewGradesResponse()
-        finally:
-            db.close()
+
+        # 2. Join in course details from the local catalog cache. Right after
+        # startup, wait briefly for the initial snapshot; if the Course Service
+        # is still unreachable the records are returned with UNKNOWN courses.
+        course_cache.wait_ready(CATALOG_READY_TIMEOUT_SECONDS)
+
+        courses = [course_cache.get(course_id) for _, course_id, _, _ in enrollments]
+        records = [
+            make_grade_record(enrollment_id, request.student_username, course_id, grade, status, course_data)
+            for (enrollment_id, course_id, grade, status), course_data in zip(enrollments, courses)
+        ]
+
+        # The records belong to the version read before them if it is still current
+        # afterwards; records of UNKNOWN courses change without a write, so get none
+        version = 0
+        if version_before and None not in courses:
+            if GRADES_VERSION.first(student_username=request.student_username) == version_before:
+                version = version_before[0]
+        return enrollment_pb2.ViewGradesResponse(records=records, version=version)
+
+    def GetGradesVersion(self, request, context):
+        """Returns the version of a student's records alone (a primary-key read)."""
+        row = GRADES_VERSION.first(student_username=request.student_username)
+        return enrollment_pb2.GradesVersionResponse(version=row[0] if row else 0)
 
 
     def UploadGrade(self, request, context):
         """Allows faculty to upload a grade for a specific enrollment record."""
-        db = SessionLocal()
-        try:
-            enrollment = db.query(Enrollment).filter(
-                Enrollment.id == request.enrollment_id
-            ).first()
-
-            if not enrollment:
-                context.set_code(grpc.StatusCode.NOT_FOUND)
-                context.set_details(f"Enrollment ID {request.enrollment_id} not found.")
-                return enrollment_pb2.UploadGradeResponse(success=False)
-                
-            # Basic validation for grade range
-            if not (0.0 <= request.grade <= 4.0):
-                context.set_code(grpc.StatusCode.INVALID_ARGUMENT)
-                context.set_details("Grade must be between 0.0 and 4.0.")
-                return enrollment_pb2.UploadGradeResponse(success=False)
-
-
-            # Update grade and set status to completed
-            enrollment.grade = request.grade
-            enrollment.status = "COMPLETED"
-            db.commit()
+        if request.idempotency_key:
+            return self._idempotent(
+                "UploadGrade", request.faculty_username, request, enrollment_pb2.UploadGradeResponse, context,
+                self._upload_grade
+            )
+        return self._upload_grade(request, context, lambda operation, respond: operation) # No key: nothing to record
+
+    def _upload_grade(self, request, context, record):
+        # Basic validation for grade range
+        if not (0.0 <= request.grade <= 4.0):
+            context.set_code(grpc.StatusCode.INVALID_ARGUMENT)
+            context.set_details("Grade must be between 0.0 and 4.0.")
+            return enrollment_pb2.UploadGradeResponse(success=False)
 
+        def respond(updated):
+            if not updated:
+                return None # Unknown id: nothing changed, nothing to record
+            # The committed row plus course details from the local catalog cache: no extra round trip
             return enrollment_pb2.UploadGradeResponse(
                 success=True,
                 message=f"Grade '{request.grade}' uploaded successfully for Enrollment ID {request.enrollment_id}.",
-                updated_grade=enrollment.grade # Return the float value
+                updated_grade=request.grade, # Return the float value
+                record=make_grade_record(*updated, course_cache.get(updated[2]))
+            )
+
+        # Update grade and set status to completed (committed together with concurrent writes)
+        updated = write_batcher.execute(record(apply_grade, respond), request.enrollment_id, request.grade)
+
+        if not updated:
+            context.set_code(grpc.StatusCode.NOT_FOUND)
+            context.set_details(f"Enrollment ID {request.enrollment_id} not found.")
+            return enrollment_pb2.UploadGradeResponse(success=False)
+
+        return respond(updated)
+
+    def GetEnrollment(self, request, context):
+        """Primary-key lookup of a single enrollment record."""
+        row = ENROLLMENT_BY_ID.first(enrollment_id=request.enrollment_id)
+
+        if not row:
+            context.set_code(grpc.StatusCode.NOT_FOUND)
+            context.set_details(f"Enrollment ID {request.enrollment_id} not found.")
+            return enrollment_pb2.GetEnrollmentResponse()
+
+        return enrollment_pb2.GetEnrollmentResponse(record=make_grade_record(*row, course_cache.get(row[2])))
+
+    def DropEnrollment(self, request, context):
+        """Drops an active enrollment and releases its seat."""
+        try:
+            row = write_batcher.execute(drop_enrollment, request.enrollment_id, request.student_username)
+        except WriteRejected as e:
+            context.set_code(e.code)
+            context.set_details(e.message)
+            return enrollment_pb2.DropEnrollmentResponse(success=False)
+
+        course_id = row[2]
+        return enrollment_pb2.DropEnrollmentResponse(
+            success=True,
+            message=f"Dropped Course ID {course_id}.",
+            record=make_grade_record(*row, course_cache.get(course_id))
+        )
+
+    def GetCourseClosure(self, request, context):
+        """Reports the progress of a closed course's drop cascade."""
+        closure = COURSE_CLOSURE.first(course_id=request.course_id)
+
+        if not closure:
+            context.set_code(grpc.StatusCode.NOT_FOUND)
+            context.set_details(f"No closure recorded for Course ID {request.course_id}.")
+            return enrollment_pb2.CourseClosureResponse()
+
+        status, total_enrollments, dropped_count, cancelled_waitlist = closure
+        return enrollment_pb2.CourseClosureResponse(
+            course_id=request.course_id,
+            status=status,
+            total_enrollments=total_enrollments,
+            dropped_count=dropped_count,
+            cancelled_waitlist=cancelled_waitlist
+        )
+
+    def UploadGrades(self, request_iterator, context):
+        """Bulk grade upload: validates every row, applies them in one transaction, streams per-row results."""
+        rows = []
+        for upload_request in request_iterator:
+            rows.append(upload_request)
+            if len(rows) > UPLOAD_GRADES_MAX_ROWS:
+                context.abort(grpc.StatusCode.INVALID_ARGUMENT, f"A grade sheet may have at most {UPLOAD_GRADES_MAX_ROWS} rows.")
+
+        # 1. Validate every row before touching the database
+        errors = {}
+        seen = set()
+        for index, row in enumerate(rows):
+            if not (0.0 <= row.grade <= 4.0):
+                errors[index] = "Grade must be between 0.0 and 4.0."
+            elif row.enrollment_id in seen:
+                errors[index] = f"Duplicate row for Enrollment ID {row.enrollment_id}."
+            seen.add(row.enrollment_id)
+
+        # 2. Apply all valid rows in a single transaction with one bulk UPDATE
+        valid = [(row.enrollment_id, row.grade) for index, row in enumerate(rows) if index not in errors]
+        found = write_batcher.execute(apply_grades, valid) if valid else set()
+
+        # 3. Stream back one outcome per row, in upload order
+        for index, row in enumerate(rows):
+            if index in errors:
+                code, message = grpc.StatusCode.INVALID_ARGUMENT, errors[index]
+            elif row.enrollment_id not in found:
+                code, message = grpc.StatusCode.NOT_FOUND, f"Enrollment ID {row.enrollment_id} not found."
+            else:
+                code, message = grpc.StatusCode.OK, f"Grade '{row.grade}' uploaded successfully for Enrollment ID {row.enrollment_id}."
+
+            yield enrollment_pb2.UploadGradeResult(
+                row=index,
+                enrollment_id=row.enrollment_id,
+                success=code == grpc.StatusCode.OK,
+                message=message,
+                grade=row.grade,
+                code=code.name
             )
 
+    def GetTranscriptSummary(self, request, context):
+        """Returns a student's precomputed GPA and course counts with a single primary-key read."""
+        row = TRANSCRIPT_BY_STUDENT.first(student_username=request.student_username)
+        completed_count, in_progress_count, grade_points = row or (0, 0, 0.0)
+
+        return enrollment_pb2.TranscriptSummaryResponse(
+            student_username=request.student_username,
+            gpa=grade_points / completed_count if completed_count else 0.0,
+            completed_count=completed_count,
+            in_progress_count=in_progress_count
+        )
+
+    def ListCourseRoster(self, request, context):
+        """Streams the enrollment records of one course, oldest first, in constant memory."""
+        if request.status and request.status not in ROSTER_STATUSES:
+            context.abort(grpc.StatusCode.INVALID_ARGUMENT, f"Status filter must be one of {', '.join(ROSTER_STATUSES)}.")
+
+        # Keyset pagination on the primary key: each partition is read through its
+        # course_id index (which carries the row id), so resuming at a cursor costs
+        # no OFFSET scan. Both id-ordered streams are merged on the fly.
+        def partition_rows(db, table):
+            statement = (
+                select(table.id, table.student_username, table.course_id, table.grade, table.status)
+                .where(table.course_id == request.course_id, table.id > request.cursor)
+                .order_by(table.id)
+            )
+            if request.status:
+                statement = statement.where(table.status == request.status)
+            if request.limit > 0:
+                statement = statement.limit(request.limit)
+            # yield_per fetches ROSTER_CHUNK_ROWS rows at a time from the cursor
+            return db.execute(statement.execution_options(yield_per=ROSTER_CHUNK_ROWS))
+
+        course_data = course_cache.get(request.course_id)
+        db = ReadSessionLocal()
+        try:
+            rows = heapq.merge(*(partition_rows(db, table) for table in ENROLLMENT_TABLES), key=lambda row: row[0])
+            if request.limit > 0:
+                rows = itertools.islice(rows, request.limit)
+            for row in rows:
+                yield make_grade_record(*row, course_data)
         finally:
             db.close()
 
@@ -211,13 +1626,41 @@ class EnrollmentServicer(enrollment_pb2_grpc.EnrollmentServiceServicer):
 
 def serve():
     """Starts the gRPC server for the Enrollment Service."""
-    server = grpc.server(futures.ThreadPoolExecutor(max_workers=10))
+    # Reports queued writes and tickets as load; NOT_SERVING until the catalog is loaded (see common/health.py)
+    server, health = health_and_load_server(
+        [ENROLLMENT_SERVICE_NAME], max_workers=10,
+        backlog=lambda: write_batcher.pending() + ticket_queue.depth(), serving=False
+    )
     enrollment_pb2_grpc.add_EnrollmentServiceServicer_to_server(EnrollmentServicer(), server)
 
     bind_address = f'[::]:{GRPC_PORT}'
     server.add_insecure_port(bind_address)
+
+    # Databases created before the transcript summary existed are backfilled once
+    if transcripts_need_backfill():
+        print(f"Backfilled transcript summaries for {write_batcher.execute(rebuild_transcripts)} students.")
+
+    # Before accepting calls, so a ticket can never be queued twice
+    requeued = requeue_pending_tickets()
+    if requeued:
+        print(f"Re-queued {requeued} pending enrollment tickets.")
+
+    # Follow catalog changes so freed seats are handed to waitlisted students
+    waitlist_promoter.start()
+    course_watcher.start()
+    outbox_relay.start() # Also delivers whatever a previous run left in the outbox
+    archive_mover.start()
+    idempotency_purger.start()
+    closure_job.start() # Resumes closures a previous run did not finish
+    if SEAT_LEASES:
+        lease_recovery.start()
+        lease_returner.start()
+
     print(f"Enrollment Service server starting on {bind_address}. DEPENDS on Course Service ({COURSE_SERVICE_ADDRESS})")
     server.start()
+    threading.Thread(
+        target=lambda: course_cache.ready.wait() and health.set_serving(True), name="health-ready", daemon=True
+    ).start()
 
     try:
         while True:
@@ -227,5 +1670,5 @@ def serve():
         server.stop(0)
 
 if __name__ == '__main__':
-    print("Ensure all .proto files are compiled and Course Service (8001) is running!")
+    print(f"Ensure all .proto files are compiled and Course Service ({COURSE_SERVICE_ADDRESS}) is running!")
     serve()
\ No newline at end of file
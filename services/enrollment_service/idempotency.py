@@ -0,0 +1,86 @@
+import hashlib
+import threading
+
+# Idempotency keys for retried and hedged writes.
+#
+# A successful keyed call records its serialized response in the same write
+# transaction as its effect, so "the write happened" and "the response was
+# recorded" can never disagree. A later call with the same key gets the
+# recorded response back instead of running again. Calls that fail are not
+# recorded: they had no effect, so a retry simply runs them again.
+#
+# The write itself checks for a recorded response first, inside its own
+# (BEGIN IMMEDIATE) transaction, and raises AlreadyRecorded instead of running
+# when there is one. That makes the check atomic across processes: a hedged
+# copy of the call that reached another replica sharing the database can never
+# apply the write a second time. A copy rejected by a read-only precheck (e.g.
+# "already enrolled", caused by the other copy's enrollment) looks the key up
+# once more, so it reports the recorded success rather than the failure.
+#
+# Within one process the guard also lets only one copy of a key execute at a
+# time, the others wait for it and then replay its response: a fast path that
+# spares them the write transaction.
+
+
+class IdempotencyConflict(Exception):
+    """The key was already used for a request with different parameters."""
+
+
+class AlreadyRecorded(Exception):
+    """Raised by a keyed write whose key already has a recorded response; nothing was written."""
+
+    def __init__(self, fingerprint: str, response_bytes: bytes):
+        super().__init__("A response is already recorded for this idempotency key.")
+        self.fingerprint = fingerprint
+        self.response_bytes = response_bytes
+
+
+def request_fingerprint(request) -> str:
+    """Stable hash of a request message, used to detect a key reused for a different request."""
+    return hashlib.sha256(request.SerializeToString(deterministic=True)).hexdigest()
+
+
+class IdempotencyGuard:
+    """Replays recorded responses and serializes concurrent calls that share a key."""
+
+    def __init__(self, lookup):
+        """`lookup(key)` returns the recorded (fingerprint, response bytes), or None."""
+        self.lookup = lookup
+        self._lock = threading.Lock()
+        self._in_flight = {} # key -> Event set when the running call finishes
+
+    def run(self, key: str, fingerprint: str, response_type, call) -> tuple:
+        """Returns (response, replayed): the response recorded under `key`, or the one `call()` produced.
+
+        A response with success=False is only returned once a second lookup has
+        found no recorded response for the key.
+        """
+        while True:
+            with self._lock:
+                running = self._in_flight.get(key)
+                if running is None:
+                    done = self._in_flight[key] = threading.Event()
+                    break
+            running.wait() # Another copy of this call is executing; then look again
+
+        try:
+            recorded = self.lookup(key)
+            if recorded is None:
+                try:
+                    response = call()
+                except AlreadyRecorded as e: # Recorded by a copy of the call running elsewhere
+                    recorded = e.fingerprint, e.response_bytes
+                else:
+                    if response.success:
+                        return response, False
+                    recorded = self.lookup(key) # The failure may stem from that copy's success
+                    if recorded is None:
+                        return response, False
+            recorded_fingerprint, response_bytes = recorded
+            if recorded_fingerprint != fingerprint:
+                raise IdempotencyConflict(key)
+            return response_type.FromString(response_bytes), True
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+            done.set()
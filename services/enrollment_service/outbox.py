@@ -0,0 +1,67 @@
+import threading
+import time
+import grpc
+
+# Transactional outbox for slot changes.
+#
+# Taking or releasing a seat writes an outbox row in the same local transaction
+# as the enrollment itself, so the two can never disagree. The relay thread
+# then delivers the rows to the Course Service in batches:
+#   1. claim:    the next rows are tagged with a fresh batch id (or a batch that
+#                was claimed before a crash is picked up again, unchanged);
+#   2. deliver:  ApplySlotDeltas(batch_id, deltas) - the Course Service applies
+#                a batch id at most once, so redelivery is harmless;
+#   3. complete: the delivered rows are deleted.
+# A failed delivery keeps the claimed batch and is retried with backoff, so the
+# two services converge however often either of them is restarted.
+
+
+class OutboxRelay:
+    """Background thread delivering outbox batches until the outbox is empty."""
+
+    def __init__(self, claim, deliver, complete, poll_seconds: float = 1.0, retry_seconds: float = 0.5,
+                 max_retry_seconds: float = 10.0, name: str = "outbox-relay"):
+        """`claim()` -> (batch_id, deltas) or None; `deliver(batch_id, deltas)` -> result; `complete(batch_id, result)`."""
+        self.claim = claim
+        self.deliver = deliver
+        self.complete = complete
+        self.poll_seconds = poll_seconds
+        self.retry_seconds = retry_seconds
+        self.max_retry_seconds = max_retry_seconds
+        self.name = name
+        self._wake = threading.Event()
+        self._thread = None
+
+    def notify(self):
+        """Signals that new outbox rows were (or are about to be) committed."""
+        self._wake.set()
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+            self._thread.start()
+
+    def drain(self):
+        """Delivers batches until the outbox is empty; raises if a delivery fails."""
+        while True:
+            batch = self.claim()
+            if batch is None:
+                return
+            batch_id, deltas = batch
+            self.complete(batch_id, self.deliver(batch_id, deltas))
+
+    def _run(self):
+        delay = self.retry_seconds
+        while True:
+            # Rows written by another process (or left behind by a crash) are found by polling
+            self._wake.wait(self.poll_seconds)
+            self._wake.clear()
+            try:
+                self.drain()
+                delay = self.retry_seconds
+            except Exception as e:
+                reason = e.code().name if isinstance(e, grpc.RpcError) else e
+                print(f"Slot outbox delivery failed ({reason}); retrying in {delay:.1f}s.")
+                time.sleep(delay)
+                delay = min(delay * 2, self.max_retry_seconds)
+                self._wake.set() # Retry straight after the backoff
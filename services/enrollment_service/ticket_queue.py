@@ -0,0 +1,73 @@
+import threading
+import zlib
+from collections import deque
+
+# Per-course FIFO queues for queued ("ticketed") enrollments.
+#
+# Every key (course id) is pinned to one worker lane by a stable hash, so the
+# items of one course are always handled by the same thread, strictly in
+# arrival order. Each lane serves its courses round-robin, taking up to
+# `max_batch` items of a course at a time, so a single hot course cannot
+# starve the others that share its lane.
+
+
+class _Lane:
+    """One worker's share of the courses: per-course deques plus a ready ring."""
+
+    def __init__(self):
+        self.condition = threading.Condition()
+        self.queues = {}     # key -> deque of pending items
+        self.ready = deque() # keys with pending items, in service order
+
+
+class TicketQueue:
+    """Fixed pool of workers draining per-key FIFO queues in batches."""
+
+    def __init__(self, handler, workers: int = 4, max_batch: int = 50, name: str = "ticket-queue"):
+        """`handler(key, items)` is called with up to `max_batch` items of one key, oldest first."""
+        self.handler = handler
+        self.max_batch = max_batch
+        self._lanes = [_Lane() for _ in range(workers)]
+        for index, lane in enumerate(self._lanes):
+            thread = threading.Thread(target=self._work, args=(lane,), name=f"{name}-{index}", daemon=True)
+            thread.start()
+
+    def _lane_for(self, key) -> _Lane:
+        return self._lanes[zlib.crc32(str(key).encode()) % len(self._lanes)]
+
+    def put(self, key, item):
+        """Appends an item to the back of its key's queue."""
+        lane = self._lane_for(key)
+        with lane.condition:
+            pending = lane.queues.get(key)
+            if pending is None:
+                pending = lane.queues[key] = deque()
+                lane.ready.append(key)
+                lane.condition.notify()
+            pending.append(item)
+
+    def depth(self) -> int:
+        """Number of items waiting across all keys."""
+        total = 0
+        for lane in self._lanes:
+            with lane.condition:
+                total += sum(len(q) for q in lane.queues.values())
+        return total
+
+    def _work(self, lane: _Lane):
+        while True:
+            with lane.condition:
+                while not lane.ready:
+                    lane.condition.wait()
+                key = lane.ready.popleft()
+                pending = lane.queues[key]
+                batch = [pending.popleft() for _ in range(min(len(pending), self.max_batch))]
+                if pending:
+                    lane.ready.append(key) # Back of the ring: other courses go first
+                else:
+                    del lane.queues[key]
+
+            try:
+                self.handler(key, batch)
+            except Exception as e:
+                print(f"Ticket queue handler failed for key {key}: {e}")
@@ -0,0 +1,42 @@
+import threading
+
+# Event-driven waitlist promotion. Anything that may have freed a seat (a drop,
+# an UpdateSlots increase seen on the course change stream, a student joining a
+# course that still has seats) marks the course; the promoter thread then calls
+# `promote(course_id)`, which moves the head of that course's waitlist into
+# enrollments. Marks are coalesced, so a burst of events costs one promotion pass.
+
+
+class WaitlistPromoter:
+    """Background thread running promotion passes for marked courses, oldest mark first."""
+
+    def __init__(self, promote, name: str = "waitlist-promoter"):
+        self.promote = promote
+        self.name = name
+        self._condition = threading.Condition()
+        self._marked = {} # Insertion-ordered set of course ids
+        self._thread = None
+
+    def mark(self, course_id: int):
+        """Schedules a promotion pass for a course (no-op if one is already pending)."""
+        with self._condition:
+            if course_id not in self._marked:
+                self._marked[course_id] = None
+                self._condition.notify()
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            with self._condition:
+                self._condition.wait_for(lambda: self._marked)
+                course_id = next(iter(self._marked))
+                del self._marked[course_id]
+
+            try:
+                self.promote(course_id)
+            except Exception as e:
+                print(f"Waitlist promotion failed for Course ID {course_id}: {e}")
@@ -0,0 +1,6 @@
+"""Puts the repository root (common/, client/) and gateway/ on the import path, as the services run them."""
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [ROOT, os.path.join(ROOT, "gateway")]
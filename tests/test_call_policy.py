@@ -0,0 +1,65 @@
+import grpc
+import pytest
+
+from common import call_policy
+
+
+class FakeError(grpc.RpcError):
+    def __init__(self, code):
+        self._code = code
+
+    def code(self):
+        return self._code
+
+
+class FakeMultiCallable:
+    """Answers with_call() from a list of outcomes: an exception to raise or a response to return."""
+
+    def __init__(self, outcomes):
+        self.outcomes = list(outcomes)
+
+    def with_call(self, request, timeout=None, **kwargs):
+        outcome = self.outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome, None
+
+
+class FakeChannel:
+    def __init__(self, outcomes):
+        self.callable = FakeMultiCallable(outcomes)
+
+    def unary_unary(self, method, request_serializer=None, response_deserializer=None, _registered_method=False):
+        return self.callable
+
+
+def half_open_channel(outcomes):
+    channel = call_policy.PolicyChannel(FakeChannel(outcomes), "test", {})
+    channel.breaker.open_seconds = 0.0
+    for _ in range(channel.breaker.failure_threshold):
+        channel.breaker.record(grpc.StatusCode.UNAVAILABLE)
+    assert channel.breaker.state == call_policy.CircuitBreaker.OPEN
+    return channel
+
+
+def test_probe_released_when_the_call_raises_a_non_rpc_error():
+    channel = half_open_channel([ValueError("cannot serialize request"), "ok"])
+    call = channel.unary_unary("/test.Service/Method")
+
+    with pytest.raises(ValueError):
+        call("request")
+    assert channel.breaker.state == call_policy.CircuitBreaker.HALF_OPEN
+
+    assert call("request") == "ok"  # The next call gets the probe instead of failing fast forever
+    assert channel.breaker.state == call_policy.CircuitBreaker.CLOSED
+
+
+def test_failed_probe_reopens_the_circuit():
+    channel = half_open_channel([FakeError(grpc.StatusCode.UNAVAILABLE)])
+    call = channel.unary_unary("/test.Service/Method")
+
+    with pytest.raises(grpc.RpcError):
+        call("request")
+    channel.breaker.open_seconds = 60.0
+    with pytest.raises(call_policy.CircuitOpenError):
+        call("request")
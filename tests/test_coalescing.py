@@ -0,0 +1,113 @@
+import threading
+import time
+
+import grpc
+import pytest
+
+import view_gateway as gateway
+
+METHOD = "/enrollment.EnrollmentService/GetEnrollment"
+
+
+class FakeDeadlineExceeded(grpc.RpcError):
+    def code(self):
+        return grpc.StatusCode.DEADLINE_EXCEEDED
+
+
+class SlowMultiCallable:
+    """Answers every call with `answer` after `delay` seconds, or times out when the call's timeout is shorter."""
+
+    def __init__(self, answer, delay):
+        self.answer = answer
+        self.delay = delay
+        self.calls = 0
+
+    def __call__(self, request, timeout=None, **kwargs):
+        self.calls += 1
+        if timeout is not None and timeout < self.delay:
+            time.sleep(timeout)
+            raise FakeDeadlineExceeded()
+        time.sleep(self.delay)
+        return self.answer
+
+
+class FakeChannel:
+    def __init__(self, multi_callable):
+        self.multi_callable = multi_callable
+
+    def unary_unary(self, method, request_serializer=None, response_deserializer=None, _registered_method=False):
+        return self.multi_callable
+
+
+def coalesced_call(address, multi_callable):
+    channel = gateway.CoalescingChannel(FakeChannel(multi_callable), "enrollment", address)
+    return channel.unary_unary(METHOD, request_serializer=lambda request: request.encode(), response_deserializer=str)
+
+
+def call_concurrently(*calls):
+    """Starts the calls a little apart, in order; returns their results (or exceptions) in order."""
+    results = [None] * len(calls)
+
+    def run(index, call):
+        try:
+            results[index] = call()
+        except Exception as e:
+            results[index] = e
+
+    threads = [threading.Thread(target=run, args=(index, call)) for index, call in enumerate(calls)]
+    for thread in threads:
+        thread.start()
+        time.sleep(0.02)
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def test_same_request_to_two_shards_is_not_shared():
+    shard_a, shard_b = SlowMultiCallable("on shard A", 0.2), SlowMultiCallable("on shard B", 0.2)
+    call_a, call_b = coalesced_call("shard-a:8002", shard_a), coalesced_call("shard-b:8002", shard_b)
+
+    results = call_concurrently(lambda: call_a("enrollment 7"), lambda: call_b("enrollment 7"))
+
+    assert results == ["on shard A", "on shard B"]
+    assert shard_a.calls == shard_b.calls == 1
+
+
+def test_same_request_to_one_shard_is_shared():
+    shard = SlowMultiCallable("on shard A", 0.2)
+    call = coalesced_call("shard-a:8002", shard)
+
+    results = call_concurrently(lambda: call("enrollment 7"), lambda: call("enrollment 7"))
+
+    assert results == ["on shard A", "on shard A"]
+    assert shard.calls == 1
+
+
+def test_caller_with_more_time_does_not_fail_with_a_shorter_shared_call():
+    shard = SlowMultiCallable("on shard A", 0.2)
+    call = coalesced_call("shard-a:8002", shard)
+
+    short, longer = call_concurrently(lambda: call("enrollment 7", timeout=0.1), lambda: call("enrollment 7", timeout=2.0))
+
+    assert isinstance(short, FakeDeadlineExceeded)
+    assert longer == "on shard A"
+    assert shard.calls == 2
+
+
+def test_caller_does_not_wait_past_its_own_deadline():
+    shard = SlowMultiCallable("on shard A", 0.5)
+    call = coalesced_call("shard-a:8002", shard)
+
+    def short_call():
+        started = time.monotonic()
+        try:
+            call("enrollment 7", timeout=0.05)
+        finally:
+            waited.append(time.monotonic() - started)
+
+    waited = []
+    first, short = call_concurrently(lambda: call("enrollment 7"), short_call)
+
+    assert first == "on shard A"
+    assert isinstance(short, FakeDeadlineExceeded)
+    assert waited[0] < 0.2
@@ -0,0 +1,24 @@
+"""Rebuilds the enrollment service's transcript summaries from its enrollment rows.
+
+Run from the repository root (ENROLLMENT_DB_PATH selects the database):
+    python -m tools.backfill_transcripts
+
+The service also backfills on startup when the summary table is empty; use this
+to rebuild it by hand, e.g. after editing enrollment rows directly. It is safe
+while the service is running: the rebuild is a single write transaction, so
+concurrent enrollments and grade uploads are applied either before or after it.
+"""
+import time
+
+from services.enrollment_service import enrollment_service
+
+
+def main():
+    start = time.perf_counter()
+    with enrollment_service.engine.begin() as conn:
+        students = enrollment_service.rebuild_transcripts(conn)
+    print(f"Rebuilt transcript summaries for {students} students in {time.perf_counter() - start:.2f}s.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,205 @@
+"""Crash test for the slot outbox: kills services mid-flow and checks that seat counts reconcile.
+
+Run from the repository root:
+    python -m tools.outbox_crash_harness [--rounds 6] [--courses 5] [--slots 200]
+
+Starts a Course Service and an Enrollment Service on temporary databases and
+spare ports, keeps a pool of clients enrolling (direct, queued and cart
+checkouts), and SIGKILLs one of the two services at a random moment in every
+round before starting it again. Afterwards it stops the load, waits for the
+enrollment service's slot outbox to drain and checks, for every course:
+
+    initial slots - enrollments recorded == slots in the Course Service
+
+Exits with status 1 if any course disagrees (or the outbox never drains).
+"""
+import argparse
+import os
+import random
+import signal
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+import grpc
+
+from client import course_pb2, course_pb2_grpc, enrollment_pb2, enrollment_pb2_grpc
+
+
+class Service:
+    """One service subprocess that can be killed and started again."""
+
+    def __init__(self, name, module, env, log_path):
+        self.name = name
+        self.module = module
+        self.env = env
+        self.log_path = log_path
+        self.process = None
+
+    def start(self):
+        log = open(self.log_path, "a")
+        self.process = subprocess.Popen(
+            [sys.executable, "-u", "-m", self.module], env=self.env, stdout=log, stderr=subprocess.STDOUT
+        )
+        log.close()
+
+    def kill(self):
+        self.process.send_signal(signal.SIGKILL)
+        self.process.wait()
+
+    def stop(self):
+        if self.process and self.process.poll() is None:
+            self.process.terminate()
+            self.process.wait()
+
+
+def wait_for_channel(address, timeout=15.0):
+    grpc.channel_ready_future(grpc.insecure_channel(address)).result(timeout=timeout)
+
+
+def list_courses(address):
+    stub = course_pb2_grpc.CourseServiceStub(grpc.insecure_channel(address))
+    return {c.id: c for c in stub.ListCourses(course_pb2.ListCoursesRequest(), timeout=5).courses}
+
+
+def count_enrollments(db_path):
+    """course_id -> enrollments recorded (hot and archive), and the undelivered outbox rows."""
+    with sqlite3.connect(db_path) as conn:
+        counts = dict(conn.execute(
+            "SELECT course_id, COUNT(*) FROM ("
+            " SELECT course_id FROM enrollments UNION ALL SELECT course_id FROM enrollments_archive"
+            ") GROUP BY course_id"
+        ).fetchall())
+        pending = conn.execute("SELECT COUNT(*) FROM slot_outbox").fetchone()[0]
+    return counts, pending
+
+
+def load(address, course_ids, stop, stats):
+    """One client: enrolls fresh students until stopped, ignoring failures caused by the crashes."""
+    stub = enrollment_pb2_grpc.EnrollmentServiceStub(grpc.insecure_channel(address))
+    while not stop.is_set():
+        student = f"student-{random.getrandbits(48):x}"
+        mode = random.random()
+        try:
+            if mode < 0.6:
+                stub.Enroll(enrollment_pb2.EnrollRequest(
+                    student_username=student, course_id=random.choice(course_ids)
+                ), timeout=5)
+            elif mode < 0.8:
+                stub.Enroll(enrollment_pb2.EnrollRequest(
+                    student_username=student, course_id=random.choice(course_ids), queued=True
+                ), timeout=5)
+            else:
+                stub.EnrollMany(enrollment_pb2.EnrollManyRequest(
+                    student_username=student, course_ids=random.sample(course_ids, 2)
+                ), timeout=5)
+            stats["calls"] += 1
+        except grpc.RpcError:
+            stats["errors"] += 1
+            time.sleep(0.05)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rounds", type=int, default=6, help="kill/restart rounds")
+    parser.add_argument("--courses", type=int, default=5)
+    parser.add_argument("--slots", type=int, default=200, help="initial slots per course")
+    parser.add_argument("--clients", type=int, default=8)
+    parser.add_argument("--course-port", default="18001")
+    parser.add_argument("--enrollment-port", default="18002")
+    parser.add_argument("--drain-timeout", type=float, default=60.0)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="outbox-crash-")
+    course_address = f"localhost:{args.course_port}"
+    enrollment_address = f"localhost:{args.enrollment_port}"
+    enrollment_db = os.path.join(workdir, "enrollment.db")
+    env = dict(
+        os.environ,
+        PYTHONPATH=os.getcwd(),
+        COURSE_DB_PATH=os.path.join(workdir, "courses.db"),
+        ENROLLMENT_DB_PATH=enrollment_db,
+        COURSE_GRPC_PORT=args.course_port,
+        ENROLLMENT_GRPC_PORT=args.enrollment_port,
+        COURSE_SERVICE_ADDRESS=course_address,
+    )
+    course = Service("course", "services.course_service.course_service", env, os.path.join(workdir, "course.log"))
+    enrollment = Service(
+        "enrollment", "services.enrollment_service.enrollment_service", env, os.path.join(workdir, "enrollment.log")
+    )
+    print(f"Working directory: {workdir}")
+
+    stop = threading.Event()
+    stats = {"calls": 0, "errors": 0}
+    try:
+        course.start()
+        wait_for_channel(course_address)
+        stub = course_pb2_grpc.CourseServiceStub(grpc.insecure_channel(course_address))
+        initial = {}
+        for index in range(args.courses):
+            added = stub.AddCourse(course_pb2.AddCourseRequest(
+                code=f"CRASH{index}", title=f"Crash Test {index}", slots=args.slots
+            ), timeout=5).course
+            initial[added.id] = added.slots
+
+        enrollment.start()
+        wait_for_channel(enrollment_address)
+
+        clients = [
+            threading.Thread(target=load, args=(enrollment_address, list(initial), stop, stats), daemon=True)
+            for _ in range(args.clients)
+        ]
+        for thread in clients:
+            thread.start()
+
+        for round_number in range(1, args.rounds + 1):
+            time.sleep(random.uniform(1.0, 3.0))
+            victim = random.choice((course, enrollment))
+            victim.kill()
+            print(f"Round {round_number}: killed the {victim.name} service after {stats['calls']} calls.")
+            time.sleep(random.uniform(0.2, 1.0))
+            victim.start()
+            wait_for_channel(course_address if victim is course else enrollment_address)
+
+        stop.set()
+        for thread in clients:
+            thread.join()
+
+        # Whatever was committed locally must now reach the Course Service
+        deadline = time.monotonic() + args.drain_timeout
+        while True:
+            counts, pending = count_enrollments(enrollment_db)
+            if pending == 0 or time.monotonic() > deadline:
+                break
+            time.sleep(0.5)
+
+        courses = list_courses(course_address)
+    finally:
+        stop.set()
+        enrollment.stop()
+        course.stop()
+
+    print(f"{stats['calls']} calls completed, {stats['errors']} failed during crashes.")
+    if pending:
+        print(f"FAIL: {pending} outbox rows were never delivered.")
+        sys.exit(1)
+
+    mismatches = 0
+    for course_id, slots in sorted(initial.items()):
+        enrolled = counts.get(course_id, 0)
+        expected = slots - enrolled
+        actual = courses[course_id].slots
+        verdict = "ok" if expected == actual else "MISMATCH"
+        mismatches += expected != actual
+        print(f"Course {course_id}: {enrolled} enrolled, expected {expected} slots, course service has {actual} - {verdict}")
+
+    if mismatches:
+        sys.exit(1)
+    print("All seat counts reconcile.")
+
+
+if __name__ == "__main__":
+    main()
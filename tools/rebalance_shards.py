@@ -0,0 +1,235 @@
+"""Creates enrollment shard maps and moves student bucket ranges between shards.
+
+Run from the repository root:
+    python -m tools.rebalance_shards init shards.json localhost:8002 localhost:8012
+    python -m tools.rebalance_shards move shards.json --buckets 2048-4095 --to 1 \\
+        --db 0=services/enrollment_service/enrollment.db --db 1=/data/enrollment-1.db
+
+A move works through the range in chunks of buckets. For every chunk it:
+  1. marks the chunk as moving in the shard map; the gateway reloads the map
+     and refuses requests of those students until the chunk is done;
+  2. waits until the old shard has settled the chunk's queued enrollments;
+  3. copies the students' enrollments (archive included), transcripts,
+     waitlist entries, tickets and Enroll idempotency keys to the new shard,
+     then deletes them from the old one, while holding the old shard's write
+     lock so no write for those students can slip in between;
+  4. assigns the chunk to the new shard in the map.
+
+Copies replace what the new shard already has for those students, so a move
+that was interrupted can simply be run again (add --resume-from OLD_SHARD for
+the chunk it left frozen). Enrollment ids keep their value
+(they are unique across shards); waitlist entries get new ids on the new
+shard and so join the back of its waitlist. Seat counts are not affected:
+the seats were taken when the students enrolled.
+"""
+import argparse
+import sqlite3
+import sys
+import time
+
+from common.sharding import BUCKETS, ShardMap, student_bucket
+
+# Tables keyed by student, copied as whole rows
+STUDENT_TABLES = ("enrollments", "enrollments_archive", "transcripts", "enrollment_tickets")
+STUDENT_LIST_TABLES = ("transcripts", "waitlist", "enrollment_tickets") # Together they name every student of a shard
+
+
+def parse_range(text: str) -> tuple:
+    first, _, last = text.partition("-")
+    first, last = int(first), int(last or first)
+    if not 0 <= first <= last < BUCKETS:
+        raise argparse.ArgumentTypeError(f"Bucket range must lie within 0-{BUCKETS - 1}.")
+    return first, last
+
+
+def connect(path: str):
+    conn = sqlite3.connect(path, timeout=30, isolation_level=None)
+    conn.create_function("student_bucket", 1, student_bucket, deterministic=True)
+    conn.execute("PRAGMA busy_timeout=30000")
+    return conn
+
+
+def students_in(conn, first: int, last: int) -> list:
+    union = " UNION ".join(f"SELECT student_username FROM {table}" for table in STUDENT_LIST_TABLES)
+    return [row[0] for row in conn.execute(
+        f"SELECT student_username FROM ({union}) WHERE student_bucket(student_username) BETWEEN ? AND ?",
+        (first, last)
+    )]
+
+
+def queued_tickets(conn, first: int, last: int) -> int:
+    return conn.execute(
+        "SELECT COUNT(*) FROM enrollment_tickets WHERE status = 'QUEUED' AND student_bucket(student_username) BETWEEN ? AND ?",
+        (first, last)
+    ).fetchone()[0]
+
+
+def columns(conn, table: str) -> list:
+    return [row[1] for row in conn.execute(f"PRAGMA table_info({table})")]
+
+
+def key_bounds(student: str) -> tuple:
+    """Key range of a student's Enroll idempotency keys ('Enroll:<student>:<key>')."""
+    return f"Enroll:{student}:", f"Enroll:{student};" # ';' sorts right after ':'
+
+
+def move_students(source, dest, students: list) -> int:
+    """Copies the students' rows to `dest` and deletes them from `source`; returns the enrollments moved.
+
+    The caller holds the source's write lock; the destination commits first, so a
+    crash in between leaves copies on both sides and a re-run completes the move.
+    """
+    moved = 0
+    dest.execute("BEGIN IMMEDIATE")
+    try:
+        for start in range(0, len(students), 500): # Stay below SQLite's bound-parameter limit
+            chunk = students[start:start + 500]
+            marks = ",".join("?" * len(chunk))
+
+            for table in STUDENT_TABLES:
+                names = columns(source, table)
+                rows = source.execute(
+                    f"SELECT {', '.join(names)} FROM {table} WHERE student_username IN ({marks})", chunk
+                ).fetchall()
+                dest.execute(f"DELETE FROM {table} WHERE student_username IN ({marks})", chunk)
+                dest.executemany(
+                    f"INSERT OR REPLACE INTO {table} ({', '.join(names)}) VALUES ({', '.join('?' * len(names))})", rows
+                )
+                if table.startswith("enrollments"):
+                    moved += len(rows)
+
+            # Waitlist ids are per shard: the new shard hands out its own
+            names = [name for name in columns(source, "waitlist") if name != "id"]
+            rows = source.execute(
+                f"SELECT {', '.join(names)} FROM waitlist WHERE student_username IN ({marks}) ORDER BY id", chunk
+            ).fetchall()
+            dest.execute(f"DELETE FROM waitlist WHERE student_username IN ({marks})", chunk)
+            dest.executemany(f"INSERT INTO waitlist ({', '.join(names)}) VALUES ({', '.join('?' * len(names))})", rows)
+
+            names = columns(source, "idempotency_keys")
+            for student in chunk:
+                rows = source.execute(
+                    f"SELECT {', '.join(names)} FROM idempotency_keys WHERE key >= ? AND key < ?", key_bounds(student)
+                ).fetchall()
+                dest.executemany(
+                    f"INSERT OR REPLACE INTO idempotency_keys ({', '.join(names)}) VALUES ({', '.join('?' * len(names))})",
+                    rows
+                )
+
+        # Active enrollments of courses the new shard already finished closing
+        # must still be dropped there
+        dest.execute(
+            "UPDATE course_closures SET status = 'RUNNING', finished_at = NULL WHERE status = 'DONE' AND course_id IN "
+            "(SELECT DISTINCT course_id FROM enrollments WHERE status = 'ENROLLED')"
+        )
+        dest.execute("COMMIT")
+    except BaseException:
+        dest.execute("ROLLBACK")
+        raise
+
+    for start in range(0, len(students), 500):
+        chunk = students[start:start + 500]
+        marks = ",".join("?" * len(chunk))
+        for table in STUDENT_TABLES + ("waitlist",):
+            source.execute(f"DELETE FROM {table} WHERE student_username IN ({marks})", chunk)
+        for student in chunk:
+            source.execute("DELETE FROM idempotency_keys WHERE key >= ? AND key < ?", key_bounds(student))
+    return moved
+
+
+def move(args):
+    databases = dict(args.db)
+    shard_map = ShardMap.load(args.map)
+    if args.to not in shard_map.shards:
+        sys.exit(f"Shard {args.to} is not in the shard map.")
+
+    first, last = args.buckets
+    chunks = []
+    for start, end, owner in shard_map.ranges:
+        start, end = max(start, first), min(end, last)
+        if start > end or owner == args.to:
+            continue
+        if owner is None: # Left frozen by an interrupted move
+            if args.resume_from is None:
+                sys.exit(f"Buckets {start}-{end} are being moved; pass --resume-from with their old shard to finish.")
+            owner = args.resume_from
+        for chunk_start in range(start, end + 1, args.chunk):
+            chunks.append((chunk_start, min(chunk_start + args.chunk - 1, end), owner))
+
+    for owner in {owner for _, _, owner in chunks} | {args.to}:
+        if owner not in databases:
+            sys.exit(f"Pass --db {owner}=PATH for shard {owner}.")
+
+    dest = connect(databases[args.to])
+    total = 0
+    for start, end, owner in chunks:
+        source = connect(databases[owner])
+
+        # 1. Freeze the chunk and give the gateways time to notice
+        shard_map = ShardMap.load(args.map).reassign(start, end, None)
+        shard_map.save(args.map)
+        time.sleep(args.settle_seconds)
+
+        # 2. Let the old shard settle the chunk's queued enrollments
+        deadline = time.monotonic() + args.queue_timeout
+        while queued_tickets(source, start, end):
+            if time.monotonic() > deadline:
+                ShardMap.load(args.map).reassign(start, end, owner).save(args.map)
+                sys.exit(f"Buckets {start}-{end} still have queued enrollments on shard {owner}; move aborted.")
+            time.sleep(0.2)
+
+        # 3. Copy and delete under the old shard's write lock
+        source.execute("BEGIN IMMEDIATE")
+        try:
+            moved = move_students(source, dest, students_in(source, start, end))
+            source.execute("COMMIT")
+        except BaseException:
+            source.execute("ROLLBACK")
+            raise
+        source.close()
+
+        # 4. Route the chunk to its new shard
+        ShardMap.load(args.map).reassign(start, end, args.to).save(args.map)
+        total += moved
+        print(f"Moved buckets {start}-{end} from shard {owner} to shard {args.to} ({moved} enrollments).")
+
+    dest.close()
+    print(f"Done: {len(chunks)} chunks, {total} enrollments moved.")
+
+
+def init(args):
+    if len(args.addresses) > 16:
+        sys.exit("At most 16 shards are supported.")
+    ShardMap.even(args.addresses).save(args.map)
+    print(f"Wrote {args.map} with {len(args.addresses)} shards.")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    init_parser = commands.add_parser("init", help="write a map spreading the buckets evenly over the shards")
+    init_parser.add_argument("map")
+    init_parser.add_argument("addresses", nargs="+", help="shard gRPC addresses, in shard index order")
+    init_parser.set_defaults(run=init)
+
+    move_parser = commands.add_parser("move", help="move a bucket range to another shard")
+    move_parser.add_argument("map")
+    move_parser.add_argument("--buckets", type=parse_range, required=True, help=f"FIRST-LAST within 0-{BUCKETS - 1}")
+    move_parser.add_argument("--to", type=int, required=True, help="destination shard index")
+    move_parser.add_argument("--db", action="append", default=[], required=True,
+                             type=lambda text: (int(text.split("=", 1)[0]), text.split("=", 1)[1]),
+                             help="INDEX=PATH of a shard database (source and destination shards)")
+    move_parser.add_argument("--chunk", type=int, default=64, help="buckets moved per step")
+    move_parser.add_argument("--settle-seconds", type=float, default=3.0,
+                             help="wait after freezing a chunk (longer than the gateway's map reload interval)")
+    move_parser.add_argument("--queue-timeout", type=float, default=30.0)
+    move_parser.add_argument("--resume-from", type=int, help="old shard of chunks left frozen by an interrupted move")
+    move_parser.set_defaults(run=move)
+
+    args = parser.parse_args()
+    args.run(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+"""Runs several local replicas of every service and shows how calls are balanced over them.
+
+Run from the repository root:
+    python -m tools.replica_demo [--replicas 3] [--policy least_outstanding] [--seconds 5]
+
+Starts N replicas each of the Auth, Course and Enrollment services on
+temporary databases (the replicas of a service share one database) and spare
+ports, waits until every replica's Health service reports SERVING, then
+drives ListCourses and Enroll through balanced channels and prints how many
+calls each replica answered and the load it last reported. Halfway through
+one Course replica is stopped, to show the callers routing around it.
+Finally it prints the environment variables that point the gateway at the
+same replicas, and keeps them running until interrupted when --keep is given.
+"""
+import argparse
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+import grpc
+
+from client import course_pb2, course_pb2_grpc, enrollment_pb2, enrollment_pb2_grpc, health_pb2, health_pb2_grpc
+from common.balancing import POLICIES, BalancedChannel
+
+SERVICES = (
+    # name, module, port variable, database variable
+    ("auth", "services.auth_service.main", "AUTH_GRPC_PORT", "AUTH_DB_PATH"),
+    ("course", "services.course_service.course_service", "COURSE_GRPC_PORT", "COURSE_DB_PATH"),
+    ("enrollment", "services.enrollment_service.enrollment_service", "ENROLLMENT_GRPC_PORT", "ENROLLMENT_DB_PATH"),
+)
+
+
+def start_service(module, env, log_path):
+    log = open(log_path, "a")
+    process = subprocess.Popen([sys.executable, "-u", "-m", module], env=env, stdout=log, stderr=subprocess.STDOUT)
+    log.close()
+    return process
+
+
+def wait_until_serving(address, timeout=30.0):
+    stub = health_pb2_grpc.HealthStub(grpc.insecure_channel(address))
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            if stub.Check(health_pb2.HealthCheckRequest(), timeout=1).status == health_pb2.HealthCheckResponse.SERVING:
+                return
+        except grpc.RpcError:
+            pass
+        if time.monotonic() > deadline:
+            raise TimeoutError(f"{address} did not become SERVING within {timeout:.0f}s.")
+        time.sleep(0.2)
+
+
+def drive(call, seconds, threads, stats):
+    """Runs `call()` from several threads for `seconds`, counting failures."""
+    deadline = time.monotonic() + seconds
+
+    def worker():
+        while time.monotonic() < deadline:
+            try:
+                call()
+            except grpc.RpcError:
+                stats["errors"] += 1
+
+    workers = [threading.Thread(target=worker) for _ in range(threads)]
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+
+
+def report(title, channel):
+    print(title)
+    for replica in channel.replicas:
+        print(f"  {replica.address:<18} {replica.calls:>6} calls  "
+              f"healthy={replica.healthy}  reported in-flight={replica.reported_in_flight} "
+              f"queue={replica.reported_queue_depth}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--replicas", type=int, default=3, help="replicas per service")
+    parser.add_argument("--policy", choices=POLICIES, default="least_outstanding")
+    parser.add_argument("--seconds", type=float, default=5.0, help="length of each load phase")
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--base-port", type=int, default=18100)
+    parser.add_argument("--keep", action="store_true", help="keep the replicas running until Ctrl+C")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="replicas-")
+    addresses = {}
+    env = dict(os.environ, PYTHONPATH=os.getcwd(), LOAD_BALANCING_POLICY=args.policy)
+    for offset, (name, _, _, db_variable) in enumerate(SERVICES):
+        env[db_variable] = os.path.join(workdir, f"{name}.db")
+        addresses[name] = [f"localhost:{args.base_port + offset * 10 + i}" for i in range(args.replicas)]
+    env["COURSE_SERVICE_ADDRESS"] = ",".join(addresses["course"]) # The enrollment replicas balance too
+
+    processes = {}
+    try:
+        for name, module, port_variable, _ in SERVICES:
+            for index, address in enumerate(addresses[name]):
+                replica_env = dict(env, **{port_variable: address.rsplit(":", 1)[1]})
+                processes[address] = start_service(module, replica_env, os.path.join(workdir, f"{name}-{index}.log"))
+            for address in addresses[name]:
+                wait_until_serving(address)
+        print(f"{args.replicas} replicas per service are SERVING (logs in {workdir}).")
+
+        course_channel = BalancedChannel(addresses["course"], args.policy)
+        enrollment_channel = BalancedChannel(addresses["enrollment"], args.policy)
+        course_stub = course_pb2_grpc.CourseServiceStub(course_channel)
+        enrollment_stub = enrollment_pb2_grpc.EnrollmentServiceStub(enrollment_channel)
+        course_ids = [
+            course_stub.AddCourse(course_pb2.AddCourseRequest(code=f"LB{i}", title=f"Balanced {i}", slots=1_000_000)).course.id
+            for i in range(5)
+        ]
+
+        def mixed_call():
+            if random.random() < 0.5:
+                course_stub.ListCourses(course_pb2.ListCoursesRequest(), timeout=5)
+            else:
+                enrollment_stub.Enroll(enrollment_pb2.EnrollRequest(
+                    student_username=f"lb-{random.getrandbits(48):x}", course_id=random.choice(course_ids)
+                ), timeout=5)
+
+        stats = {"errors": 0}
+        drive(mixed_call, args.seconds, args.threads, stats)
+        report(f"Course replicas after {args.seconds:.0f}s ({args.policy}):", course_channel)
+        report("Enrollment replicas:", enrollment_channel)
+
+        stopped = addresses["course"][0]
+        processes[stopped].terminate()
+        processes[stopped].wait()
+        print(f"Stopped course replica {stopped}; {stats['errors']} failed calls so far.")
+        drive(mixed_call, args.seconds, args.threads, stats)
+        report("Course replicas after the stop:", course_channel)
+        print(f"{stats['errors']} failed calls in total.")
+
+        print("Point the gateway at these replicas with:")
+        for name in ("auth", "course", "enrollment"):
+            print(f"  export {name.upper()}_SERVICE_ADDRESS={','.join(addresses[name])}")
+        if args.keep:
+            print("Replicas keep running; press Ctrl+C to stop them.")
+            while True:
+                time.sleep(3600)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for process in processes.values():
+            if process.poll() is None:
+                process.terminate()
+                process.wait()
+
+
+if __name__ == "__main__":
+    main()